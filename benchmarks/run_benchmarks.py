@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+# Headless: no window or audio device needed (plain Linux boxes, CI)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT) # Assets are loaded relative to the repo root
+
+import numpy as np
+import pygame
+from main import Tetris
+from src.config import SIM_HZ
+from src.profiler import PHASES
+from scenarios import get_scenarios
+
+# Rendering and simulation benchmarks.
+# Boots Tetris under the SDL dummy drivers, drives each fixed scenario for N frames (logic at
+# SIM_HZ, one draw per 60 fps frame, like Tetris.run) and times update and draw separately.
+# Results are written as JSON and compared against a stored baseline:
+#   python benchmarks/run_benchmarks.py                   # all scenarios, compare to baseline.json
+#   python benchmarks/run_benchmarks.py --save-baseline   # record a new baseline
+#   python benchmarks/run_benchmarks.py -s full_board turtles_40 --frames 600
+#
+# Timings only compare on the same machine, so the baseline is per machine and not committed
+# (benchmarks/baseline.json is git-ignored). Record it from the commit you compare against, then
+# run the branch on the same box; the exit status is 1 on a regression:
+#   git checkout master && python benchmarks/run_benchmarks.py --save-baseline
+#   git checkout my-branch && python benchmarks/run_benchmarks.py
+# Each scenario runs --repeats times and every stat keeps its best (lowest) value. Only p50s are
+# gated: p95 is printed too, but a few scheduler stalls move it by more than the threshold.
+BENCH_DIR = os.path.join(ROOT, 'benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+FRAME_RATE = 60
+NOISE_FLOOR_MS = 0.1 # Differences smaller than this never count as regressions
+GATED_STATS = ('p50',)
+
+def summarize(samples_ms):
+    a = np.sort(np.asarray(samples_ms, dtype=np.float64))
+    return {
+        'mean': round(float(a.mean()), 4),
+        'p50': round(float(np.percentile(a, 50)), 4),
+        'p95': round(float(np.percentile(a, 95)), 4),
+        'p99': round(float(np.percentile(a, 99)), 4),
+        'max': round(float(a[-1]), 4),
+    }
+
+def run_scenario(game, scenario, frames, warmup, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    scenario.setup(game)
+    dt = 1.0 / SIM_HZ
+    steps = max(1, round(SIM_HZ / FRAME_RATE))
+    profiler = game.profiler
+    if not profiler.enabled: profiler.toggle()
+
+    update_ms, draw_ms = [], []
+    for i in range(warmup + frames):
+        if i == warmup: profiler.frames.clear() # Warmup (cache fills, first-use builds) stays out of the phase table
+        scenario.each_frame(game)
+        profiler.begin_frame()
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            game.capture_interpolation()
+            scenario.update(game, dt)
+        game.ai_bot.plan_frame()
+        t1 = time.perf_counter()
+        scenario.draw(game)
+        t2 = time.perf_counter()
+        profiler.end_frame()
+        pygame.event.pump() # Keep SDL's queue drained like the real loop does
+        if i >= warmup:
+            update_ms.append((t1 - t0) * 1000.0)
+            draw_ms.append((t2 - t1) * 1000.0)
+
+    phases = {name: round(p50, 4) for name, p50, p95, p99 in profiler.stats() if name in PHASES}
+    frame_ms = [u + d for u, d in zip(update_ms, draw_ms)]
+    return {
+        'update': summarize(update_ms),
+        'draw': summarize(draw_ms),
+        'frame': summarize(frame_ms),
+        'phases_p50': phases,
+        'state': game.game_state, # A scenario that fell out of its state (game over, crash) shows here
+    }
+
+def best_of(runs):
+    """Each stat's lowest value over repeated runs of one scenario"""
+    best = dict(runs[-1])
+    for part in ('update', 'draw', 'frame'):
+        best[part] = {stat: min(r[part][stat] for r in runs) for stat in runs[0][part]}
+    best['phases_p50'] = {name: min(r['phases_p50'].get(name, p50) for r in runs) for name, p50 in runs[0]['phases_p50'].items()}
+    return best
+
+def compare(results, baseline, threshold):
+    """Prints current vs baseline; returns [(scenario, metric, base, now)] regressions"""
+    regressions = []
+    print(f"\n{'scenario':14}{'metric':12}{'baseline':>10}{'now':>10}{'change':>9}")
+    for name, res in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            print(f"{name:14}(not in baseline)")
+            continue
+        for part in ('update', 'draw', 'frame'):
+            for stat in ('p50', 'p95'):
+                b, n = base[part][stat], res[part][stat]
+                change = (n - b) / b if b else 0.0
+                flag = ''
+                if stat in GATED_STATS and change > threshold and n - b > NOISE_FLOOR_MS:
+                    flag = '  REGRESSION'
+                    regressions.append((name, f"{part}.{stat}", b, n))
+                print(f"{name:14}{part + '.' + stat:12}{b:10.3f}{n:10.3f}{change:+9.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless rendering/simulation benchmarks")
+    parser.add_argument('-s', '--scenarios', nargs='*', help="Scenario names (default: all)")
+    parser.add_argument('--frames', type=int, default=300, help="Measured frames per scenario")
+    parser.add_argument('--warmup', type=int, default=30, help="Unmeasured frames before measuring")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per scenario; each stat keeps its best value")
+    parser.add_argument('--out', help="Results JSON (default: benchmarks/results/bench_<time>.json)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Write these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Relative p50 slowdown counted as a regression")
+    args = parser.parse_args()
+
+    scenarios = get_scenarios(args.scenarios)
+    game = Tetris()
+
+    results = {
+        'meta': {
+            'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'repeats': args.repeats,
+            'sim_hz': SIM_HZ,
+        },
+        'scenarios': {},
+    }
+    # Repeats go round the whole list, so a slow stretch of the machine hits one run of several scenarios
+    runs = {scenario.name: [] for scenario in scenarios}
+    for repeat in range(max(1, args.repeats)):
+        for scenario in scenarios:
+            t0 = time.perf_counter()
+            res = run_scenario(game, scenario, args.frames, args.warmup, args.seed)
+            runs[scenario.name].append(res)
+            print(f"{scenario.name:14} update p50 {res['update']['p50']:7.3f} ms  draw p50 {res['draw']['p50']:7.3f} ms  "
+                  f"frame p95 {res['frame']['p95']:7.3f} ms  ({time.perf_counter() - t0:.1f}s)")
+    for name, scenario_runs in runs.items():
+        results['scenarios'][name] = best_of(scenario_runs)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, time.strftime("bench_%Y%m%d_%H%M%S.json"))
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults: {out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (run with --save-baseline to create one)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for name, metric, b, n in regressions:
+            print(f"  {name} {metric}: {b:.3f} -> {n:.3f} ms")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
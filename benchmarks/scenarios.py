@@ -0,0 +1,137 @@
+import random
+import main
+from src.slot_machine import SlotMachine
+
+# Fixed benchmark scenarios.
+# setup(game) puts a freshly reset Tetris into the scenario; each_frame(game) runs before every
+# measured frame to hold it there (pinned piece, topped-up enemies, looping spin). update(game, dt)
+# and draw(game) default to Tetris.update / Tetris.draw; scenes the main draw() doesn't render
+# (Dark World, the slot machine) supply their own.
+
+def pin_piece(game):
+    """Keeps the falling piece from locking so the board stays as set up"""
+    game.fall_timer = 0
+    game.lock_timer = 0
+    game.turtle_spawn_timer = -1e9 # No random spawns; scenarios add their own enemies
+
+def present(game):
+    game.presenter.present(game.game_surface)
+
+class Scenario:
+    def __init__(self, name, setup=None, each_frame=None, update=None, draw=None):
+        self.name = name
+        self._setup = setup
+        self._each_frame = each_frame
+        self._update = update
+        self._draw = draw
+
+    def setup(self, game):
+        game.reset_game()
+        game.game_state = 'PLAYING'
+        pin_piece(game)
+        if self._setup: self._setup(game)
+
+    def each_frame(self, game):
+        if game.game_state == 'PLAYING': pin_piece(game)
+        if self._each_frame: self._each_frame(game)
+
+    def update(self, game, dt):
+        if self._update: self._update(game, dt)
+        else: game.update(dt)
+
+    def draw(self, game):
+        if self._draw: self._draw(game)
+        else: game.draw()
+
+# --- Board ---
+
+def make_block(kind, color):
+    if kind == 'koopa': return main.Block(color, sprite_data={'sprite': 'walk_1', 'category': 'koopa_green'})
+    if kind == 'piece': return main.Block(color)
+    return main.Block(color, kind) # 'brick', 'question', 'coin'
+
+def fill_board(game, from_row=4):
+    """Mixed sprite blocks (static, animated, plain) from from_row down, one hole per row so nothing clears"""
+    kinds = ('piece', 'brick', 'question', 'coin', 'koopa')
+    colors = [d['color'] for d in main.TETROMINO_DATA.values()]
+    grid = game.grid.grid
+    width = len(grid[0])
+    for y in range(from_row, len(grid)):
+        hole = random.randrange(width)
+        for x in range(width):
+            if x != hole: grid[y][x] = make_block(kinds[(x + y) % len(kinds)], colors[(x * 3 + y) % len(colors)])
+    game.grid.invalidate()
+
+# --- Enemies ---
+
+def top_up_turtles(game, count):
+    kinds = (main.Turtle, main.RedTurtle, main.Spiny, main.Blooper, main.HammerBro)
+    while len(game.turtles) < count:
+        t = kinds[len(game.turtles) % len(kinds)](tetris=game)
+        t.y = random.uniform(0, 12)
+        game.turtles.append(t)
+
+def setup_turtles(game):
+    top_up_turtles(game, 40)
+
+def setup_mega(game):
+    top_up_turtles(game, 10)
+    game.trigger_mega_mode(duration=1e9)
+
+def setup_star_damage(game):
+    top_up_turtles(game, 10)
+    game.trigger_star_power(1e9)
+
+def hold_damage(game):
+    game.damage_flash_timer = 0.3
+    game.screen_shake_timer = 0.3
+
+def setup_boss(game):
+    game.level_in_world = 4
+    game.reset_level()
+    game.boss_garbage_timer = 1e9 # Garbage would eventually top the board out
+
+# --- Other scenes ---
+
+def setup_dark_world(game):
+    game.game_state = 'DARK_WORLD'
+
+def draw_dark_world(game):
+    game.dark_world.draw(game.game_surface)
+    present(game)
+
+def setup_slots(game):
+    game.bench_slots = SlotMachine(game.sprite_manager, game.sound_manager)
+    game.bench_slots.trigger()
+
+def keep_spinning(game):
+    slots = game.bench_slots
+    if slots.state != 'REEL_SPIN':
+        slots.total_coins = max(slots.total_coins, 500)
+        slots.start_spin()
+
+def update_slots(game, dt):
+    game.bench_slots.update(dt)
+
+def draw_slots(game):
+    game.game_surface.fill((0, 0, 0))
+    game.bench_slots.draw(game.game_surface)
+    present(game)
+
+SCENARIOS = [
+    Scenario('empty_board'),
+    Scenario('full_board', setup=fill_board),
+    Scenario('turtles_40', setup=setup_turtles, each_frame=lambda g: top_up_turtles(g, 40)),
+    Scenario('mega_mode', setup=setup_mega, each_frame=lambda g: top_up_turtles(g, 10)),
+    Scenario('star_damage', setup=setup_star_damage, each_frame=hold_damage),
+    Scenario('boss_fight', setup=setup_boss),
+    Scenario('dark_world', setup=setup_dark_world, draw=draw_dark_world),
+    Scenario('slot_spin', setup=setup_slots, each_frame=keep_spinning, update=update_slots, draw=draw_slots),
+]
+
+def get_scenarios(names=None):
+    if not names: return list(SCENARIOS)
+    by_name = {s.name: s for s in SCENARIOS}
+    unknown = [n for n in names if n not in by_name]
+    if unknown: raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}; have {', '.join(by_name)}")
+    return [by_name[n] for n in names]
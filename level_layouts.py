@@ -0,0 +1,12 @@
+# Pre-placed block layouts per level (see Tetris.apply_layout).
+# A layout is a list of row strings from the top of the playfield; rows and columns past the grid are ignored.
+#   '.' empty   '#' ground (unclearable)   'X' hard block (unclearable)
+#   'B' brick (garbage, damages the boss when cleared)   '?' question block (item when cleared)
+# Levels without an entry start on an empty board.
+LAYOUTS = {
+    # (world, level_in_world): ["..........", ...],
+}
+
+def get_layout(world, level_in_world):
+    """Row strings for the level, or None for an empty board"""
+    return LAYOUTS.get((world, level_in_world))
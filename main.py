@@ -30,6 +30,8 @@ import math
 
 import sys
 
+from collections import OrderedDict
+
 from level_layouts import get_layout
 
 import time # Added by user
@@ -58,8 +60,30 @@ from src.config import *
 
 from src.ai_player import TetrisBot
 
+from src.pieces import Polyomino, Spawner
+
+from src.playfield import Playfield, Block
+
+from src.simulation import GameState, step, start_level, garbage_rows, forward_state_attributes, fall_interval
+
+from src.replay import ReplayRecorder
+
+from src.fixed_step import FixedStepClock, Interpolator
+
+from src.profiler import FrameProfiler, text_renders
+
 from src.luigi_generator import generate_luigi_sprites
 
+from src.text_cache import render_text, text_cache_begin_frame
+
+from src.fonts import get_font
+
+from src.overlays import OverlayManager
+
+from src.particles import ParticleSystem
+
+from src.presentation import PresentationStage
+
 from src.bonus_level import BonusLevel
 
 from src.scene_dark_world import Scene_DarkWorld
@@ -79,14 +103,6 @@ from multiplayer_utils import start_async_join
 
 
 
-# --- DAS Configuration ---
-
-DAS_DELAY = 0.3  # Initial delay before auto-repeat
-
-DAS_REPEAT = 0.12 # Speed of auto-repeat
-
-
-
 # --- Colors & Style ---
 
 C_BLACK = (10, 10, 10)
@@ -333,102 +349,6 @@ def draw_heart(surface, x, y, size, active=True):
 
 
 
-class Polyomino:
-
-    # SHAPE DEFINITIONS
-
-    SHAPES = {
-
-        'I': [(-1, 0), (0, 0), (1, 0), (2, 0)],
-
-        'O': [(0, 0), (1, 0), (0, 1), (1, 1)],
-
-        'T': [(-1, 0), (0, 0), (1, 0), (0, 1)],
-
-        'S': [(-1, 0), (0, 0), (0, 1), (1, 1)],
-
-        'Z': [(-1, 1), (0, 1), (0, 0), (1, 0)],
-
-        'J': [(-1, 0), (0, 0), (1, 0), (1, -1)],
-
-        'L': [(-1, 0), (0, 0), (1, 0), (-1, -1)]
-
-    }
-
-    COLORS = {
-
-        'I': (0, 255, 255), 'O': (255, 255, 0), 'T': (128, 0, 128),
-
-        'S': (0, 255, 0), 'Z': (255, 0, 0), 'J': (0, 0, 255), 'L': (255, 165, 0)
-
-    }
-
-
-
-    def __init__(self, shape_key):
-
-        self.x = GRID_WIDTH // 2 - 1
-
-        self.y = 0  
-
-        self.shape_key = shape_key
-
-        self.name = shape_key # Added for sprite mapping support
-
-        self.blocks = list(self.SHAPES[shape_key])
-
-        self.color = self.COLORS[shape_key]
-
-        self.rotation_index = 0
-
-
-
-    def rotate(self, direction=1):
-
-        if self.shape_key == 'O': return
-
-        new_blocks = []
-
-        for block in self.blocks:
-
-            bx, by = block
-
-            if direction == 1: new_x, new_y = -by, bx
-
-            else: new_x, new_y = by, -bx
-
-            new_blocks.append((new_x, new_y))
-
-        self.blocks = new_blocks
-
-
-
-class Spawner:
-
-    def __init__(self):
-
-        self.bag = []
-
-        self.fill_bag()
-
-
-
-    def fill_bag(self):
-
-        self.bag = ['I', 'O', 'T', 'S', 'Z', 'J', 'L']
-
-        random.shuffle(self.bag)
-
-
-
-    def get_next_piece(self):
-
-        if len(self.bag) == 0: self.fill_bag()
-
-        return Polyomino(self.bag.pop(0))
-
-
-
 class SpriteManager:
 
     def __init__(self):
@@ -775,6 +695,126 @@ class BackgroundElement:
 
 
 
+# --- Enemy Frame Atlas ---
+
+# Every enemy of a type shares the same directional frames; flip each source frame list once per process.
+
+_enemy_frame_atlas = {}
+
+
+
+def get_flipped_frames(frames):
+
+    """Returns a shared list of frames mirrored to face right"""
+
+    key = tuple(map(id, frames))
+
+    entry = _enemy_frame_atlas.get(key)
+
+    if entry is None:
+
+        # Hold the source frames so their ids can't be reused by other surfaces
+
+        entry = (list(frames), [pygame.transform.flip(f, True, False) for f in frames])
+
+        _enemy_frame_atlas[key] = entry
+
+    return entry[1]
+
+
+
+# Power-up frames need a per-pixel alpha fix; build them once per variant
+
+_item_frame_atlas = {}
+
+
+
+def clear_near_black(img):
+
+    """Returns a copy with near-black pixels made transparent (set_colorkey is ignored on alpha surfaces)"""
+
+    img = img.copy()
+
+    img.lock()
+
+    for x in range(img.get_width()):
+
+        for y in range(img.get_height()):
+
+            c = img.get_at((x, y))
+
+            if c[0] < 10 and c[1] < 10 and c[2] < 10: # Near black
+
+                img.set_at((x, y), (0, 0, 0, 0))
+
+    img.unlock()
+
+    return img
+
+
+
+# --- Sprite Variant Cache ---
+
+# Mega-mode 2x scaling and the red hit-flash are pure functions of the source frame; build each lazily once.
+
+SPRITE_VARIANT_CACHE_SIZE = 256
+
+_sprite_variants = OrderedDict()
+
+sprite_variant_stats = {'hits': 0, 'misses': 0} # Read by profiling tools
+
+sound_stats = {'plays': 0} # Read by profiling tools
+
+
+
+def get_sprite_variant(img, variant):
+
+    """Returns a cached 'mega' (2x) or 'hit_flash' (red tint) version of img"""
+
+    key = (id(img), variant)
+
+    entry = _sprite_variants.get(key)
+
+    if entry is not None:
+
+        sprite_variant_stats['hits'] += 1
+
+        _sprite_variants.move_to_end(key)
+
+        return entry[1]
+
+
+
+    sprite_variant_stats['misses'] += 1
+
+    if variant == 'mega':
+
+        w, h = img.get_size()
+
+        out = pygame.transform.scale(img, (int(w*2), int(h*2)))
+
+    elif variant == 'hit_flash':
+
+        out = img.copy()
+
+        out.fill((255, 100, 100), special_flags=pygame.BLEND_RGB_ADD)
+
+    else:
+
+        raise ValueError(f"Unknown sprite variant: {variant}")
+
+    # Keep the source alive so its id can't be reused while cached
+
+    _sprite_variants[key] = (img, out)
+
+    if len(_sprite_variants) > SPRITE_VARIANT_CACHE_SIZE:
+
+        _sprite_variants.popitem(last=False) # Evict least recently used
+
+    return out
+
+
+
 class Turtle:
 
     ENEMY_TYPE = 'green'
@@ -827,23 +867,23 @@ class Turtle:
 
         # Generate directional frames
 
-        # All enemies face LEFT in sprite sheet - flip to create RIGHT
+        # All enemies face LEFT in sprite sheet - RIGHT comes from the shared atlas
 
         self.walk_frames_left = self.walk_frames
 
-        self.walk_frames_right = [pygame.transform.flip(f, True, False) for f in self.walk_frames_left]
+        self.walk_frames_right = get_flipped_frames(self.walk_frames_left)
 
         
 
         self.fly_frames_left = self.fly_frames
 
-        self.fly_frames_right = [pygame.transform.flip(f, True, False) for f in self.fly_frames_left]
+        self.fly_frames_right = get_flipped_frames(self.fly_frames_left)
 
         
 
         self.shell_frames_left = self.shell_frames
 
-        self.shell_frames_right = [pygame.transform.flip(f, True, False) for f in self.shell_frames_left]
+        self.shell_frames_right = get_flipped_frames(self.shell_frames_left)
 
         
 
@@ -1325,9 +1365,7 @@ class Turtle:
 
             if scale != 1.0:
 
-                w, h = img.get_size()
-
-                img = pygame.transform.scale(img, (int(w*scale), int(h*scale)))
+                img = get_sprite_variant(img, 'mega')
 
             
 
@@ -1391,25 +1429,11 @@ class Turtle:
 
         
 
-        score = 500
-
-        if self.is_golden:
-
-            game.lives = min(game.lives + 1, 5)
-
-            game.sound_manager.play('life')
-
-            score = 2500
+        # The rules count it (and hand out the golden / every-5th 1UP)
 
-        else:
-
-            game.turtles_stomped += 1
-
-            if game.turtles_stomped % 5 == 0:
-
-                game.lives = min(game.lives + 1, 5)
+        game.queue_input('stomp_golden' if self.is_golden else 'stomp')
 
-                game.sound_manager.play('life')
+        score = 2500 if self.is_golden else 500
 
                 
 
@@ -1451,11 +1475,13 @@ class Spiny(Turtle):
 
         if not self.shell_frames:
 
-            self.shell_frames = self.walk_frames[:] if self.walk_frames else []
+            # Frame lists are shared by all Spinies, so reference them instead of copying
 
-            self.shell_frames_left = self.walk_frames_left[:] if self.walk_frames_left else []
+            self.shell_frames = self.walk_frames
 
-            self.shell_frames_right = self.walk_frames_right[:] if self.walk_frames_right else []
+            self.shell_frames_left = self.walk_frames_left
+
+            self.shell_frames_right = self.walk_frames_right
 
             
 
@@ -1723,7 +1749,35 @@ class MagicMushroom(Turtle):
 
         
 
-        # Load Correct Sprite
+        # Load Correct Sprite (shared by every mushroom of this type)
+
+        frames = _item_frame_atlas.get(('mushroom', self.m_type))
+
+        if frames is None:
+
+            frames = [self.load_sprite()]
+
+            _item_frame_atlas[('mushroom', self.m_type)] = frames
+
+        self.walk_frames = frames
+
+        self.walk_frames_left = frames
+
+        self.walk_frames_right = frames
+
+             
+
+        self.fly_frames_left = []
+
+        self.fly_frames_right = []
+
+        self.shell_frames_left = []
+
+        self.shell_frames_right = []
+
+        
+
+    def load_sprite(self):
 
         sprite_name = 'mushroom_1up' # Default Green
 
@@ -1765,53 +1819,13 @@ class MagicMushroom(Turtle):
 
         if img:
 
-            # Fix transparency Manual (set_colorkey ignored on alpha surfaces)
-
-            img = img.copy() # Ensure unique copy
-
-            img.lock()
-
-            for x in range(img.get_width()):
-
-                for y in range(img.get_height()):
-
-                    c = img.get_at((x, y))
-
-                    if c[0] < 10 and c[1] < 10 and c[2] < 10: # Near black
-
-                        img.set_at((x, y), (0, 0, 0, 0))
-
-            img.unlock()
-
-            
-
-            self.walk_frames = [img]
-
-            self.walk_frames_left = [img]
-
-            self.walk_frames_right = [img]
-
-        else:
-
-             fallback = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE))
-
-             fallback.fill((0,255,0))
-
-             self.walk_frames = [fallback]
-
-             self.walk_frames_left = [fallback]
-
-             self.walk_frames_right = [fallback]
-
-             
-
-        self.fly_frames_left = []
+            return clear_near_black(img)
 
-        self.fly_frames_right = []
+        fallback = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE))
 
-        self.shell_frames_left = []
+        fallback.fill((0,255,0))
 
-        self.shell_frames_right = []
+        return fallback
 
         
 
@@ -2025,9 +2039,7 @@ class MagicMushroom(Turtle):
 
         """Collecting the mushroom gives 1UP!"""
 
-        game.sound_manager.play('life')
-
-        game.lives = min(game.lives + 1, 5)
+        game.queue_input('collect_mushroom')
 
         game.popups.append(PopupText(PLAYFIELD_X + self.x*BLOCK_SIZE, PLAYFIELD_Y + self.y*BLOCK_SIZE, "1UP!", (255, 215, 0)))
 
@@ -2065,83 +2077,69 @@ class MagicStar(Turtle):
 
         
 
-        # Load animated star sprites (cycles through colors)
-
-        self.star_frames = []
-
-        for i in range(1, 5):
-
-            frame = self.tetris.sprite_manager.get_sprite('items', f'star_{i}', scale_factor=2.0)
-
-            if frame:
-
-                # Fix using Manual Alpha Clearing
+        # Load animated star sprites (cycles through colors), shared by every star
 
-                frame = frame.copy()
+        self.star_frames = _item_frame_atlas.get('star')
 
-                frame.lock()
+        if self.star_frames is None:
 
-                for x in range(frame.get_width()):
+            self.star_frames = self.load_frames()
 
-                    for y in range(frame.get_height()):
+            _item_frame_atlas['star'] = self.star_frames
 
-                        c = frame.get_at((x, y))
+        self.walk_frames = self.star_frames
 
-                        if c[0] < 10 and c[1] < 10 and c[2] < 10:
+        self.walk_frames_left = self.star_frames
 
-                            frame.set_at((x, y), (0, 0, 0, 0))
-
-                frame.unlock()
-
-                self.star_frames.append(frame)
+        self.walk_frames_right = self.star_frames
 
         
 
-        if self.star_frames:
+        self.fly_frames_left = []
 
-            self.walk_frames = self.star_frames
+        self.fly_frames_right = []
 
-            self.walk_frames_left = self.star_frames
+        self.shell_frames_left = []
 
-            self.walk_frames_right = self.star_frames
+        self.shell_frames_right = []
 
-        else:
+        self.animation_speed = 100  # Faster animation for rainbow effect
 
-            # Fallback - yellow star
+        
 
-            fallback = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE), pygame.SRCALPHA)
+    def load_frames(self):
 
-            pygame.draw.polygon(fallback, (255, 255, 0), [
+        frames = []
 
-                (BLOCK_SIZE//2, 0), (BLOCK_SIZE*0.6, BLOCK_SIZE*0.4),
+        for i in range(1, 5):
 
-                (BLOCK_SIZE, BLOCK_SIZE*0.4), (BLOCK_SIZE*0.7, BLOCK_SIZE*0.6),
+            frame = self.tetris.sprite_manager.get_sprite('items', f'star_{i}', scale_factor=2.0)
 
-                (BLOCK_SIZE*0.8, BLOCK_SIZE), (BLOCK_SIZE//2, BLOCK_SIZE*0.75),
+            if frame: frames.append(clear_near_black(frame))
 
-                (BLOCK_SIZE*0.2, BLOCK_SIZE), (BLOCK_SIZE*0.3, BLOCK_SIZE*0.6),
+        if frames: return frames
 
-                (0, BLOCK_SIZE*0.4), (BLOCK_SIZE*0.4, BLOCK_SIZE*0.4)
+        
 
-            ])
+        # Fallback - yellow star
 
-            self.walk_frames = [fallback]
+        fallback = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE), pygame.SRCALPHA)
 
-            self.walk_frames_left = [fallback]
+        pygame.draw.polygon(fallback, (255, 255, 0), [
 
-            self.walk_frames_right = [fallback]
+            (BLOCK_SIZE//2, 0), (BLOCK_SIZE*0.6, BLOCK_SIZE*0.4),
 
-        
+            (BLOCK_SIZE, BLOCK_SIZE*0.4), (BLOCK_SIZE*0.7, BLOCK_SIZE*0.6),
 
-        self.fly_frames_left = []
+            (BLOCK_SIZE*0.8, BLOCK_SIZE), (BLOCK_SIZE//2, BLOCK_SIZE*0.75),
 
-        self.fly_frames_right = []
+            (BLOCK_SIZE*0.2, BLOCK_SIZE), (BLOCK_SIZE*0.3, BLOCK_SIZE*0.6),
 
-        self.shell_frames_left = []
+            (0, BLOCK_SIZE*0.4), (BLOCK_SIZE*0.4, BLOCK_SIZE*0.4)
 
-        self.shell_frames_right = []
+        ])
 
-        self.animation_speed = 100  # Faster animation for rainbow effect
+        return [fallback]
 
         
 
@@ -2347,11 +2345,7 @@ class MagicStar(Turtle):
 
         """Collecting the star gives 30 seconds of invincibility!"""
 
-        game.sound_manager.play('life')
-
-        game.star_active = True
-
-        game.star_timer = 30.0  # 30 seconds of invincibility!
+        game.queue_input('collect_star') # 30 seconds of invincibility!
 
         game.popups.append(PopupText(PLAYFIELD_X + self.x*BLOCK_SIZE, PLAYFIELD_Y + self.y*BLOCK_SIZE, "STAR POWER!", (255, 255, 0)))
 
@@ -2361,6 +2355,12 @@ class MagicStar(Turtle):
 
 
 
+# Sprite classes for the enemy kinds GameState spawns (src.simulation.SPAWN_KINDS; golden and mushrooms are special-cased)
+
+ENEMY_CLASSES = {'green': Turtle, 'red': RedTurtle, 'blooper': Blooper, 'hammer_bro': HammerBro, 'piranha': Piranha, 'spiny': Spiny}
+
+
+
 class Cloud:
 
     def __init__(self, sprite_manager):
@@ -2433,7 +2433,7 @@ class PopupText:
 
             font = font_map.get(self.size, font_map['small'])
 
-            surf = font.render(self.text, True, self.color)
+            surf = render_text(font, self.text, True, self.color)
 
             rect = surf.get_rect(center=(self.x, self.y))
 
@@ -3385,134 +3385,82 @@ class Lakitu(Turtle):
 
 
 
-class BossFireball:
+def draw_boss_fireball(surface, fb, sprite_manager):
 
-    def __init__(self, x, y, sprite_manager):
+    """Draws one of the boss's fireballs (src.simulation.Fireball)"""
 
-        self.x = x
+    px = PLAYFIELD_X + (fb.x - 0.5) * BLOCK_SIZE
 
-        self.y = y
+    py = PLAYFIELD_Y + (fb.y - 0.5) * BLOCK_SIZE
 
-        self.vy = -4.0  # Slower fireballs (was -6)
+    # Use fireball animation or fallback
 
-        self.sprite_manager = sprite_manager
+    frames = sprite_manager.get_animation_frames('bowser', prefix='fire')
 
-        self.width = 1.0
+    if not frames:
 
-        self.height = 1.0
+        pygame.draw.circle(surface, (255, 100, 0), (int(px + BLOCK_SIZE//2), int(py + BLOCK_SIZE//2)), 12)
 
-        self.timer = 0
+    else:
 
-        
+        idx = int(fb.timer * 10) % len(frames)
 
-    def update(self, dt):
+        surface.blit(frames[idx], (px, py))
 
-        self.y += self.vy * dt
 
-        self.timer += dt
 
-        
+class BigBoss:
 
-    def draw(self, surface):
+    """Draws the boss GameState runs (src.simulation.Boss): position, HP and fireballs come from there"""
 
-        px = PLAYFIELD_X + (self.x - 0.5) * BLOCK_SIZE
+    def __init__(self, tetris_ref, boss):
 
-        py = PLAYFIELD_Y + (self.y - 0.5) * BLOCK_SIZE
+        self.tetris = tetris_ref
 
-        # Use fireball animation or fallback
+        self.boss = boss
 
-        frames = self.sprite_manager.get_animation_frames('bowser', prefix='fire')
+        self.hit_timer = 0
 
-        if not frames:
+        
 
-            pygame.draw.circle(surface, (255, 100, 0), (int(px + BLOCK_SIZE//2), int(py + BLOCK_SIZE//2)), 12)
+        # Load Bowser Animation from spritesheet
 
-        else:
+        self.frames = tetris_ref.sprite_manager.get_animation_frames('bowser', scale_factor=3.0, prefix='walk')
 
-            idx = int(self.timer * 10) % len(frames)
+        if not self.frames:
 
-            surface.blit(frames[idx], (px, py))
+            # Fallback to big turtle if bowser missing in assets.json
 
+            self.frames = tetris_ref.sprite_manager.get_animation_frames('koopa_red', scale_factor=6.0, prefix='walk')
 
+            
 
-class BigBoss:
+        self.frame_index = 0
 
-    def __init__(self, tetris_ref):
+        self.anim_timer = 0
 
-        self.tetris = tetris_ref
 
-        self.x = GRID_WIDTH // 2 - 1.5
 
-        self.y = GRID_HEIGHT - 1.0
+    x = property(lambda self: self.boss.x)
 
-        self.width = 3.0
+    y = property(lambda self: self.boss.y)
 
-        self.height = 3.0
+    width = property(lambda self: self.boss.width)
 
-        self.speed = 2.0
-
-        self.direction = 1
-
-        self.hp = 100
-
-        self.max_hp = 100
-
-        self.hit_timer = 0
-
-        
-
-        # Load Bowser Animation from spritesheet
-
-        self.frames = tetris_ref.sprite_manager.get_animation_frames('bowser', scale_factor=3.0, prefix='walk')
-
-        if not self.frames:
-
-            # Fallback to big turtle if bowser missing in assets.json
-
-            self.frames = tetris_ref.sprite_manager.get_animation_frames('koopa_red', scale_factor=6.0, prefix='walk')
-
-            
+    height = property(lambda self: self.boss.height)
 
-        self.frame_index = 0
+    direction = property(lambda self: self.boss.direction)
 
-        self.anim_timer = 0
+    hp = property(lambda self: self.boss.hp)
 
-        self.attack_timer = 5.0
+    max_hp = property(lambda self: self.boss.max_hp)
 
-        self.fireballs = []
+    fireballs = property(lambda self: self.boss.fireballs)
 
         
 
     def update(self, dt):
 
-        # Move back and forth
-
-        # Speed up as HP drops
-
-        health_pct = max(0.2, self.hp / self.max_hp)
-
-        current_speed = self.speed * (1.0 + (1.0 - health_pct) * 2.0)
-
-        self.x += self.direction * current_speed * dt
-
-        
-
-        # Boundary check
-
-        if self.x < 0:
-
-            self.x = 0
-
-            self.direction = 1
-
-        elif self.x > GRID_WIDTH - self.width:
-
-            self.x = GRID_WIDTH - self.width
-
-            self.direction = -1
-
-            
-
         # Animation
 
         self.anim_timer += dt
@@ -3533,66 +3481,6 @@ class BigBoss:
 
             
 
-        # Attack Logic - More forgiving
-
-        self.attack_timer -= dt
-
-        if self.attack_timer <= 0:
-
-            # SHOOT FIREBALL
-
-            self.attack_timer = 6.0 * health_pct + 2.5 # Slower attacks, more time to react
-
-            fb = BossFireball(self.x + 1.5, self.y - 2.0, self.tetris.sprite_manager)
-
-            self.fireballs.append(fb)
-
-            self.tetris.sound_manager.play('fireball')
-
-            
-
-        # Update Fireballs
-
-        for fb in self.fireballs[:]:
-
-            fb.update(dt)
-
-            if fb.y < -2:
-
-                 self.fireballs.remove(fb)
-
-                 
-
-            # Hit check with current piece
-
-            if self.tetris.current_piece:
-
-                p = self.tetris.current_piece
-
-                for bx, by in p.blocks:
-
-                    gx, gy = p.x + bx, p.y + by
-
-                    if abs(gx - fb.x) < 1.0 and abs(gy - fb.y) < 1.0:
-
-                         # Hit! - Break the piece or add garbage?
-
-                         # For now, just cancel the piece and add a penalty
-
-                         self.tetris.sound_manager.play('damage')
-
-                         self.tetris.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "PIECE DESTROYED!", C_RED))
-
-                         self.tetris.current_piece = self.tetris.next_piece
-
-                         self.tetris.next_piece = self.tetris.spawner.get_next_piece()
-
-                         if fb in self.fireballs: self.fireballs.remove(fb)
-
-                         break
-
-            
-
     def draw(self, surface):
 
         px = PLAYFIELD_X + self.x * BLOCK_SIZE
@@ -3645,7 +3533,7 @@ class BigBoss:
 
         for fb in self.fireballs:
 
-            fb.draw(surface)
+            draw_boss_fireball(surface, fb, self.tetris.sprite_manager)
 
         
 
@@ -3747,479 +3635,459 @@ def draw_3d_block(surface, color, x, y, size):
 
 
 
-class Block:
+# Margin around the playfield covered by the border glow
 
-    def __init__(self, color, block_type='normal', sprite_data=None):
+CHROME_PAD = 8
 
-        self.color = color
 
-        self.type = block_type
 
-        self.anim_offset = random.random() * 10 
+# --- Gem Tile Cache ---
 
-        self.hit = False
+# draw_3d_block is a per-row gradient + alpha highlight; render each (color, size) once and blit it.
 
-        self.sprite_data = sprite_data # {'sprite': '...', 'category': '...'}
+# Bounded LRU because garbage/theme colors and preview sizes multiply the key space.
 
+GEM_TILE_CACHE_SIZE = 64
 
+_gem_tile_cache = OrderedDict()
 
-    def get_image(self, sprite_manager, timer):
 
-        # 1. New Sprite Mapping System
 
-        if self.sprite_data:
+def get_gem_tile(color, size):
 
-            cat = self.sprite_data.get('category')
+    """Returns a cached opaque tile identical to draw_3d_block(color, size)"""
 
-            name = self.sprite_data.get('sprite')
+    key = (tuple(color[:3]), size)
 
-            
+    tile = _gem_tile_cache.get(key)
 
-            # Support pre-loaded/modified Surfaces (e.g. tinted blocks)
+    if tile is not None:
 
-            if isinstance(name, pygame.Surface):
+        _gem_tile_cache.move_to_end(key)
 
-                return name
+        return tile
 
 
 
-            
+    tile = pygame.Surface((size, size))
 
-            # 2. Animated Enemies
+    draw_3d_block(tile, color, 0, 0, size)
 
-            if cat in ['koopa_green', 'koopa_red', 'spiny']:
+    _gem_tile_cache[key] = tile
 
-                # Use frames. Note: we need to handle "walk" prefix or not
+    if len(_gem_tile_cache) > GEM_TILE_CACHE_SIZE:
 
-                frames = sprite_manager.get_animation_frames(cat, prefix='walk', scale_factor=2.0)
+        _gem_tile_cache.popitem(last=False) # Evict least recently used
 
-                if not frames and 'walk_1' in name: # Fallback if specific sprite name given
+    return tile
 
-                     pass 
 
-                
 
-                if frames:
+def blit_3d_block(surface, color, x, y, size):
 
-                    # Animation speed
+    """Cached drop-in for draw_3d_block"""
 
-                    idx = int((timer + self.anim_offset) * 6) % len(frames)
+    surface.blit(get_gem_tile(color, size), (x, y))
 
-                    return frames[idx]
 
-            
 
-            # 3. Static Items / Blocks
+class Grid(Playfield):
 
-            # Map category to sheet name in assets.json keys
+    """Playfield plus its drawing: a retained layer of locked blocks, the chrome and the faded inactive world"""
 
-            # 'blocks', 'items' are direct keys.
+    def __init__(self, sprite_manager):
 
-            img = sprite_manager.get_sprite(cat, name, scale_factor=2.0)
+        super().__init__()
 
-            if img: return img
+        self.sprite_manager = sprite_manager
 
+        self.animation_timer = 0
 
 
-        # Fallbacks for legacy types
 
-        if self.type == 'question':
+        # Retained Playfield Layer
 
-            if self.hit:
+        # Locked blocks are painted once; only dirty + animated cells are repainted per frame
 
-                return sprite_manager.get_sprite('blocks', 'empty', scale_factor=2.0)
+        self.layer_surf = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT), pygame.SRCALPHA)
 
-            f_idx = int((timer * 2 + self.anim_offset) % 3) + 1
+        self.layer_source = None # Grid list the layer was painted from (None = full repaint)
 
-            return sprite_manager.get_sprite('blocks', f'question_{f_idx}', scale_factor=2.0)
+        self.dirty_cells = set()
 
-            
+        self.animated_cells = set()
 
-        if self.type == 'brick':
 
-            return sprite_manager.get_sprite('blocks', 'brick', scale_factor=2.0)
 
-            
+        # Cached playfield chrome (background + grid pattern + glow), keyed by theme colors
 
-        if self.type == 'coin':
+        self.chrome_surf = None
 
-            frames = [1, 2, 3, 2]
+        self.chrome_key = None
 
-            f_idx = frames[int((timer * 8 + self.anim_offset) % 4)]
 
-            return sprite_manager.get_sprite('items', f'coin_{f_idx}', scale_factor=2.0)
 
-            
+        # Cached faded composite of the inactive world
 
-        return None
+        self.ghost_surf = None
 
+        self.ghost_source = None
 
+        self.ghost_alpha = None
 
-class Grid:
 
-    def __init__(self, sprite_manager):
 
-        self.sprite_manager = sprite_manager
+    # Rules live in Playfield; these overrides only keep the cached layers in step with the cells
 
-        # Dual World Data
 
-        self.grid_neon = [[None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
 
-        self.grid_shadow = [[None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+    def mark_dirty(self, x, y):
 
-        
+        """Call after changing grid[y][x] directly"""
 
-        self.active_world = 'NEON'
+        self.dirty_cells.add((x, y))
 
-        self.grid = self.grid_neon # Active Grid Pointer
+        super().mark_dirty(x, y)
 
-        self.animation_timer = 0
 
-    
 
-    def set_world(self, world_name):
+    def mark_rows_dirty(self, rows):
 
-        self.active_world = world_name
+        self.dirty_cells.update((x, y) for y in rows for x in range(GRID_WIDTH))
 
-        if world_name == 'SHADOW': self.grid = self.grid_shadow
+        super().mark_rows_dirty(rows)
 
-        else: self.grid = self.grid_neon
 
 
+    def invalidate(self):
 
-    def check_collision_in_world(self, piece, world_name):
+        """Force a full repaint + reindex of the playfield (bulk edits, garbage, layouts)"""
 
-        target_grid = self.grid_shadow if world_name == 'SHADOW' else self.grid_neon
+        super().invalidate()
 
-        for bx, by in piece.blocks:
+        self.layer_source = None
 
-            gx, gy = int(piece.x + bx), int(piece.y + by)
+        self.ghost_source = None
 
-            if gx < 0 or gx >= GRID_WIDTH or gy >= GRID_HEIGHT: return True
 
-            if gy >= 0 and target_grid[gy][gx] is not None: return True
 
-        return False
+    def push_garbage_row(self, new_row):
 
+        super().push_garbage_row(new_row)
 
+        self.layer_source = None # Every row shifted up - repaint the layer
 
-    def check_collision(self, piece, inverted_gravity=False):
 
-        if not hasattr(piece, 'blocks'):
 
-             return False
+    def set_world(self, world_name):
 
-             
+        super().set_world(world_name)
 
-        for bx, by in piece.blocks:
+        self.ghost_source = None # Swapped worlds - the faded layer is now the other grid
 
-            gx, gy = int(piece.x + bx), int(piece.y + by)
 
-            
 
-            # Wall Collision (Left/Right)
+    def piece_sprite_data(self, piece):
 
-            if gx < 0 or gx >= GRID_WIDTH: return True
+        # Retrieve sprite data from config based on piece name
 
-            
+        t_data = TETROMINO_DATA.get(piece.name, {})
 
-            # Floor Collision (Normal)
+        if 'sprite' in t_data:
 
-            if not inverted_gravity and gy >= GRID_HEIGHT: return True
+            return {'sprite': t_data['sprite'], 'category': t_data['category']}
 
-            
+        return None
 
-            # Ceiling Collision (Antigravity)
 
-            if inverted_gravity and gy < 0: return True
 
-            
+    def clear_lines(self):
 
-            # Block Collision
+        lines_cleared, special_events, completed_line_indices = super().clear_lines()
 
-            # Note: valid Y range is 0 to GRID_HEIGHT-1
+        if completed_line_indices:
 
-            if 0 <= gy < GRID_HEIGHT:
+            # Retained layer: rows above the lowest cleared line shifted down
 
-                 if self.grid[gy][gx] is not None: return True
+            self.dirty_cells.update((x, y) for y in range(max(completed_line_indices) + 1) for x in range(GRID_WIDTH))
 
-                 
+        return lines_cleared, special_events, completed_line_indices
 
-        return False
 
 
+    def draw(self, screen, total_time, draw_bg=True, alpha=255, level=1, bg_color=None, accent_color=None):
 
-    def lock_piece(self, piece):
+        # Draw Background (pre-composited chrome, rebuilt only when the theme colors change)
 
-        # Retrieve sprite data from config based on piece name
+        if draw_bg:
 
-        t_data = TETROMINO_DATA.get(piece.name, {})
+            # Use passed color or default
 
-        sprite_data = None
+            bg_col = bg_color if bg_color else (20, 20, 40)
 
-        if 'sprite' in t_data:
+            glow_color = accent_color if accent_color else ((100, 100, 255) if level % 2 == 0 else (255, 100, 100))
 
-            sprite_data = {'sprite': t_data['sprite'], 'category': t_data['category']}
 
-            
 
-        for bx, by in piece.blocks:
+            chrome_key = (tuple(bg_col), tuple(glow_color))
 
-            gx, gy = int(piece.x + bx), int(piece.y + by)
+            if chrome_key != self.chrome_key:
 
-            if 0 <= gy < GRID_HEIGHT and 0 <= gx < GRID_WIDTH:
+                self.chrome_surf = self._build_chrome(bg_col, glow_color)
 
-                self.grid[gy][gx] = Block(piece.color, sprite_data=sprite_data)
+                self.chrome_key = chrome_key
 
+            screen.blit(self.chrome_surf, (PLAYFIELD_X - CHROME_PAD, PLAYFIELD_Y - CHROME_PAD))
 
 
-    def clear_lines(self):
 
-        lines_cleared = 0
+        # 1. Draw Inactive World (Ghost) - 15% Opacity
 
-        special_events = [] # For coins, items etc
+        ghost_grid = self.grid_shadow if self.active_world == 'NEON' else self.grid_neon
 
-        completed_line_indices = []  # Track which lines are complete for animation
+        self._render_layer(screen, ghost_grid, total_time, alpha=40)
 
         
 
-        rows_to_keep = []
+        # 2. Draw Active World - 100% Opacity
 
-        for y in range(GRID_HEIGHT):
+        self._render_layer(screen, self.grid, total_time, alpha=255)
 
-            cols = [self.grid[y][x] for x in range(GRID_WIDTH)]
 
-            if None in cols:
 
-                rows_to_keep.append(cols)
+        # 3. Draw Ground Row (Decorative)
 
-            else:
+        # The old inline glow loop reused `alpha`, so the ground row only ever showed without the chrome; kept that way
 
-                # Check for unclearable blocks
+        if alpha == 255 and not draw_bg and hasattr(self, 'ground_row') and self.ground_row:
 
-                unclearable = False
+             py = PLAYFIELD_Y + GRID_HEIGHT * BLOCK_SIZE
 
-                for block in cols:
+             for x, sprite in enumerate(self.ground_row):
 
-                    if block and getattr(block, 'type', '') in ['solid', 'ground']:
+                 if sprite:
 
-                        unclearable = True
+                     px = PLAYFIELD_X + x * BLOCK_SIZE
 
-                        break
+                     screen.blit(sprite, (px, py))
 
-                
+                     
 
-                if unclearable:
+    def _build_chrome(self, bg_col, glow_color):
 
-                     rows_to_keep.append(cols)
+        """Background, grid pattern and border glow as one surface (padded for the outer glow)"""
 
-                else:
+        chrome = pygame.Surface((PLAYFIELD_WIDTH + CHROME_PAD * 2, PLAYFIELD_HEIGHT + CHROME_PAD * 2), pygame.SRCALPHA)
 
-                    lines_cleared += 1
+        chrome.fill((0, 0, 0, 0))
 
-                    completed_line_indices.append(y)  # Save line index for animation
+        bg_rect = (CHROME_PAD, CHROME_PAD, PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT)
 
-                # Check for special blocks in this line
 
-                has_garbage = False
 
-                for block in cols:
+        # Darken the background color slightly for the playfield
 
-                    if block and getattr(block, 'type', '') == 'brick': has_garbage = True
+        dark_bg = [max(0, c - 40) for c in bg_col]
 
-                    if block and block.type == 'coin': special_events.append('COIN')
 
-                    if block and block.type == 'question': special_events.append('ITEM')
 
-                if has_garbage: special_events.append('BRICK_CLEAR')
+        # Premium Background: Vertical Gradient
 
-        
+        r, g, b = dark_bg
 
-        while len(rows_to_keep) < GRID_HEIGHT:
+        # Fill with solid first for safety
 
-            rows_to_keep.insert(0, [None] * GRID_WIDTH)
+        pygame.draw.rect(chrome, dark_bg, bg_rect)
 
-            
 
-        # Update references
 
-        if self.active_world == 'SHADOW': self.grid_shadow = rows_to_keep
+        # OVERLAY Gradient
 
-        else: self.grid_neon = rows_to_keep
+        # for i in range(PLAYFIELD_HEIGHT):
 
-        self.grid = rows_to_keep # Update Pointer
+        #     # Gradient factor (darker at bottom)
 
-        
+        #     f = 1.0 - (i / PLAYFIELD_HEIGHT) * 0.3
 
-        return lines_cleared, special_events, completed_line_indices
+        #     col = (int(r * f), int(g * f), int(b * f))
 
+        #     pygame.draw.line(screen, col, (PLAYFIELD_X, PLAYFIELD_Y + i), (PLAYFIELD_X + PLAYFIELD_WIDTH, PLAYFIELD_Y + i))
 
 
-    def draw(self, screen, total_time, draw_bg=True, alpha=255, level=1, bg_color=None, accent_color=None):
 
-        # Draw Background 
+        # Pattern Overlay: Subtle Grid
 
-        if draw_bg:
+        grid_surf = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT), pygame.SRCALPHA)
 
-            bg_rect = (PLAYFIELD_X, PLAYFIELD_Y, PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT)
+        for x in range(0, PLAYFIELD_WIDTH, BLOCK_SIZE):
 
-            
+            pygame.draw.line(grid_surf, (0, 0, 0, 20), (x, 0), (x, PLAYFIELD_HEIGHT))
 
-            # Use passed color or default
+        for y in range(0, PLAYFIELD_HEIGHT, BLOCK_SIZE):
 
-            bg_col = bg_color if bg_color else (20, 20, 40)
+            pygame.draw.line(grid_surf, (0, 0, 0, 20), (0, y), (PLAYFIELD_WIDTH, y))
 
-            
+        chrome.blit(grid_surf, (CHROME_PAD, CHROME_PAD))
 
-            # Darken the background color slightly for the playfield
 
-            dark_bg = [max(0, c - 40) for c in bg_col]
 
-            
+        # Glow Effect (rings don't overlap, so the outer ones keep their own alpha for the final blit)
 
-            # Premium Background: Vertical Gradient
+        for i in range(5):
 
-            r, g, b = dark_bg
+            alpha = 100 - i * 20
 
-            # Fill with solid first for safety
+            s_glow = pygame.Surface((PLAYFIELD_WIDTH + i*4, PLAYFIELD_HEIGHT + i*4), pygame.SRCALPHA)
 
-            pygame.draw.rect(screen, dark_bg, bg_rect)
+            msg_col = tuple(glow_color) + (alpha,)
 
-            
+            pygame.draw.rect(s_glow, msg_col, (0, 0, s_glow.get_width(), s_glow.get_height()), 2)
 
-            # OVERLAY Gradient
+            chrome.blit(s_glow, (CHROME_PAD - i*2, CHROME_PAD - i*2))
 
-            # for i in range(PLAYFIELD_HEIGHT):
+        # Inner line
 
-            #     # Gradient factor (darker at bottom)
+        pygame.draw.rect(chrome, (50, 50, 50), bg_rect, 1)
 
-            #     f = 1.0 - (i / PLAYFIELD_HEIGHT) * 0.3
+        return chrome
 
-            #     col = (int(r * f), int(g * f), int(b * f))
 
-            #     pygame.draw.line(screen, col, (PLAYFIELD_X, PLAYFIELD_Y + i), (PLAYFIELD_X + PLAYFIELD_WIDTH, PLAYFIELD_Y + i))
 
-            
+    def _render_layer(self, screen, grid_data, total_time, alpha=255):
 
-            # Pattern Overlay: Subtle Grid
+        if alpha == 255:
 
-            grid_surf = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT), pygame.SRCALPHA)
+            # Active world: blit the retained layer after repainting what changed
 
-            for x in range(0, PLAYFIELD_WIDTH, BLOCK_SIZE):
+            self._update_layer(grid_data, total_time)
 
-                pygame.draw.line(grid_surf, (0, 0, 0, 20), (x, 0), (x, PLAYFIELD_HEIGHT))
+            screen.blit(self.layer_surf, (PLAYFIELD_X, PLAYFIELD_Y))
 
-            for y in range(0, PLAYFIELD_HEIGHT, BLOCK_SIZE):
+            return
 
-                pygame.draw.line(grid_surf, (0, 0, 0, 20), (0, y), (PLAYFIELD_WIDTH, y))
 
-            screen.blit(grid_surf, (PLAYFIELD_X, PLAYFIELD_Y))
 
-            
+        # Faded layer (inactive world): it can't change while inactive, so composite it once
 
-            # Border Glow
+        if grid_data is not self.ghost_source or alpha != self.ghost_alpha:
 
-            glow_color = accent_color if accent_color else ((100, 100, 255) if level % 2 == 0 else (255, 100, 100))
+            self.ghost_surf = self._build_faded_layer(grid_data, total_time, alpha)
 
-            
+            self.ghost_source = grid_data
 
-            # Glow Effect
+            self.ghost_alpha = alpha
 
-            for i in range(5):
+        if self.ghost_surf:
 
-                alpha = 100 - i * 20
+            screen.blit(self.ghost_surf, (PLAYFIELD_X, PLAYFIELD_Y))
 
-                s_glow = pygame.Surface((PLAYFIELD_WIDTH + i*4, PLAYFIELD_HEIGHT + i*4), pygame.SRCALPHA)
 
-                msg_col = glow_color + (alpha,)
 
-                pygame.draw.rect(s_glow, msg_col, (0, 0, s_glow.get_width(), s_glow.get_height()), 2)
+    def _build_faded_layer(self, grid_data, total_time, alpha):
 
-                screen.blit(s_glow, (PLAYFIELD_X - i*2, PLAYFIELD_Y - i*2))
+        """Returns the grid drawn at `alpha` opacity, or None if it has no blocks"""
 
-            # Inner line
+        if not any(any(row) for row in grid_data): return None
 
-            pygame.draw.rect(screen, (50, 50, 50), bg_rect, 1)
 
 
+        target_surf = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT), pygame.SRCALPHA)
 
-            
+        target_surf.fill((0,0,0,0))
 
-        # 1. Draw Inactive World (Ghost) - 15% Opacity
 
-        ghost_grid = self.grid_shadow if self.active_world == 'NEON' else self.grid_neon
 
-        self._render_layer(screen, ghost_grid, total_time, alpha=40)
+        for y in range(GRID_HEIGHT):
 
-        
+            for x in range(GRID_WIDTH):
 
-        # 2. Draw Active World - 100% Opacity
+                block = grid_data[y][x]
 
-        self._render_layer(screen, self.grid, total_time, alpha=255)
+                if block:
 
+                     px, py = x * BLOCK_SIZE, y * BLOCK_SIZE
 
+                     img = block.get_image(self.sprite_manager, total_time)
 
-        # 3. Draw Ground Row (Decorative)
+                     if img: target_surf.blit(img, (px, py))
 
-        if alpha == 255 and hasattr(self, 'ground_row') and self.ground_row:
+                     else: blit_3d_block(target_surf, block.color, px, py, BLOCK_SIZE)
 
-             py = PLAYFIELD_Y + GRID_HEIGHT * BLOCK_SIZE
+                     # Grid Lines
 
-             for x, sprite in enumerate(self.ground_row):
+                     pygame.draw.rect(target_surf, (40, 40, 60), (px, py, BLOCK_SIZE, BLOCK_SIZE), 1)
 
-                 if sprite:
 
-                     px = PLAYFIELD_X + x * BLOCK_SIZE
 
-                     screen.blit(sprite, (px, py))
+        target_surf.set_alpha(alpha)
 
-                     
+        return target_surf
 
-    def _render_layer(self, screen, grid_data, total_time, alpha=255):
 
-        target_surf = screen
 
-        ox, oy = PLAYFIELD_X, PLAYFIELD_Y
+    def _update_layer(self, grid_data, total_time):
 
-        
+        if grid_data is not self.layer_source:
 
-        if alpha < 255:
+            # World swapped or grid replaced wholesale - repaint everything
 
-            target_surf = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT), pygame.SRCALPHA)
+            self.layer_source = grid_data
 
-            target_surf.fill((0,0,0,0))
+            self.layer_surf.fill((0, 0, 0, 0))
 
-            ox, oy = 0, 0
+            self.animated_cells = set()
 
-            
+            cells = [(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)]
 
-        for y in range(GRID_HEIGHT):
+        else:
 
-            for x in range(GRID_WIDTH):
+            cells = self.dirty_cells | self.animated_cells
 
-                block = grid_data[y][x]
+        self.dirty_cells = set()
 
-                if block:
 
-                     px, py = ox + x * BLOCK_SIZE, oy + y * BLOCK_SIZE
 
-                     img = block.get_image(self.sprite_manager, total_time)
+        for x, y in cells:
 
-                     if img: target_surf.blit(img, (px, py))
+            self._paint_cell(grid_data[y][x], x, y, total_time)
 
-                     else: draw_3d_block(target_surf, block.color, px, py, BLOCK_SIZE)
 
-                     # Grid Lines
 
-                     pygame.draw.rect(target_surf, (40, 40, 60), (px, py, BLOCK_SIZE, BLOCK_SIZE), 1)
+    def _paint_cell(self, block, x, y, total_time):
 
+        rect = pygame.Rect(x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE)
 
+        self.layer_surf.fill((0, 0, 0, 0), rect)
 
-        if alpha < 255:
+        if not block:
 
-            target_surf.set_alpha(alpha)
+            self.animated_cells.discard((x, y))
 
-            screen.blit(target_surf, (PLAYFIELD_X, PLAYFIELD_Y))
+            return
+
+
+
+        # Clip so oversized sprites don't bleed into neighbours that won't be repainted
+
+        self.layer_surf.set_clip(rect)
+
+        img = block.get_image(self.sprite_manager, total_time)
+
+        if img: self.layer_surf.blit(img, rect.topleft)
+
+        else: blit_3d_block(self.layer_surf, block.color, rect.x, rect.y, BLOCK_SIZE)
+
+        # Grid Lines
+
+        pygame.draw.rect(self.layer_surf, (40, 40, 60), rect, 1)
+
+        self.layer_surf.set_clip(None)
+
+
+
+        if block.is_animated(): self.animated_cells.add((x, y))
+
+        else: self.animated_cells.discard((x, y))
 
 
 
@@ -4403,6 +4271,8 @@ class SoundManager:
 
         if self.muted or name not in self.sounds: return
 
+        sound_stats['plays'] += 1
+
         try:
 
             # Use higher channels for SFX to not cut off music on Ch 0
@@ -5173,8 +5043,26 @@ class Tetris:
 
         self.clock = pygame.time.Clock()
 
+        self.step_clock = FixedStepClock()
+
+        self.interpolator = Interpolator()
+
+        self.profiler = FrameProfiler()
+
+        self.profiler.add_counter('sprite_builds', lambda: sprite_variant_stats['misses'], surfaces=True)
+
+        self.profiler.add_counter('font_renders', text_renders, cumulative=False, surfaces=True)
+
+        self.profiler.add_counter('sounds', lambda: sound_stats['plays'])
+
         self.game_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
 
+        self.overlays = OverlayManager((WINDOW_WIDTH, WINDOW_HEIGHT), row_size=(PLAYFIELD_WIDTH, BLOCK_SIZE))
+
+        self.presenter = PresentationStage((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+        self.presenter.dirty_rects_enabled = DIRTY_RECT_UPDATES
+
         
 
         # --- Init Assets ---
@@ -5193,8 +5081,6 @@ class Tetris:
 
         self.sprite_manager = init_asset_loader()
 
-        self.grid = Grid(self.sprite_manager)
-
         
 
         # Initialize Bonus Level now that loader is ready
@@ -5305,6 +5191,10 @@ class Tetris:
 
         # Tint Golden (Based on Walk frames)
 
+        # Rebuilt rather than appended so a second Tetris instance doesn't double the list
+
+        Tetris.GOLDEN_TURTLE_FRAMES = []
+
         for f in Tetris.TURTLE_FRAMES['walk']:
 
             gf = f.copy()
@@ -5439,6 +5329,8 @@ class Tetris:
 
         self.offset_y = (sh - (WINDOW_HEIGHT * self.scale)) // 2
 
+        self.presenter.configure(self.screen, self.game_surface, self.scale, (self.offset_x, self.offset_y))
+
         
 
     def get_game_coords(self, pos):
@@ -5455,48 +5347,40 @@ class Tetris:
 
     def reset_game(self):
 
-        # Basic Stats (Init first to prevent draw crashes)
-
-        self.auto_play = False 
-
-        self.ai_bot = TetrisBot(self) # Initialize Bot
+        # Rules state (board, pieces, score, lives, timers) is a GameState; SHARED_ATTRIBUTES reach it through self
 
-        self.shift_cooldown = 0
+        # Seeded so the session can be replayed
 
-        self.shadow_multiplier = 1
+        self.replay_seed = random.getrandbits(32)
 
-        
+        self.sim = GameState(self.replay_seed, grid=Grid(self.sprite_manager))
 
-        self.score = 0
+        self.sim_inputs = [] # Player inputs and entity reports for the next step()
 
-        self.displayed_score = 0 # For coin adding animation
+        self.recorder = ReplayRecorder(self.replay_seed, self.world, self.level_in_world) if REPLAY_RECORDING else None
 
-        self.lives = 3
+        self.versus_rng = random.Random() # Versus garbage holes; kept off the seeded self.sim.rng
 
-        self.hearts = 5 # SMB2 Health system
 
-        self.max_hearts = 5
 
-        self.coins = 0
+        # Basic Stats (Init first to prevent draw crashes)
 
-        self.turtles_stomped = 0
+        self.auto_play = False 
 
-        self.lines_since_mushroom = 0
+        self.ai_bot = TetrisBot(self) # Initialize Bot
 
-        self.level = 1
+        self.shift_cooldown = 0
 
-        self.world = 1
+        self.shadow_multiplier = 1
 
-        self.level_in_world = 1
+        
 
-        self.lines_this_level = 0
+        self.displayed_score = 0 # For coin adding animation
 
-        self.lines_cleared_total = 0
+        self.coins = 0
 
         self.total_time = 0
 
-        self.match_timer = 400.0 # SMB2 Countdown
-
         self.transition_timer = 0
 
         self.kills_this_level = 0 # Track for bonus spins
@@ -5525,26 +5409,10 @@ class Tetris:
 
             
 
-        # Init Spawner & Pieces
-
-        self.spawner = Spawner()
-
-        self.current_piece = self.spawner.get_next_piece()
-
-        self.next_piece = self.spawner.get_next_piece()
-
         self.turtles = []
 
-        self.turtles_stomped = 0
-
-        self.turtle_spawn_timer = 5.0
-
         self.stomp_combo = 0
 
-        self.frame_stomps = 0 
-
-        self.b2b_chain = 0
-
         
 
         self.line_flash_timer = 0
@@ -5553,18 +5421,6 @@ class Tetris:
 
         
 
-        # Level Progress
-
-        self.lines_required = 10
-
-        self.boss_hp = 0
-
-        self.max_boss_hp = 0
-
-        self.boss_garbage_timer = 0
-
-        self.is_boss_level = False
-
         self.big_boss = None
 
         
@@ -5573,7 +5429,9 @@ class Tetris:
 
         self.popups = []
 
-        self.effects = []
+        self.effects = [] # Objects with update/draw (hammers etc); particles live in self.particles
+
+        self.particles = ParticleSystem()
 
         
 
@@ -5605,123 +5463,93 @@ class Tetris:
 
         self.lakitu_timer = 0
 
-        self.p_wing_active = False
-
-        self.p_wing_timer = 0
-
-        self.star_active = False
-
-        self.star_timer = 0
-
         self.damage_flash_timer = 0
 
-        # Shared Grid
-
-        self.grid = Grid(self.sprite_manager)
-
         
 
-        self.fall_timer = 0
-
         self.is_losing_life = False
 
         self.world_clear_timer = 0
 
         
 
-        self.das_timer = 0
-
-        self.das_direction = 0
-
-        self.key_down_held = False
+        self.key_down_held = False # Soft drop state last sent to the rules
 
         
 
-        # New Gameplay Timers
-
-        self.match_timer = 400.0 # SMB2 style countdown
+        self.fall_speed = 0.8 # Initial fall speed
 
-        self.lock_timer = 0
 
-        self.max_lock_delay = 0.5 
 
-        self.lock_move_count = 0 
+        self.present_level()
 
-        self.max_lock_moves = 10
 
-        
 
-        self.fall_speed = 0.8 # Initial fall speed
+    def queue_input(self, name):
 
-        
+        """Queues a player input or entity report (src.simulation.INPUTS) for the next step()"""
 
-        # Mario Helper System
+        self.sim_inputs.append(name)
 
-        self.mario_helper_active = False
 
-        self.mario_helper_x = -100
 
-        self.mario_helper_timer = 0
+    def hold_down(self, held):
 
-        self.mario_helper_cooldown = 60.0  # Can trigger every 60 seconds
+        """Soft drop key state; the rules only hear about changes"""
 
-        self.lines_since_helper = 0  # Track lines cleared since last helper
+        if held != self.key_down_held:
 
+            self.key_down_held = held
 
+            self.queue_input('down_on' if held else 'down_off')
 
-        self.reset_level()
 
 
+    @property
 
-    def reset_level(self):
+    def boss_hp(self):
 
-        self.sprite_manager = self.sprite_manager # This line is redundant if sprite_manager is already self.sprite_manager
+        return self.sim.boss.hp if self.sim.boss else 0
 
-        self.grid.grid_neon = [[None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
 
-        self.grid.grid_shadow = [[None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
 
-        self.grid.grid = self.grid.grid_neon # Pointer to current world
+    @property
 
-        self.grid.ground_row = [] # For decorative bottom row
+    def max_boss_hp(self):
 
-        
+        return self.sim.boss.max_hp if self.sim.boss else 0
 
-        self.flash_lines = []
 
-        self.line_flash_timer = 0
 
-        self.lines_this_level = 0
+    def reset_level(self):
 
-        if self.world == 1 and self.level_in_world == 1:
+        """Restarts the current level (rules, then presentation)"""
 
-            self.lines_required = 5  # Easy first level
+        start_level(self.sim)
 
-        else:
+        self.present_level()
 
-            self.lines_required = 8 + (self.world - 1) * 4 + (self.level_in_world - 1) * 2
 
-        
 
-        self.is_boss_level = (self.level_in_world == 4)
+    def present_level(self):
 
-        self.big_boss = None
+        """Theme, music, banners and boss sprite for the level GameState just set up"""
 
-        if self.is_boss_level:
+        self.grid.ground_row = [] # For decorative bottom row
 
-            self.max_boss_hp = 250 + self.world * 100 # Reduced from 400+w*200 for fairness
+        
 
-            self.boss_hp = self.max_boss_hp
+        self.flash_lines = []
 
-            self.big_boss = BigBoss(self)
+        self.line_flash_timer = 0
 
-            self.big_boss.hp = self.boss_hp
+        
 
-            self.big_boss.max_hp = self.max_boss_hp
+        self.big_boss = BigBoss(self, self.sim.boss) if self.sim.boss else None
 
-            self.setup_boss_arena()
+        if self.big_boss:
 
-            self.boss_garbage_timer = 15.0  # More time before first garbage
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 40, "SHOOT THROUGH THE GAPS!", C_GOLD))
 
             self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "BOSS BATTLE!", C_RED, size='big'))
 
@@ -5753,7 +5581,7 @@ class Tetris:
 
         
 
-        # 3.0 Feature: Level Layouts (Pre-placed blocks)
+        # 3.0 Feature: Level Layouts (Pre-placed blocks, placed by the rules; skinned here)
 
         self.apply_layout()
 
@@ -5761,7 +5589,7 @@ class Tetris:
 
     def apply_layout(self):
 
-        """Parse ASCII map and place blocks in grid"""
+        """Skin the level's layout blocks (GameState placed them) for the level theme"""
 
         layout = get_layout(self.world, self.level_in_world)
 
@@ -5811,9 +5639,7 @@ class Tetris:
 
                 
 
-                # Determine Block Type & Color Fallbacks
-
-                block_type = 'brick' 
+                # Determine Sprite & Color Fallbacks
 
                 sprite_key = 'brick' # 'brick' exists in assets
 
@@ -5823,8 +5649,6 @@ class Tetris:
 
                 if char == '#': # Ground / Floor
 
-                    block_type = 'ground'
-
                     if self.level_theme == 'OVERWORLD':
 
                         sprite_key = 'brick' 
@@ -5853,8 +5677,6 @@ class Tetris:
 
                     sprite_key = 'brick'
 
-                    block_type = 'brick'
-
                     if self.level_theme == 'UNDERGROUND': color = (50, 50, 255)
 
                     elif self.level_theme == 'ALPS': color = (200, 200, 255)
@@ -5865,8 +5687,6 @@ class Tetris:
 
                     sprite_key = 'empty' # Use 'empty' (Beaten Block) often looks like stone/metal
 
-                    block_type = 'solid'
-
                     color = (120, 120, 120) # Grey
 
                     
@@ -5875,8 +5695,6 @@ class Tetris:
 
                     sprite_key = 'question_1'
 
-                    block_type = 'question'
-
                     color = (255, 215, 0) # Gold
 
 
@@ -5913,11 +5731,19 @@ class Tetris:
 
                 
 
-                # Place Block
+                # Skin Block (its type is already set by the rules)
+
+                block = self.grid.grid[r][c]
+
+                if block is None: continue
+
+                block.color = color
 
-                self.grid.grid[r][c] = Block(color, sprite_data=s_data)
+                block.sprite_data = s_data
 
-                self.grid.grid[r][c].type = block_type
+
+
+        self.grid.invalidate()
 
     
 
@@ -6049,54 +5875,14 @@ class Tetris:
 
 
 
-    def setup_boss_arena(self):
-
-        """Setup the partially filled line above the boss"""
-
-        # Clear middle section but keep some blocks at the top if any
-
-        # Actually reset_level already cleared the grid.
-
-        
-
-        # Shield line (partially filled line) above the boss
-
-        shield_row = random.randint(14, 16)
-
-        gap_start = random.randint(1, GRID_WIDTH - 3)
-
-        gaps = [gap_start, gap_start + 1] # 2-wide gap
-
-        
-
-        # Draw some bricks with gaps
-
-        for x in range(GRID_WIDTH):
-
-            if x not in gaps:
-
-                # Use a specific color for shield blocks
-
-                self.grid.grid[shield_row][x] = Block((150, 150, 150), 'brick')
-
-            
-
-        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 40, "SHOOT THROUGH THE GAPS!", C_GOLD))
-
-
-
-    def damage_boss(self, amount, reason="HIT"):
+    def show_boss_hit(self, amount, reason="HIT"):
 
-        """Centralized damage handler for the boss"""
+        """Boss damage feedback (GameState applies the damage)"""
 
         if not self.big_boss: return
 
         
 
-        self.big_boss.hp -= amount
-
-        self.boss_hp = self.big_boss.hp # Keep in sync for UI
-
         self.big_boss.hit_timer = 0.3
 
         self.sound_manager.play('impact_heavy')  # Heavy impact sound for boss
@@ -6121,273 +5907,279 @@ class Tetris:
 
         self.spawn_particles(bx, by, color, count=int(amount/2))
 
-        
 
-        if self.big_boss.hp <= 0:
 
-            self.sound_manager.play('world_clear') 
+    def show_boss_defeated(self):
 
-            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "BOSS DEFEATED!", C_GOLD, size='big'))
+        self.sound_manager.play('world_clear') 
 
-            self.trigger_level_win()
+        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "BOSS DEFEATED!", C_GOLD, size='big'))
 
 
 
     def spawn_particles(self, x, y, color, count=10):
 
-        for _ in range(count):
+        self.particles.burst(x, y, color, count, (-200, 200), (-300, 100))
 
-             vx = random.uniform(-200, 200)
 
-             vy = random.uniform(-300, 100)
 
-             self.effects.append({'x': x, 'y': y, 'vx': vx, 'vy': vy, 'life': 1.0, 'color': color, 'type': 'particle'})
+    def show_line_clear(self, cleared, line_indices, streak):
 
+        """Flash, popups and the versus attack for a clear GameState scored"""
 
+        self.line_flash_timer = 0.3
 
-    def spawn_random_item(self):
+        self.flash_lines = line_indices
 
-        items = ['SUPER_MUSHROOM', '1UP_MUSHROOM', 'STAR', 'PWING']
+            
 
-        choice = random.choice(items)
+        # MULTIPLAYER ATTACK
 
-        if choice == 'SUPER_MUSHROOM':
+        if self.game_state == 'BATTLE' and self.firebase_manager:
 
-            self.trigger_antigravity(10.0)
+             # Send Garbage: 1 line = 0, 2 = 1, 3 = 2, 4 = 4
 
-            self.score += 1000
+             lines_to_send = 0
 
-            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "SUPER MUSHROOM!", C_GREEN))
+             if cleared == 2: lines_to_send = 1
 
-        elif choice == '1UP_MUSHROOM':
+             elif cleared == 3: lines_to_send = 2
 
-            self.lives += 1
+             elif cleared == 4: lines_to_send = 4
 
-            self.sound_manager.play('level_up')
+             
 
-            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "1UP!", C_GREEN))
+             if lines_to_send > 0:
 
-        elif choice == 'STAR':
+                 self.firebase_manager.send_attack(lines_to_send)
 
-            self.trigger_star_power(10.0)
+                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 100, f"SENT {lines_to_send} LINES!", C_GREEN))
 
-        elif choice == 'PWING':
+        
 
-            self.p_wing_active = True
+        # Back-to-Back Tetris (1.5x)
 
-            self.p_wing_timer = 15.0
+        if cleared == 4:
 
-            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "P-WING!", C_GOLD))
+            # Messaging
 
+            if streak == 1:
 
+                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, "TETRIS!", C_NEON_PINK))
 
-    def handle_line_clear(self, cleared, events=[], line_indices=[]):
+            elif streak == 2:
 
-        self.lines_this_level += cleared
+                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, "DOUBLE TETRIS! x2", C_NEON_PINK))
 
-        self.lines_cleared_total += cleared
+            elif streak == 3:
 
-        self.lines_since_mushroom += cleared
+                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, "TETRIS MASTER! x3", C_NEON_PINK))
 
-        self.line_flash_timer = 0.3
+            else:
 
-        self.flash_lines = line_indices
+                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, f"GOAT! x{streak}", (255, 215, 0)))
+
+            
+
+        self.sound_manager.play('clear')
 
         
 
-        if self.big_boss:
+        if cleared >= 4:
 
-            dmg_map = {1: 20, 2: 45, 3: 80, 4: 150}
+             self.popups.append(PopupText(WINDOW_WIDTH//2 - 60, WINDOW_HEIGHT//2 - 30, "TETRIS!", C_NEON_PINK))
 
-            dmg = dmg_map.get(cleared, 15 * cleared)
+        
 
-            self.damage_boss(dmg, "LINE CLEAR")
+        # Spawn particles at line clear locations
 
-            
+        for row_idx in line_indices:
 
-        # MULTIPLAYER ATTACK
+            self.spawn_particles(PLAYFIELD_X + (GRID_WIDTH//2)*BLOCK_SIZE, 
 
-        if self.game_state == 'BATTLE' and self.firebase_manager:
+                               PLAYFIELD_Y + row_idx*BLOCK_SIZE, 
 
-             # Send Garbage: 1 line = 0, 2 = 1, 3 = 2, 4 = 4
+                               (255, 215, 0), count=20)
 
-             lines_to_send = 0
 
-             if cleared == 2: lines_to_send = 1
 
-             elif cleared == 3: lines_to_send = 2
+    def show_level_clear(self):
 
-             elif cleared == 4: lines_to_send = 4
+        """GameState has moved on to the next level: results screen"""
 
-             
+        self.sound_manager.play('world_clear')
 
-             if lines_to_send > 0:
+        self.apply_level_theme() # Update theme for new level
 
-                 self.firebase_manager.send_attack(lines_to_send)
+    
 
-                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 100, f"SENT {lines_to_send} LINES!", C_GREEN))
+        # Go to Results Screen
 
-        
+        self.game_state = 'WORLD_CLEAR'
+
+        self.transition_timer = 0
 
-        # Scoring 2.0 (Classic Multipliers)
 
-        self.level = (self.world - 1) * 4 + self.level_in_world
 
-        base_pts = [0, 100, 300, 500, 800][min(cleared, 4)] * self.level
+    def show_level_bonus(self, lines, stomps):
+
+        """END-OF-LEVEL BONUS: Lines × Stomps = Bonus Coins! (GameState adds the score)"""
+
+        bonus = lines * stomps
 
-        multiplier = 1.0
+        print(f"[BONUS] Level Complete! Lines: {lines} × Stomps: {stomps} = {bonus} coins")
 
         
 
-        # Back-to-Back Tetris (1.5x)
+        if bonus > 0:
 
-        if cleared == 4:
+            self.coins += bonus
 
-            streak = self.b2b_chain + 1
+            # Show bonus breakdown - BIG TEXT
 
-            multiplier *= (1.0 + 0.5 * self.b2b_chain)
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 120, f"LINES: {lines}", (100, 255, 100), size='med'))
 
-            
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 60, f"STOMPS: {stomps}", (255, 100, 100), size='med'))
 
-            # Messaging
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"─────────", C_WHITE, size='med'))
 
-            if streak == 1:
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 80, f"BONUS: {bonus} COINS!", (255, 215, 0), size='big'))
 
-                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, "TETRIS!", C_NEON_PINK))
+            self.sound_manager.play('coin')
 
-            elif streak == 2:
+        
 
-                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, "DOUBLE TETRIS! x2", C_NEON_PINK))
+    def spawn_magic_star(self, x, y):
 
-            elif streak == 3:
+        s = MagicStar(self)
 
-                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, "TETRIS MASTER! x3", C_NEON_PINK))
+        s.x = x
 
-            else:
+        s.y = y
 
-                 self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 40, f"GOAT! x{streak}", (255, 215, 0)))
+        self.turtles.append(s)
 
-                 
 
-            self.b2b_chain += 1
 
-        else:
+    def spawn_enemy(self, kind, x, direction):
 
-            self.b2b_chain = 0
+        """Sprite for an enemy or item GameState spawned"""
 
-            
+        if kind == 'magic_mushroom':
 
-        final_pts = int(base_pts * multiplier)
+            t = MagicMushroom(self)
 
-        self.score += final_pts
+            t.y = -1
 
-        self.sound_manager.play('clear')
+            t.state = 'active'
 
-        
+            self.popups.append(PopupText(PLAYFIELD_X + x*BLOCK_SIZE, 150, "MAGIC MUSHROOM!", (100, 255, 100)))
 
-        if cleared >= 4:
+        elif kind == 'golden':
 
-             self.popups.append(PopupText(WINDOW_WIDTH//2 - 60, WINDOW_HEIGHT//2 - 30, "TETRIS!", C_NEON_PINK))
+            t = Turtle(is_golden=True, tetris=self)
 
-             # Chance for Star on Tetris
+        else:
 
-             if random.random() < 0.1: self.trigger_star_power(10.0)
+            t = ENEMY_CLASSES[kind](tetris=self)
 
+        t.x = x
 
+        t.direction = direction
 
-        # Mushroom Spawn (Every 3 lines)
+        self.turtles.append(t)
 
-        if self.lines_since_mushroom >= 3:
 
-            self.lines_since_mushroom -= 3
 
-            m = MagicMushroom(self)
+    def stomp_enemy(self, t):
 
-            m.x = random.randint(0, GRID_WIDTH - 1)
+        """The piece came down on t; its handle_stomp reports it to the rules"""
 
-            m.y = -1
+        t.handle_stomp(self)
 
-            m.state = 'active'
+        if t.enemy_type in ['magic_mushroom', 'magic_star', 'item']:
 
-            self.turtles.append(m)
+            if t in self.turtles: self.turtles.remove(t)
 
-            self.popups.append(PopupText(PLAYFIELD_X + m.x*BLOCK_SIZE, 150, "MAGIC MUSHROOM!", (100, 255, 100)))
 
 
+    def stomp_under_piece(self, piece):
 
-        if self.is_boss_level:
+        """Enemies the falling piece just moved onto"""
 
-            # EXTRA DAMAGE FOR GARBAGE
+        piece_x_grid, piece_y_grid = int(piece.x), int(piece.y)
 
-            if 'BRICK_CLEAR' in events: 
+        for bx, by in piece.blocks:
 
-                self.damage_boss(15, "BRICK SMASH")
+            px, py = piece_x_grid + bx, piece_y_grid + by
 
-        else:
+            for t in self.turtles[:]:
 
-            # Check for level win
+                # Skip Lakitu and already dying enemies
 
-            if self.lines_this_level >= self.lines_required:
+                if t.enemy_type == 'lakitu' or t.state in ['dying', 'dead', 'falling_out', 'thrown']:
 
-                self.trigger_level_win()
+                    continue
 
-        
+                # GENEROUS collision - within 1 cell
 
-        # Spawn particles if cleared
+                if abs(t.x - px) < 1.0 and abs(t.y - py) < 1.0:
 
-        if cleared > 0:
+                    self.stomp_enemy(t)
 
-            # Spawn particles at line clear locations
 
-            for row_idx in line_indices:
 
-                self.spawn_particles(PLAYFIELD_X + (GRID_WIDTH//2)*BLOCK_SIZE, 
+    def stomp_drop_path(self, blocks, x, from_y, to_y):
 
-                                   PLAYFIELD_Y + row_idx*BLOCK_SIZE, 
+        """Enemies a hard-dropped piece went through on its way from from_y to to_y"""
 
-                                   (255, 215, 0), count=20)
+        turtles_killed = 0
 
+        for y in range(from_y + 1, to_y + 2):
 
+            for bx, by in blocks:
 
-    def trigger_level_win(self):
+                for t in self.turtles[:]:
 
-        self.sound_manager.play('world_clear')
+                    if t.enemy_type == 'lakitu' or t.state in ['dying', 'dead', 'falling_out']: continue
 
-        
+                    # Generous collision for Hard Drop
 
-        # Advance Level Progress
+                    if abs(t.x - (x + bx)) < 1.0 and abs(t.y - (y + by)) < 1.0:
 
-        self.level_in_world += 1
+                        if t.enemy_type not in ['magic_mushroom', 'magic_star', 'item']: turtles_killed += 1
 
-        if self.level_in_world > 4:
+                        self.stomp_enemy(t)
 
-            self.level_in_world = 1
+        self.kills_this_level += turtles_killed
 
-            self.world += 1
+        
 
-            
+        if turtles_killed >= 3:
 
-        self.apply_level_theme() # Update theme for new level
+             # User requested Slots only between levels.
 
-    
+             self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "COMBO SMASH!", C_RED))
 
-        # Go to Results Screen
 
-        self.game_state = 'WORLD_CLEAR'
 
-        self.transition_timer = 0
+    def show_stomp_combo(self, stomps, points):
 
-        
+        if stomps == 2:
 
-    def spawn_magic_star(self, x, y):
+            # 2x stomp combo
 
-        s = MagicStar(self)
+            self.sound_manager.play('stomp_combo')
 
-        s.x = x
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "DOUBLE STOMP!", (255, 200, 0)))
 
-        s.y = y
+        else:
 
-        self.turtles.append(s)
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 50, f"{stomps}x STOMP COMBO!", (255, 215, 0)))
+
+            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"+{points} POINTS!", C_NEON_PINK))
+
+            self.sound_manager.play('level_up')
 
 
 
@@ -6403,135 +6195,145 @@ class Tetris:
 
     
 
+    def show_boss_garbage(self):
 
+        # Bowser attacks! (GameState pushed the garbage row)
 
-    def trigger_boss_garbage(self):
+        self.popups.append(PopupText(WINDOW_WIDTH//2, PLAYFIELD_Y, "BOWSER ATTACK!", C_ORANGE))
 
-        # Bowser attacks! Push garbage line from bottom
+        self.sound_manager.play('damage')
 
-        rows = 1  # EASIER: Only 1 row per attack
+        
 
-        for _ in range(rows):
+    def calculate_speed(self):
 
-            new_row = [Block((128, 128, 128), 'brick') for _ in range(GRID_WIDTH)]
+        return fall_interval(self)
 
-            # Leave 2 gaps so it's easier to clear
+    
 
-            gap1 = random.randint(0, GRID_WIDTH - 1)
+    def show_block_out(self):
 
-            gap2 = (gap1 + random.randint(2, 4)) % GRID_WIDTH  # Second gap
+        """Blocks reached the top and GameState spent a life on a fresh board"""
 
-            new_row[gap1] = None
+        self.sound_manager.play('damage')
 
-            new_row[gap2] = None
+        
 
-            self.grid.grid.pop(0)
+        # Show dramatic "RETRY" sequence
 
-            self.grid.grid.append(new_row)
+        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//3, f"LIVES: {self.lives}", (255, 50, 50)))
 
-        self.popups.append(PopupText(WINDOW_WIDTH//2, PLAYFIELD_Y, "BOWSER ATTACK!", C_ORANGE))
+        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "TRY AGAIN!", (255, 215, 0)))
 
-        self.sound_manager.play('damage')
+        
+
+        # Clear enemies too
+
+        self.turtles.clear()
 
         
 
-    def calculate_speed(self):
+        # Small delay/visual feedback
 
-        # Formula: (World * 4) + Level
+        self.screen_shake_timer = 0.5
 
-        difficulty_index = (self.world - 1) * 4 + self.level_in_world
+        self.damage_flash_timer = 0.3
 
-        # Base speed 0.8s, gets faster. Cap at 0.05s.
 
-        return max(0.05, 1.0 - (difficulty_index - 1) * 0.05)
 
-    
+    def show_game_over(self):
 
-    def handle_block_out(self):
+        self.game_state = 'GAMEOVER'
 
-        """Handle when blocks reach the top - use a life or game over"""
+        self.sound_manager.play('gameover')
 
-        if self.lives > 0:
+        self.save_replay('gameover')
 
-            # Lose a life but continue at same level
 
-            self.lives -= 1
 
-            self.sound_manager.play('damage')
+    def handle_sim_events(self, events):
 
-            
+        """Sprites, sounds and popups for what step() reported"""
 
-            # Show dramatic "RETRY" sequence
+        for name, value in events:
 
-            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//3, f"LIVES: {self.lives}", (255, 50, 50)))
+            if name == 'move': self.sound_manager.play('move')
 
-            self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "TRY AGAIN!", (255, 215, 0)))
+            elif name == 'rotate': self.sound_manager.play('rotate')
 
-            
+            elif name == 'lock': self.sound_manager.play('lock')
 
-            # Clear the grid but keep progress
+            elif name == 'hard_drop':
 
-            self.grid.grid = [[None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+                self.stomp_drop_path(*value)
 
-            
+                self.screen_shake_timer = 0.15 # Screen Shake on Hard Drop
 
-            # Clear enemies too
+            elif name == 'fall': self.stomp_under_piece(value)
 
-            self.turtles.clear()
+            elif name == 'clear': self.show_line_clear(*value)
 
-            
+            elif name == 'spawn': self.spawn_enemy(*value)
 
-            # Get fresh pieces
+            elif name == 'star': self.announce_star_power()
 
-            self.current_piece = self.spawner.get_next_piece()
+            elif name == 'star_end':
 
-            self.next_piece = self.spawner.get_next_piece()
+                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "STAR END", C_RED))
 
-            
+            elif name == 'p_wing_end':
 
-            # Reset timers
+                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "P-WING EXPIRED", C_WHITE))
 
-            self.fall_timer = 0
+            elif name == 'life': self.sound_manager.play('life')
 
-            self.lock_timer = 0
+            elif name == 'hurt':
 
-            self.lock_move_count = 0
+                self.damage_flash_timer = 0.2; self.screen_shake_timer = 0.3
 
-            self.turtle_spawn_timer = 0
+                self.sound_manager.play('damage')
 
-            
+            elif name == 'time_up': self.sound_manager.play('damage')
 
-            # Reset hearts to max
+            elif name == 'block_out': self.show_block_out()
 
-            self.hearts = self.max_hearts
+            elif name == 'game_over': self.show_game_over()
 
-            
+            elif name == 'boss_hit': self.show_boss_hit(*value)
 
-            # Keep level progress - don't reset lines_this_level
+            elif name == 'boss_defeated': self.show_boss_defeated()
 
-            # Player keeps score and level, just cleared grid
+            elif name == 'fireball': self.sound_manager.play('fireball')
 
-            
+            elif name == 'piece_destroyed':
 
-            # Small delay/visual feedback
+                self.sound_manager.play('damage')
 
-            self.screen_shake_timer = 0.5
+                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "PIECE DESTROYED!", C_RED))
 
-            self.damage_flash_timer = 0.3
+            elif name == 'boss_garbage': self.show_boss_garbage()
 
-            
+            elif name == 'stomp_combo': self.show_stomp_combo(*value)
 
-            return False  # Not game over
+            elif name == 'level_clear': self.show_level_clear()
 
-        else:
+            elif name == 'level_start':
+
+                self.show_level_bonus(*value)
 
-            # No lives left - actual game over
+                self.present_level()
 
-            self.game_state = 'GAMEOVER'
+            elif name == 'level':
 
-            self.sound_manager.play('gameover')
+                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"LEVEL {value}", (255, 215, 0)))
 
-            return True  # Game over
+            elif name == 'helper': self.announce_mario_helper(value)
+
+            elif name == 'smash': self.show_mario_smash(*value)
+
+            elif name == 'helper_clear': self.show_mario_clear(*value)
+
+            elif name == 'helper_done': self.finish_mario_helper(value)
 
 
 
@@ -6553,55 +6355,25 @@ class Tetris:
 
         self.star_timer = duration
 
-        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "STAR POWER!", C_GOLD))
+        self.announce_star_power()
 
-        self.sound_manager.play('level_up')
 
-    
 
-    # --- MARIO HELPER SYSTEM ---
+    def announce_star_power(self):
 
-    # Mario helps in different ways each time!
+        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "STAR POWER!", C_GOLD))
 
-    MARIO_HELP_MODES = ['SMASH', 'STOMP', 'CLEAR', 'STAR']
+        self.sound_manager.play('level_up')
 
     
 
-    def trigger_mario_helper(self, mode=None):
-
-        """Mario helps in different ways each time!"""
-
-        if self.mario_helper_active:
-
-            return  # Already running
-
-        
-
-        # Pick mode - cycle through or use specified
-
-        if mode is None:
-
-            if not hasattr(self, 'mario_help_index'):
-
-                self.mario_help_index = 0
-
-            mode = self.MARIO_HELP_MODES[self.mario_help_index % len(self.MARIO_HELP_MODES)]
-
-            self.mario_help_index += 1
-
-            
-
-        self.mario_helper_active = True
-
-        self.mario_helper_mode = mode
-
-        self.mario_helper_x = -60  # Start off-screen left
+    # --- MARIO HELPER SYSTEM ---
 
-        self.mario_helper_timer = 0
+    # Mario helps in different ways each time! GameState runs him (src.simulation, mario_helper_*); this is the show
 
-        self.lines_since_helper = 0
+    
 
-        
+    def announce_mario_helper(self, mode):
 
         # Mode-specific announcements
 
@@ -6637,237 +6409,81 @@ class Tetris:
 
     def update_mario_helper(self, dt):
 
-        """Update Mario's position and execute help based on mode"""
+        """STOMP mode: Mario takes out the enemy sprites he runs past"""
 
-        if not self.mario_helper_active:
+        if not self.mario_helper_active or self.mario_helper_mode != 'STOMP':
 
             return
 
             
 
-        self.mario_helper_timer += dt
-
-        mode = getattr(self, 'mario_helper_mode', 'SMASH')
-
-        
+        for t in self.turtles[:]:
 
-        if mode == 'SMASH':
+            turtle_screen_x = PLAYFIELD_X + t.x * BLOCK_SIZE
 
-            # Mode 1: Run across bottom smashing blocks
+            if abs(turtle_screen_x - self.mario_helper_x) < 40:
 
-            run_speed = 400
+                # Stomp effect
 
-            self.mario_helper_x += run_speed * dt
+                self.sound_manager.play('stomp')
 
-            mario_grid_x = int((self.mario_helper_x - PLAYFIELD_X) / BLOCK_SIZE)
+                px = PLAYFIELD_X + t.x * BLOCK_SIZE
 
-            
+                py = PLAYFIELD_Y + t.y * BLOCK_SIZE
 
-            if 0 <= mario_grid_x < GRID_WIDTH:
+                self.popups.append(PopupText(px, py, "STOMP!", (255, 255, 0)))
 
-                for row in range(GRID_HEIGHT - 3, GRID_HEIGHT):
+                self.queue_input('helper_stomp')
 
-                    if self.grid.grid[row][mario_grid_x] is not None:
+                self.turtles.remove(t)
 
-                        self.grid.grid[row][mario_grid_x] = None
 
-                        px = PLAYFIELD_X + mario_grid_x * BLOCK_SIZE + BLOCK_SIZE // 2
 
-                        py = PLAYFIELD_Y + row * BLOCK_SIZE + BLOCK_SIZE // 2
+    def show_mario_smash(self, col, row):
 
-                        for _ in range(3):
+        px = PLAYFIELD_X + col * BLOCK_SIZE + BLOCK_SIZE // 2
 
-                            self.effects.append({
+        py = PLAYFIELD_Y + row * BLOCK_SIZE + BLOCK_SIZE // 2
 
-                                'x': px, 'y': py,
+        for _ in range(3):
 
-                                'vx': random.uniform(-100, 100),
+            self.particles.emit(px, py, random.uniform(-100, 100), random.uniform(-200, -50),
 
-                                'vy': random.uniform(-200, -50),
+                                (255, random.randint(100, 200), 0), life=1.0)
 
-                                'life': 1.0,
 
-                                'color': (255, random.randint(100, 200), 0)
 
-                            })
+    def show_mario_clear(self, row, cols):
 
-            
+        for col in cols:
 
-            if self.mario_helper_x > PLAYFIELD_X + GRID_WIDTH * BLOCK_SIZE + 60:
+            px = PLAYFIELD_X + col * BLOCK_SIZE
 
-                self._finish_mario_helper("THANKS MARIO!")
+            py = PLAYFIELD_Y + row * BLOCK_SIZE
 
-                
+            self.particles.emit(px, py, random.uniform(-50, 50), random.uniform(-100, -50),
 
-        elif mode == 'STOMP':
+                                (100, 200, 255), life=0.8)
 
-            # Mode 2: Mario jumps and stomps all turtles/enemies
+    
 
-            run_speed = 500
+    def finish_mario_helper(self, message):
 
-            self.mario_helper_x += run_speed * dt
+        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, message, C_GREEN))
 
             
 
-            # Stomp turtles as Mario passes
+    def draw_mario_helper(self, surface):
 
-            for t in self.turtles[:]:
+        """Draw Mario during helper sequence"""
 
-                turtle_screen_x = PLAYFIELD_X + t.x * BLOCK_SIZE
+        if not self.mario_helper_active:
 
-                if abs(turtle_screen_x - self.mario_helper_x) < 40:
+            return
 
-                    # Stomp effect
+        
 
-                    self.sound_manager.play('stomp')
-
-                    px = PLAYFIELD_X + t.x * BLOCK_SIZE
-
-                    py = PLAYFIELD_Y + t.y * BLOCK_SIZE
-
-                    self.popups.append(PopupText(px, py, "STOMP!", (255, 255, 0)))
-
-                    self.score += 200
-
-                    if t in self.turtles:
-
-                        self.turtles.remove(t)
-
-            
-
-            if self.mario_helper_x > PLAYFIELD_X + GRID_WIDTH * BLOCK_SIZE + 60:
-
-                self._finish_mario_helper("ALL CLEAR!")
-
-                
-
-        elif mode == 'CLEAR':
-
-            # Mode 3: Mario jumps to center and clears 2 random lines
-
-            if self.mario_helper_timer < 0.5:
-
-                # Jump to center
-
-                self.mario_helper_x = WINDOW_WIDTH // 2 - 30
-
-            elif self.mario_helper_timer < 1.0:
-
-                # Clear lines at 0.5 seconds
-
-                if not hasattr(self, '_mario_cleared_lines'):
-
-                    self._mario_cleared_lines = True
-
-                    lines_to_clear = 2
-
-                    cleared = 0
-
-                    # Find rows with most blocks
-
-                    for _ in range(lines_to_clear):
-
-                        best_row = -1
-
-                        best_count = 0
-
-                        for row in range(GRID_HEIGHT):
-
-                            count = sum(1 for c in self.grid.grid[row] if c is not None)
-
-                            if count > best_count:
-
-                                best_count = count
-
-                                best_row = row
-
-                        if best_row >= 0 and best_count > 0:
-
-                            # Clear this row with effects
-
-                            for col in range(GRID_WIDTH):
-
-                                if self.grid.grid[best_row][col]:
-
-                                    px = PLAYFIELD_X + col * BLOCK_SIZE
-
-                                    py = PLAYFIELD_Y + best_row * BLOCK_SIZE
-
-                                    self.effects.append({
-
-                                        'x': px, 'y': py, 'vx': random.uniform(-50, 50),
-
-                                        'vy': random.uniform(-100, -50), 'life': 0.8,
-
-                                        'color': (100, 200, 255)
-
-                                    })
-
-                                self.grid.grid[best_row][col] = None
-
-                            cleared += 1
-
-                    self.score += cleared * 100
-
-            elif self.mario_helper_timer > 1.5:
-
-                self._mario_cleared_lines = False
-
-                self._finish_mario_helper("LINES GONE!")
-
-                
-
-        elif mode == 'STAR':
-
-            # Mode 4: Mario gives you star power (invincibility)
-
-            if self.mario_helper_timer < 0.3:
-
-                self.mario_helper_x = PLAYFIELD_X + GRID_WIDTH * BLOCK_SIZE // 2
-
-            elif self.mario_helper_timer < 0.6:
-
-                if not hasattr(self, '_mario_gave_star'):
-
-                    self._mario_gave_star = True
-
-                    self.trigger_star_power(10.0)  # 10 seconds of star power
-
-            elif self.mario_helper_timer > 1.2:
-
-                self._mario_gave_star = False
-
-                self._finish_mario_helper("USE IT WELL!")
-
-    
-
-    def _finish_mario_helper(self, message):
-
-        """Finish the Mario helper sequence"""
-
-        self.mario_helper_active = False
-
-        self.mario_helper_x = -100
-
-        self.mario_helper_cooldown = 45.0 + random.random() * 30
-
-        self.score += 500
-
-        self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, message, C_GREEN))
-
-            
-
-    def draw_mario_helper(self, surface):
-
-        """Draw Mario during helper sequence"""
-
-        if not self.mario_helper_active:
-
-            return
-
-        
-
-        mode = getattr(self, 'mario_helper_mode', 'SMASH')
+        mode = getattr(self, 'mario_helper_mode', 'SMASH')
 
         
 
@@ -6935,19 +6551,9 @@ class Tetris:
 
                 dust_y = y + mario_img.get_height() - 10
 
-                self.effects.append({
-
-                    'x': dust_x, 'y': dust_y,
-
-                    'vx': random.uniform(-50, -20),
-
-                    'vy': random.uniform(-30, 0),
-
-                    'life': 0.5,
-
-                    'color': (200, 200, 200)
+                self.particles.emit(dust_x, dust_y, random.uniform(-50, -20), random.uniform(-30, 0),
 
-                })
+                                    (200, 200, 200), life=0.5)
 
             
 
@@ -6955,62 +6561,14 @@ class Tetris:
 
             if mode == 'STAR' and random.random() < 0.5:
 
-                self.effects.append({
+                self.particles.emit(self.mario_helper_x + random.randint(0, 40), y + random.randint(0, 40),
 
-                    'x': self.mario_helper_x + random.randint(0, 40),
+                                    random.uniform(-30, 30), random.uniform(-50, -20),
 
-                    'y': y + random.randint(0, 40),
-
-                    'vx': random.uniform(-30, 30),
-
-                    'vy': random.uniform(-50, -20),
-
-                    'life': 0.6,
-
-                    'color': (255, 255, random.randint(0, 100))
-
-                })
+                                    (255, 255, random.randint(0, 100)), life=0.6)
 
                 
 
-    def check_mario_helper_trigger(self):
-
-        """Check if Mario should come help"""
-
-        if self.mario_helper_active:
-
-            return False
-
-        if self.mario_helper_cooldown > 0:
-
-            return False
-
-        
-
-        # Check danger level
-
-        danger_rows = sum(1 for row in range(5) if any(self.grid.grid[row]))
-
-        
-
-        if danger_rows >= 3 and random.random() < 0.30:
-
-            return True
-
-        elif self.lines_since_helper >= 10 and random.random() < 0.15:
-
-            return True
-
-        elif random.random() < 0.02:
-
-            return True
-
-            
-
-        return False
-
-        
-
     def load_highscore(self):
 
         try:
@@ -7071,17 +6629,7 @@ class Tetris:
 
         
 
-        sw, sh = self.screen.get_size()
-
-        scale_w = sw / WINDOW_WIDTH
-
-        scale_h = sh / WINDOW_HEIGHT
-
-        self.scale = min(scale_w, scale_h)
-
-        self.offset_x = (sw - (WINDOW_WIDTH * self.scale)) // 2
-
-        self.offset_y = (sh - (WINDOW_HEIGHT * self.scale)) // 2
+        self.update_scaling()
 
 
 
@@ -7133,9 +6681,7 @@ class Tetris:
 
         lives_gain = coins // 5000
 
-        if lives_gain > 0:
-
-            self.lives += lives_gain
+        for _ in range(lives_gain): self.queue_input('extra_life')
 
         
 
@@ -7155,8 +6701,42 @@ class Tetris:
 
 
 
+    def capture_interpolation(self):
+
+        """Positions before the next logic step, for interpolated drawing"""
+
+        interp = self.interpolator
+
+        interp.clear()
+
+        interp.capture(getattr(self, 'turtles', ()), 2.0) # Grid cells
+
+        interp.capture(getattr(self, 'effects', ()), 2.0)
+
+        big_boss = getattr(self, 'big_boss', None)
+
+        interp.capture((getattr(self, 'lakitu', None), big_boss.boss if big_boss else None), 2.0)
+
+        interp.capture(getattr(self, 'popups', ()), 64) # Pixels
+
+        interp.capture(getattr(self, 'clouds', ()), 64)
+
+
+
     def update(self, dt):
 
+        # Flash / banner timers (previously ticked in draw at an assumed 60 fps)
+
+        if getattr(self, 'line_flash_timer', 0) > 0: self.line_flash_timer -= dt
+
+        if getattr(self, 'show_level_intro', False):
+
+            self.level_intro_timer -= dt
+
+            if self.level_intro_timer <= 0: self.show_level_intro = False
+
+
+
         # Update Mega Mode
 
         if getattr(self, 'mega_mode', False):
@@ -7181,7 +6761,9 @@ class Tetris:
 
                  self.ai_bot.active = getattr(self, 'auto_play', False)
 
-                 self.ai_bot.update(dt)
+                 with self.profiler.phase('ai'):
+
+                     self.ai_bot.update(dt)
 
             if self.game_state == 'INTRO':
 
@@ -7271,15 +6853,7 @@ class Tetris:
 
                      
 
-                     for _ in range(count):
-
-                         new_row = [Block((128,128,128), 'brick') for _ in range(GRID_WIDTH)]
-
-                         new_row[random.randint(0, GRID_WIDTH-1)] = None # One hole
-
-                         self.grid.grid.pop(0) # Remove top
-
-                         self.grid.grid.append(new_row) # Add bottom
+                     garbage_rows(self.sim, count, rng=self.versus_rng) # One hole each; remove top, add bottom
 
                          
 
@@ -7433,56 +7007,10 @@ class Tetris:
 
                  self.transition_timer = 0
 
-                 
-
-                 # END-OF-LEVEL BONUS: Lines × Stomps = Bonus Coins!
-
-                 lines = getattr(self, 'lines_this_level', 0)
-
-                 stomps = getattr(self, 'turtles_stomped', 0)
-
-                 bonus = lines * stomps
-
-                 
-
-                 print(f"[BONUS] Level Complete! Lines: {lines} × Stomps: {stomps} = {bonus} coins")
-
-                 
-
-                 if bonus > 0:
-
-                     self.coins += bonus
-
-                     self.score += bonus * 10  # Also add to score
-
-                     # Show bonus breakdown - BIG TEXT
-
-                     self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 120, f"LINES: {lines}", (100, 255, 100), size='med'))
-
-                     self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 60, f"STOMPS: {stomps}", (255, 100, 100), size='med'))
-
-                     self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"─────────", C_WHITE, size='med'))
-
-                     self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 80, f"BONUS: {bonus} COINS!", (255, 215, 0), size='big'))
-
-                     self.sound_manager.play('coin')
-
-                 
-
-                 # Reset counters for next level
-
-                 self.turtles_stomped = 0
-
-                 self.lines_this_level = 0
-
-                 
-
-                 # Advance to next level
+                 # Back to play: the next step() pays the level bonus and sets up the next level
 
                  self.game_state = 'PLAYING'
 
-                 self.reset_level()
-
              return
 
 
@@ -7495,15 +7023,7 @@ class Tetris:
 
             # Find highest block
 
-            highest_y = GRID_HEIGHT
-
-            for y in range(GRID_HEIGHT):
-
-                 if any(self.grid.grid[y]):
-
-                     highest_y = y
-
-                     break
+            highest_y = self.grid.stack_top()
 
             
 
@@ -7545,47 +7065,35 @@ class Tetris:
 
                 diff = self.score - self.displayed_score
 
-                step = max(1, int(diff * 0.1))
+                inc = max(1, int(diff * (1.0 - 0.9 ** (dt * 60)))) # 10% of the gap per 1/60 s at any step rate
 
-                self.displayed_score += step
+                self.displayed_score += inc
 
             elif self.displayed_score > self.score:
 
                 self.displayed_score = self.score
 
-            
-
-            # Polled Input for Soft Drop
-
-            keys = pygame.key.get_pressed()
 
-            self.key_down_held = keys[pygame.K_DOWN]
 
+            # --- GAME RULES ---
 
+            # One step() of the rules core with this tick's inputs and entity reports; the recorder stores
 
+            # exactly what step() gets (dt rounded to what playback will use)
 
+            self.profiler.start('gravity')
 
-            # Gesture controls handled via events (MOUSEBUTTONDOWN/UP), not polling
-
-
-
-            # DAS Logic
-
-            if self.das_direction != 0:
-
-                self.das_timer += dt
-
-                if self.das_timer > DAS_DELAY:
+            if self.game_state == 'PLAYING':
 
-                    if self.das_timer > DAS_DELAY + DAS_REPEAT:
+                inputs, self.sim_inputs = self.sim_inputs, []
 
-                        self.das_timer -= DAS_REPEAT
+                if self.recorder: dt = self.recorder.tick(dt, inputs, self.sim)
 
-                        self.current_piece.x += self.das_direction
+                self.handle_sim_events(step(self.sim, inputs, dt))
 
-                        if self.grid.check_collision(self.current_piece):
+            self.profiler.stop('gravity')
 
-                            self.current_piece.x -= self.das_direction
+            if self.game_state == 'WORLD_CLEAR': return
 
 
 
@@ -7653,34 +7161,6 @@ class Tetris:
 
                 self.shake_offset = (0, 0)
 
-                
-
-            # P-Wing Logic
-
-            if self.p_wing_active:
-
-                self.p_wing_timer -= dt
-
-                if self.p_wing_timer <= 0:
-
-                    self.p_wing_active = False
-
-                    self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "P-WING EXPIRED", C_WHITE))
-
-
-
-            # Boss Garbage - More forgiving timing
-
-            if getattr(self, 'is_boss_level', False) and self.game_state == 'PLAYING':
-
-                self.boss_garbage_timer -= dt
-
-                if self.boss_garbage_timer <= 0:
-
-                    self.trigger_boss_garbage()
-
-                    self.boss_garbage_timer = 15.0 - min(3.0, self.world * 0.3)  # Gentler scaling
-
 
 
             # Antigravity Logic
@@ -7697,20 +7177,6 @@ class Tetris:
 
 
 
-            # Star Logic
-
-            if self.star_active:
-
-                self.star_timer -= dt
-
-                if self.star_timer <= 0:
-
-                     self.star_active = False
-
-                     self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "STAR END", C_RED))
-
-
-
             # Update Big Boss
 
             if self.big_boss:
@@ -7719,197 +7185,9 @@ class Tetris:
 
 
 
-            # --- PIECE GRAVITY & LOCK DELAY ---
-
-            if self.game_state == 'PLAYING':
-
-                g_dir = 1
-
-                target_speed = self.calculate_speed()
-
-                if self.key_down_held: target_speed /= 20.0
-
-                
-
-                self.fall_timer += dt
-
-                if self.fall_timer > target_speed:
-
-                    self.fall_timer = 0
-
-                    self.current_piece.y += g_dir
-
-                    if self.grid.check_collision(self.current_piece):
-
-                        self.current_piece.y -= g_dir
-
-                    else:
-
-                        # NEW: Check for Big Boss Hit
-
-                        if self.big_boss:
-
-                            hit = False
-
-                            px_g, py_g = int(self.current_piece.x), int(self.current_piece.y)
-
-                            for bx, by in self.current_piece.blocks:
-
-                                grid_x, grid_y = px_g + bx, py_g + by
-
-                                if grid_x >= self.big_boss.x and grid_x < self.big_boss.x + self.big_boss.width:
-
-                                    if grid_y >= self.big_boss.y - 1.5 and grid_y <= self.big_boss.y + 0.5:
-
-                                        hit = True; break
-
-                            if hit:
-
-                                damage = 20 if self.key_down_held else 10
-
-                                self.damage_boss(damage, "HIT")
-
-                                
-
-                                # Reset piece if it hits the boss
-
-                                self.current_piece = self.next_piece
-
-                                self.next_piece = self.spawner.get_next_piece()
-
-                                return
-
-
-
-                        # NEW: Check for stomping during regular fall
-
-                        piece_x_grid = int(self.current_piece.x)
-
-                        piece_y_grid = int(self.current_piece.y)
-
-                        for bx, by in self.current_piece.blocks:
-
-                            px, py = piece_x_grid + bx, piece_y_grid + by
-
-                            for t in self.turtles[:]:
-
-                                # Skip Lakitu and already dying enemies
-
-                                if hasattr(t, 'enemy_type') and t.enemy_type == 'lakitu':
-
-                                    continue
-
-                                if t.state in ['dying', 'dead', 'falling_out', 'thrown']:
-
-                                    continue
-
-                                    
-
-                                # GENEROUS collision - within 1 cell
-
-                                if abs(t.x - px) < 1.0 and abs(t.y - py) < 1.0:
-
-                                    if hasattr(t, 'handle_stomp'):
-
-                                        print(f"[STOMP-FALL] Piece at ({px},{py}) stomped turtle at ({t.x:.1f},{t.y:.1f}) state={t.state}")
-
-                                        t.handle_stomp(self)
-
-                                        if t.enemy_type in ['magic_mushroom', 'magic_star', 'item']:
-
-                                            if t in self.turtles: self.turtles.remove(t)
-
-                                        else:
-
-                                            self.turtles_stomped += 1
-
-                
-
-                self.current_piece.y += g_dir
-
-                on_floor = self.grid.check_collision(self.current_piece)
-
-                self.current_piece.y -= g_dir
-
-                
-
-                if on_floor:
-
-                    self.lock_timer += dt
-
-                    if self.lock_timer >= self.max_lock_delay:
-
-                        self.sound_manager.play('lock')
-
-                        self.grid.lock_piece(self.current_piece)
-
-                        self.lock_timer = 0
-
-                        self.lock_move_count = 0
-
-                        cleared, events, line_indices = self.grid.clear_lines()
-
-                        if cleared > 0: self.handle_line_clear(cleared, events, line_indices)
-
-                        self.current_piece = self.next_piece
-
-                        self.next_piece = self.spawner.get_next_piece()
-
-                        if self.grid.check_collision(self.current_piece):
-
-                            self.handle_block_out()  # Use lives system
-
-                else: self.lock_timer = 0
-
-
-
-            # Spawning
-
-            self.turtle_spawn_timer += dt
-
-            spawn_rate = max(4.0, 8.0 - (self.level * 0.3))
-
-            if self.turtle_spawn_timer > spawn_rate: 
-
-                self.turtle_spawn_timer = 0; r = random.random()
-
-                if self.level == 1: 
-
-                    t = Turtle(is_golden=True, tetris=self) if r < 0.05 else Turtle(tetris=self)
-
-                elif self.level == 2: 
-
-                    if r < 0.20: t = Blooper(tetris=self)
-
-                    elif r < 0.40: t = RedTurtle(tetris=self)
-
-                    else: t = Turtle(tetris=self)
-
-                elif self.level == 3:
-
-                    if r < 0.15: t = HammerBro(tetris=self)
-
-                    elif r < 0.30: t = Blooper(tetris=self)
-
-                    else: t = Turtle(tetris=self)
-
-                else: 
-
-                    if r < 0.10: t = HammerBro(tetris=self)
-
-                    elif r < 0.20: t = Blooper(tetris=self)
-
-                    elif r < 0.30: t = Piranha(tetris=self)
-
-                    elif r < 0.45: t = Spiny(tetris=self)
-
-                    elif r < 0.60: t = RedTurtle(tetris=self)
-
-                    else: t = Turtle(tetris=self)
-
-                self.turtles.append(t)
-
+            # Enemy sprites move here; what they do to the game goes back to the rules as reports (queue_input)
 
+            self.profiler.start('turtles')
 
             for t in self.turtles[:]:
 
@@ -7953,17 +7231,7 @@ class Tetris:
 
                                 if abs(t.x - gx) < 1.0 and abs(t.y - gy) < 1.5:
 
-                                     t.handle_stomp(self)
-
-                                     if t.enemy_type in ['magic_mushroom', 'magic_star']:
-
-                                         if t in self.turtles: self.turtles.remove(t)
-
-                                     else: 
-
-                                         self.turtles_stomped += 1
-
-                                         self.frame_stomps += 1
+                                     self.stomp_enemy(t)
 
                                      stomped = True
 
@@ -7981,7 +7249,7 @@ class Tetris:
 
                         self.sound_manager.play('stomp')
 
-                        self.frame_stomps += 1
+                        self.queue_input('squish')
 
                         if t in self.turtles: self.turtles.remove(t)
 
@@ -7995,19 +7263,9 @@ class Tetris:
 
                         if t.state == 'falling_out' and t.enemy_type not in ['magic_mushroom', 'magic_star', 'item']:
 
-                            # Damage player if enemy escapes off bottom
-
-                            if not self.star_active:
+                            # Damage player if enemy escapes off bottom (hearts, then a life)
 
-                                self.hearts -= 1; self.damage_flash_timer = 0.2; self.screen_shake_timer = 0.3
-
-                                self.sound_manager.play('damage')
-
-                                if self.hearts <= 0:
-
-                                    self.lives -= 1; self.hearts = self.max_hearts
-
-                                    if self.lives <= 0: self.game_state = 'GAMEOVER'
+                            self.queue_input('escape')
 
                         if t in self.turtles: self.turtles.remove(t)
 
@@ -8017,49 +7275,7 @@ class Tetris:
 
                     if t in self.turtles: self.turtles.remove(t)
 
-            
-
-            # Check for stomp combos
-
-            if self.frame_stomps == 2:
-
-                # 2x stomp combo
-
-                self.sound_manager.play('stomp_combo')
-
-                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "DOUBLE STOMP!", (255, 200, 0)))
-
-                self.score += 200
-
-            elif self.frame_stomps >= 3:
-
-                bonus = self.frame_stomps * 500
-
-                self.score += bonus
-
-                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 - 50, f"{self.frame_stomps}x STOMP COMBO!", (255, 215, 0)))
-
-                self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"+{bonus} POINTS!", C_NEON_PINK))
-
-                self.sound_manager.play('level_up')
-
-            self.frame_stomps = 0  # Reset for next frame
-
-
-
-            if self.game_state == 'PLAYING':
-
-                self.match_timer -= dt
-
-                if self.match_timer <= 0:
-
-                    self.lives -= 1; self.hearts = self.max_hearts
-
-                    self.sound_manager.play('damage')
-
-                    if self.lives <= 0: self.game_state = 'GAMEOVER'
-
-                    else: self.match_timer = 400.0
+            self.profiler.stop('turtles')
 
 
 
@@ -8071,19 +7287,11 @@ class Tetris:
 
             if self.damage_flash_timer > 0: self.damage_flash_timer -= dt
 
-            for e in self.effects[:]:
-
-                 if isinstance(e, dict):
-
-                      # Standard particle
-
-                      e['x'] += e['vx'] * dt; e['y'] += e['vy'] * dt; e['vy'] += 800 * dt
-
-                      e['life'] -= dt * 1.5
+            self.particles.update(dt)
 
-                      if e['life'] <= 0: self.effects.remove(e)
+            for e in self.effects[:]:
 
-                 elif hasattr(e, 'update'):
+                 if hasattr(e, 'update'):
 
                       # Hammer or other object
 
@@ -8115,18 +7323,8 @@ class Tetris:
 
             if self.game_state == 'PLAYING':
 
-                self.mario_helper_cooldown -= dt
-
                 self.update_mario_helper(dt)
 
-                
-
-                # Check if Mario should appear
-
-                if not self.mario_helper_active and self.check_mario_helper_trigger():
-
-                    self.trigger_mario_helper()
-
 
 
             # Update Sound Manager
@@ -8141,6 +7339,8 @@ class Tetris:
 
             self.log_event(f"CRASH IN UPDATE: {e}")
 
+            self.save_replay('crash')
+
             import traceback
 
             traceback.print_exc()
@@ -8149,6 +7349,10 @@ class Tetris:
 
     def draw(self):
 
+        text_cache_begin_frame()
+
+        self.presenter.begin_frame(self.game_state)
+
         try:
 
             # Always Draw to Virtual Surface first
@@ -8171,11 +7375,7 @@ class Tetris:
 
                 # Dark overlay
 
-                overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-
-                overlay.fill((0, 0, 0, 150))
-
-                target.blit(overlay, (0, 0))
+                target.blit(self.overlays.dim((0, 0, 0, 150)), (0, 0))
 
                 # Big countdown number
 
@@ -8185,7 +7385,7 @@ class Tetris:
 
                     try:
 
-                        big_font = pygame.font.SysFont('arial black', 120, bold=True)
+                        big_font = get_font('arial black', 120, bold=True)
 
                     except:
 
@@ -8201,7 +7401,7 @@ class Tetris:
 
                     try:
 
-                        big_font = pygame.font.SysFont('arial black', 120, bold=True)
+                        big_font = get_font('arial black', 120, bold=True)
 
                     except:
 
@@ -8223,11 +7423,7 @@ class Tetris:
 
                 # Overlay
 
-                s = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-
-                s.fill((0, 0, 0, 200))
-
-                target.blit(s, (0, 0))
+                target.blit(self.overlays.dim((0, 0, 0, 200)), (0, 0))
 
                 
 
@@ -8273,51 +7469,101 @@ class Tetris:
 
             else:
 
-                self._draw_actual_game(target)
+                self._draw_actual_game(target)
+
+
+
+            # Mobile Controls Visual Feedback (touch ripples, zone highlights)
+
+            if hasattr(self, 'gesture_controls') and self.game_state == 'PLAYING':
+
+                game_time = pygame.time.get_ticks() / 1000.0
+
+                self.gesture_controls.draw(target, game_time)
+
+            
+
+            # Draw Mario Helper running across screen
+
+            if self.game_state == 'PLAYING':
+
+                self.draw_mario_helper(target)
+
+
+
+            with self.profiler.phase('persistent_ui'):
+
+                self.draw_persistent_ui(target)
+
+
+
+            # Profiler HUD (F3)
+
+            panel = self.profiler.draw(target, get_font('couriernew,dejavusansmono,consolas', 14), 8, 8)
+
+            if panel: self.presenter.mark_dirty(panel)
+
+            
+
+            # FINAL SCALING BLIT TO PHYSICAL SCREEN (buffers rebuilt in update_scaling)
+
+            self.report_dirty_regions()
+
+            with self.profiler.phase('present'):
+
+                self.presenter.present(self.game_surface)
+
+        except Exception as e:
+
+            self.log_event(f"DRAW ERROR: {e}")
+
 
 
+    def report_dirty_regions(self):
 
-            # Mobile Controls Visual Feedback (touch ripples, zone highlights)
+        """Tells the presenter which parts of the frame may have changed (dirty-rect mode only)"""
 
-            if hasattr(self, 'gesture_controls') and self.game_state == 'PLAYING':
+        if not self.presenter.dirty_rects_enabled: return
 
-                game_time = pygame.time.get_ticks() / 1000.0
+        cx, cy = WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2
 
-                self.gesture_controls.draw(target, game_time)
+        
 
-            
+        if self.game_state == 'INTRO':
 
-            # Draw Mario Helper running across screen
+            for rect in self.intro_scene.dirty_rects:
 
-            if self.game_state == 'PLAYING':
+                self.presenter.mark_dirty(rect)
 
-                self.draw_mario_helper(target)
+            # Menu buttons and room id input
 
+            self.presenter.mark_dirty((cx - 200, cy - 30, 400, 230))
 
+        elif self.game_state == 'GAMEOVER':
 
-            self.draw_persistent_ui(target)
+            pass # Fully static
 
-            
+        elif self.game_state == 'BATTLE_OVER' and not (self.star_active or self.damage_flash_timer > 0
 
-            # FINAL SCALING BLIT TO PHYSICAL SCREEN
+                                                       or getattr(self, 'line_flash_timer', 0) > 0
 
-            self.screen.fill((0, 0, 0)) # Clean margins
+                                                       or getattr(self, 'show_level_intro', False)):
 
-            scaled_surf = pygame.transform.scale(self.game_surface, 
+            # The board underneath is frozen; only the result text changes
 
-                                               (int(WINDOW_WIDTH * self.scale), 
+            self.presenter.mark_dirty((0, cy - 150, WINDOW_WIDTH, 270))
 
-                                                int(WINDOW_HEIGHT * self.scale)))
+        else:
 
-            self.screen.blit(scaled_surf, (self.offset_x, self.offset_y))
+            self.presenter.mark_full()
 
-            
+            return
 
-            pygame.display.flip()
+        
 
-        except Exception as e:
+        # Persistent top bar (mute, volume, song)
 
-            self.log_event(f"DRAW ERROR: {e}")
+        self.presenter.mark_dirty(((WINDOW_WIDTH - 480) // 2, 5, 480, 50))
 
 
 
@@ -8427,7 +7673,7 @@ class Tetris:
 
                         # Connect and Start
 
-                                                start_async_join(self, room_id, PopupText, C_GREEN, (255, 0, 0), WINDOW_WIDTH, WINDOW_HEIGHT)
+                        start_async_join(self, room_id, PopupText, C_GREEN, (255, 0, 0), WINDOW_WIDTH, WINDOW_HEIGHT)
 
 
 
@@ -8509,7 +7755,7 @@ class Tetris:
 
         tr = self.sound_manager.neon_playlist[self.sound_manager.neon_track_index]
 
-        s_txt = self.font_small.render(f"MUSIC: {tr[:14]}", True, C_WHITE)
+        s_txt = render_text(self.font_small, f"MUSIC: {tr[:14]}", True, C_WHITE)
 
         target.blit(s_txt, s_txt.get_rect(center=self.song_btn_rect.center))
 
@@ -8607,11 +7853,13 @@ class Tetris:
 
             
 
-            self.grid.draw(self.game_surface, self.total_time, 
+            with self.profiler.phase('grid'):
 
-                         bg_color=getattr(self, 'theme_bg', None),
+                self.grid.draw(self.game_surface, self.total_time, 
 
-                         accent_color=getattr(self, 'theme_accent', None))
+                             bg_color=getattr(self, 'theme_bg', None),
+
+                             accent_color=getattr(self, 'theme_accent', None))
 
             
 
@@ -8619,21 +7867,13 @@ class Tetris:
 
             if getattr(self, 'line_flash_timer', 0) > 0:
 
-                self.line_flash_timer -= 0.016 # Assumed 60fps dt
-
                 alpha = int(120 * (self.line_flash_timer / 0.3)) # Max 120 alpha instead of 255
 
                 for ly in getattr(self, 'flash_lines', []):
 
                     flash_rect = pygame.Rect(PLAYFIELD_X, PLAYFIELD_Y + ly * BLOCK_SIZE, PLAYFIELD_WIDTH, BLOCK_SIZE)
 
-                    s = pygame.Surface((PLAYFIELD_WIDTH, BLOCK_SIZE))
-
-                    s.set_alpha(alpha)
-
-                    s.fill((255, 255, 255))
-
-                    self.game_surface.blit(s, flash_rect)
+                    self.game_surface.blit(self.overlays.row_flash(alpha), flash_rect)
 
             
 
@@ -8641,43 +7881,19 @@ class Tetris:
 
             if self.star_active:
 
-                 s = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-
-                 s.set_alpha(50)
-
                  cols = [(255, 0, 0), (255, 165, 0), (255, 255, 0), (0, 255, 0), (0, 0, 255), (75, 0, 130)]
 
                  tick = pygame.time.get_ticks() // 100
 
-                 s.fill(cols[tick % len(cols)])
-
-                 self.game_surface.blit(s, (0, 0))
+                 self.game_surface.blit(self.overlays.tint(cols[tick % len(cols)], 50), (0, 0))
 
 
 
             if self.damage_flash_timer > 0:
 
-                 # Subtle VIGNETTE instead of full screen flash
-
-                 v_thickness = 40
-
-                 s = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-
-                 # Top
-
-                 pygame.draw.rect(s, (255, 0, 0, 100), (0, 0, WINDOW_WIDTH, v_thickness))
-
-                 # Bottom
-
-                 pygame.draw.rect(s, (255, 0, 0, 100), (0, WINDOW_HEIGHT - v_thickness, WINDOW_WIDTH, v_thickness))
+                 # Subtle VIGNETTE instead of full screen flash (pre-built, 40px red border)
 
-                 # Left/Right
-
-                 pygame.draw.rect(s, (255, 0, 0, 100), (0, 0, v_thickness, WINDOW_HEIGHT))
-
-                 pygame.draw.rect(s, (255, 0, 0, 100), (WINDOW_WIDTH - v_thickness, 0, v_thickness, WINDOW_HEIGHT))
-
-                 self.game_surface.blit(s, (0, 0))
+                 self.game_surface.blit(self.overlays.vignette(), (0, 0))
 
             
 
@@ -8689,10 +7905,6 @@ class Tetris:
 
             if getattr(self, 'show_level_intro', False):
 
-             self.level_intro_timer -= 0.016
-
-             if self.level_intro_timer <= 0: self.show_level_intro = False
-
              
 
              cx, cy = WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 100
@@ -8723,9 +7935,9 @@ class Tetris:
 
 
 
-             txt1 = self.font_big.render(f"WORLD {self.world}-{self.level_in_world}", True, C_WHITE)
+             txt1 = render_text(self.font_big, f"WORLD {self.world}-{self.level_in_world}", True, C_WHITE)
 
-             txt_theme = self.font_med.render(f"~ {theme_name} ~", True, accent)
+             txt_theme = render_text(self.font_med, f"~ {theme_name} ~", True, accent)
 
              
 
@@ -8735,21 +7947,11 @@ class Tetris:
 
 
 
-             for e in self.effects:
-
-                 if isinstance(e, dict) and e.get('type') == 'particle':
-
-                      alpha = int(255 * e['life'])
-
-                      s = pygame.Surface((4,4))
-
-                      s.fill(e['color'])
+             self.particles.draw(self.game_surface)
 
-                      s.set_alpha(alpha)
-
-                      self.game_surface.blit(s, (e['x'], e['y']))
+             for e in self.effects:
 
-                 elif hasattr(e, 'draw'):
+                 if hasattr(e, 'draw'):
 
                       e.draw(self.game_surface)
 
@@ -8757,15 +7959,11 @@ class Tetris:
 
             # Draw Ghost Piece
 
-            ghost_y = self.current_piece.y
-
-            g_dir = 1 # Standard gravity only now
+            self.profiler.start('entities')
 
-            while not self.grid.check_collision(self.current_piece) and abs(self.current_piece.y) < GRID_HEIGHT * 2:
-
-                 self.current_piece.y += g_dir
+            ghost_y = self.current_piece.y
 
-            self.current_piece.y -= g_dir
+            self.current_piece.y += self.grid.drop_distance(self.current_piece)
 
             
 
@@ -8837,7 +8035,7 @@ class Tetris:
 
                 else:
 
-                    draw_3d_block(self.game_surface, self.current_piece.color, px, py, BLOCK_SIZE)
+                    blit_3d_block(self.game_surface, self.current_piece.color, px, py, BLOCK_SIZE)
 
 
 
@@ -8901,11 +8099,7 @@ class Tetris:
 
                          # Tint red/white flash
 
-                         flash_surf = img.copy()
-
-                         flash_surf.fill((255, 100, 100), special_flags=pygame.BLEND_RGB_ADD)
-
-                         img = flash_surf
+                         img = get_sprite_variant(img, 'hit_flash')
 
                      
 
@@ -8959,8 +8153,14 @@ class Tetris:
 
 
 
+            self.profiler.stop('entities')
+
+
+
             # HUD (Responsive) - ONLY DRAW DURING PLAYING OR WORLD CLEAR
 
+            self.profiler.start('hud')
+
             if self.game_state in ['PLAYING', 'WORLD_CLEAR']:
 
                 is_vertical = WINDOW_HEIGHT > WINDOW_WIDTH * 1.2
@@ -8991,9 +8191,9 @@ class Tetris:
 
                     # 1. COINS (Was Mario/Score)
 
-                    self.game_surface.blit(self.font_small.render("COINS", True, (255,215,0)), (30, 25))
+                    self.game_surface.blit(render_text(self.font_small, "COINS", True, (255,215,0)), (30, 25))
 
-                    self.game_surface.blit(self.font_small.render(f"{int(self.score):06d}", True, C_WHITE), (30, 50))
+                    self.game_surface.blit(render_text(self.font_small, f"{int(self.score):06d}", True, C_WHITE), (30, 50))
 
                     
 
@@ -9003,17 +8203,17 @@ class Tetris:
 
                         self.game_surface.blit(mario_head, (spacing + 10, 35))
 
-                        self.game_surface.blit(self.font_small.render(f"x {self.lives}", True, C_WHITE), (spacing + 45, 50))
+                        self.game_surface.blit(render_text(self.font_small, f"x {self.lives}", True, C_WHITE), (spacing + 45, 50))
 
                     
 
                     # 3. WORLD
 
-                    self.game_surface.blit(self.font_small.render("WORLD", True, (200,200,200)), (2 * spacing + 10, 25))
+                    self.game_surface.blit(render_text(self.font_small, "WORLD", True, (200,200,200)), (2 * spacing + 10, 25))
 
-                    self.game_surface.blit(self.font_small.render(f"{self.world}-{self.level_in_world}", True, C_WHITE), (2 * spacing + 10, 50))
+                    self.game_surface.blit(render_text(self.font_small, f"{self.world}-{self.level_in_world}", True, C_WHITE), (2 * spacing + 10, 50))
 
-                    self.game_surface.blit(self.font_small.render(f"Ln: {self.lines_this_level}/{self.lines_required}", True, C_NEON_PINK), (2 * spacing + 10, 78))
+                    self.game_surface.blit(render_text(self.font_small, f"Ln: {self.lines_this_level}/{self.lines_required}", True, C_NEON_PINK), (2 * spacing + 10, 78))
 
                     
 
@@ -9029,7 +8229,7 @@ class Tetris:
 
                     pygame.draw.rect(self.game_surface, (100, 100, 100), (np_x - 10, np_y - 10, 90, 70), 2, border_radius=8)
 
-                    self.game_surface.blit(self.font_small.render("NEXT", True, (150, 150, 150)), (np_x + 10, np_y - 25))
+                    self.game_surface.blit(render_text(self.font_small, "NEXT", True, (150, 150, 150)), (np_x + 10, np_y - 25))
 
                     
 
@@ -9053,7 +8253,7 @@ class Tetris:
 
                         if img: self.game_surface.blit(img, (d_x, d_y))
 
-                        else: draw_3d_block(self.game_surface, p.color, d_x, d_y, scale_sz)
+                        else: blit_3d_block(self.game_surface, p.color, d_x, d_y, scale_sz)
 
 
 
@@ -9081,15 +8281,15 @@ class Tetris:
 
                     # 1. COINS (Combined Score)
 
-                    self.game_surface.blit(self.font_small.render("COINS", True, (255, 215, 0)), (hud_x, hud_y))
+                    self.game_surface.blit(render_text(self.font_small, "COINS", True, (255, 215, 0)), (hud_x, hud_y))
 
-                    self.game_surface.blit(self.font_small.render(f"{int(self.displayed_score):06d}", True, C_WHITE), (hud_x, hud_y + 25))
+                    self.game_surface.blit(render_text(self.font_small, f"{int(self.displayed_score):06d}", True, C_WHITE), (hud_x, hud_y + 25))
 
                     
 
                     # 1a. STOMPS (For Bonus Spins)
 
-                    self.game_surface.blit(self.font_small.render(f"STOMPS: {getattr(self, 'turtles_stomped', 0)}", True, C_GREEN), (hud_x, hud_y + 50))
+                    self.game_surface.blit(render_text(self.font_small, f"STOMPS: {getattr(self, 'turtles_stomped', 0)}", True, C_GREEN), (hud_x, hud_y + 50))
 
 
 
@@ -9099,11 +8299,11 @@ class Tetris:
 
                     # 1b. WORLD
 
-                    self.game_surface.blit(self.font_small.render("WORLD", True, (200,200,200)), (hud_x, hud_y))
+                    self.game_surface.blit(render_text(self.font_small, "WORLD", True, (200,200,200)), (hud_x, hud_y))
 
-                    self.game_surface.blit(self.font_small.render(f"{self.world}-{self.level_in_world}", True, C_WHITE), (hud_x, hud_y + 25))
+                    self.game_surface.blit(render_text(self.font_small, f"{self.world}-{self.level_in_world}", True, C_WHITE), (hud_x, hud_y + 25))
 
-                    self.game_surface.blit(self.font_small.render(f"Lines: {self.lines_this_level}/{self.lines_required}", True, C_NEON_PINK), (hud_x, hud_y + 50))
+                    self.game_surface.blit(render_text(self.font_small, f"Lines: {self.lines_this_level}/{self.lines_required}", True, C_NEON_PINK), (hud_x, hud_y + 50))
 
                     
 
@@ -9113,9 +8313,9 @@ class Tetris:
 
                     # 2. MATCH TIMER
 
-                    self.game_surface.blit(self.font_small.render("TIME", True, (200,200,200)), (hud_x, hud_y))
+                    self.game_surface.blit(render_text(self.font_small, "TIME", True, (200,200,200)), (hud_x, hud_y))
 
-                    self.game_surface.blit(self.font_small.render(f"{max(0, int(self.match_timer)):03d}", True, C_WHITE), (hud_x, hud_y + 25))
+                    self.game_surface.blit(render_text(self.font_small, f"{max(0, int(self.match_timer)):03d}", True, C_WHITE), (hud_x, hud_y + 25))
 
                     
 
@@ -9129,11 +8329,11 @@ class Tetris:
 
                          self.game_surface.blit(mario_head, (hud_x, hud_y))
 
-                         self.game_surface.blit(self.font_small.render(f"x {self.lives}", True, C_WHITE), (hud_x + 40, hud_y + 15))
+                         self.game_surface.blit(render_text(self.font_small, f"x {self.lives}", True, C_WHITE), (hud_x + 40, hud_y + 15))
 
                     else:
 
-                         self.game_surface.blit(self.font_small.render(f"LIVES: {self.lives}", True, C_WHITE), (hud_x, hud_y))
+                         self.game_surface.blit(render_text(self.font_small, f"LIVES: {self.lives}", True, C_WHITE), (hud_x, hud_y))
 
 
 
@@ -9143,7 +8343,7 @@ class Tetris:
 
                     # 4. NEXT PIECE (Bigger & Clearer)
 
-                    self.game_surface.blit(self.font_small.render("NEXT", True, (200, 200, 200)), (hud_x, hud_y))
+                    self.game_surface.blit(render_text(self.font_small, "NEXT", True, (200, 200, 200)), (hud_x, hud_y))
 
                     
 
@@ -9181,7 +8381,7 @@ class Tetris:
 
                         if img: self.game_surface.blit(img, (d_x, d_y))
 
-                        else: draw_3d_block(self.game_surface, p.color, d_x, d_y, scale_sz)
+                        else: blit_3d_block(self.game_surface, p.color, d_x, d_y, scale_sz)
 
                     
 
@@ -9211,7 +8411,7 @@ class Tetris:
 
                         pygame.draw.rect(self.game_surface, C_WHITE, (kx, ky, kw, 30), 1, border_radius=4)
 
-                        lbl = self.font_small.render(label, True, C_WHITE if not is_pressed else (0,0,0))
+                        lbl = render_text(self.font_small, label, True, C_WHITE if not is_pressed else (0,0,0))
 
                         self.game_surface.blit(lbl, lbl.get_rect(center=(kx + kw//2, ky + 15)))
 
@@ -9263,7 +8463,7 @@ class Tetris:
 
                     # Music Icon/Label
 
-                    self.game_surface.blit(self.font_small.render("♫ NOW PLAYING", True, (150, 200, 255)), (hud_x, music_box_y + 8))
+                    self.game_surface.blit(render_text(self.font_small, "♫ NOW PLAYING", True, (150, 200, 255)), (hud_x, music_box_y + 8))
 
                     
 
@@ -9271,7 +8471,7 @@ class Tetris:
 
                     track_name = self.sound_manager.get_track_display_name()
 
-                    self.game_surface.blit(self.font_small.render(track_name, True, C_WHITE), (hud_x, music_box_y + 30))
+                    self.game_surface.blit(render_text(self.font_small, track_name, True, C_WHITE), (hud_x, music_box_y + 30))
 
                     
 
@@ -9281,13 +8481,13 @@ class Tetris:
 
                     position_text = f"Track {track_num}/{track_total}"
 
-                    self.game_surface.blit(self.font_small.render(position_text, True, (200, 200, 200)), (hud_x, music_box_y + 52))
+                    self.game_surface.blit(render_text(self.font_small, position_text, True, (200, 200, 200)), (hud_x, music_box_y + 52))
 
                     
 
                     # Next Track hint
 
-                    self.game_surface.blit(self.font_small.render("Press N for next", True, (120, 120, 140)), (hud_x, music_box_y + 70))
+                    self.game_surface.blit(render_text(self.font_small, "Press N for next", True, (120, 120, 140)), (hud_x, music_box_y + 70))
 
                     
 
@@ -9343,7 +8543,7 @@ class Tetris:
 
                     # Boss Label
 
-                    lbl = self.font_small.render("BOSS HP", True, C_WHITE)
+                    lbl = render_text(self.font_small, "BOSS HP", True, C_WHITE)
 
                     self.game_surface.blit(lbl, (bar_x, bar_y - 18))
 
@@ -9359,7 +8559,7 @@ class Tetris:
 
                      txt = f"ANTIGRAVITY: {int(self.antigravity_timer)+1}"
 
-                     surf = self.font_small.render(txt, True, C_NEON_PINK)
+                     surf = render_text(self.font_small, txt, True, C_NEON_PINK)
 
                      self.game_surface.blit(surf, (WINDOW_WIDTH//2-surf.get_width()//2, 140))
 
@@ -9379,6 +8579,8 @@ class Tetris:
 
                 # HUD END
 
+            self.profiler.stop('hud')
+
 
 
             # Screen size remains constant with gesture controls
@@ -9511,21 +8713,35 @@ class Tetris:
 
 
 
-    def draw_world_clear(self):
+    def save_replay(self, reason):
+
+        """Writes the session's replay (play it back with: python -m src.replay <file>)"""
+
+        if not getattr(self, 'recorder', None): return
+
+        if reason == 'crash' and self.recorder.saved: return # Errors can repeat every frame; keep the first
 
         try:
 
-            target = self.game_surface
+            path = self.recorder.save(os.path.join(REPLAY_DIR, f"{reason}_{self.replay_seed}_{self.recorder.ticks}.mtr"))
+
+            if path: self.log_event(f"Replay saved: {path}")
+
+        except OSError as e:
+
+            self.log_event(f"Replay save failed: {e}")
 
-            # Stats Screen - Use Overlay
 
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
 
-            overlay.set_alpha(180) # Lighter alpha so game is visible
+    def draw_world_clear(self):
+
+        try:
+
+            target = self.game_surface
 
-            overlay.fill((0, 0, 0))
+            # Stats Screen - Use Overlay
 
-            target.blit(overlay, (0, 0))
+            target.blit(self.overlays.tint((0, 0, 0), 180), (0, 0)) # Lighter alpha so game is visible
 
             
 
@@ -9549,11 +8765,11 @@ class Tetris:
 
             # Text
 
-            l1 = self.font_big.render("LEVEL CLEARED!", True, C_NEON_PINK)
+            l1 = render_text(self.font_big, "LEVEL CLEARED!", True, C_NEON_PINK)
 
-            l2 = self.font_big.render(f"SCORE: {int(self.score)}", True, C_WHITE)
+            l2 = render_text(self.font_big, f"SCORE: {int(self.score)}", True, C_WHITE)
 
-            l3 = self.font_med.render(f"STOMPS: {getattr(self, 'turtles_stomped', 0)}", True, C_GREEN)
+            l3 = render_text(self.font_med, f"STOMPS: {getattr(self, 'turtles_stomped', 0)}", True, C_GREEN)
 
             
 
@@ -9571,11 +8787,11 @@ class Tetris:
 
             
 
-            l4 = self.font_big.render(f"UNLOCKED: {new_enemy}!", True, (255, 215, 0))
+            l4 = render_text(self.font_big, f"UNLOCKED: {new_enemy}!", True, (255, 215, 0))
 
-            l5 = self.font_med.render("NEXT: BONUS ROUND...", True, (200, 200, 255))
+            l5 = render_text(self.font_med, "NEXT: BONUS ROUND...", True, (200, 200, 255))
 
-            l6 = self.font_med.render(theme_txt, True, C_WHITE) # Theme info
+            l6 = render_text(self.font_med, theme_txt, True, C_WHITE) # Theme info
 
 
 
@@ -9647,9 +8863,9 @@ class Tetris:
 
         target.fill((50, 0, 0))
 
-        font_big = pygame.font.SysFont('Arial', 60, bold=True)
+        font_big = get_font('Arial', 60, bold=True)
 
-        font_small = pygame.font.SysFont('Arial', 30)
+        font_small = get_font('Arial', 30)
 
         
 
@@ -9701,251 +8917,33 @@ class Tetris:
 
     
 
-    def action_soft_drop(self):
-
-        """Move piece down one row (soft drop)"""
+    # Player actions go to the rules as inputs for the next step(); sounds and stomps come back as events
 
-        self.current_piece.y += 1
-
-        if self.grid.check_collision(self.current_piece):
-
-            self.current_piece.y -= 1
+    def action_soft_drop(self):
 
-        else:
+        """Move piece down one row (soft drop), 1 point per cell"""
 
-            self.score += 1  # Award 1 point per soft drop cell
+        self.queue_input('soft_drop')
 
             
 
     def action_move(self, dx):
 
-        self.current_piece.x += dx
-
-        if self.grid.check_collision(self.current_piece): 
-
-            self.current_piece.x -= dx
-
-        else: 
-
-            self.sound_manager.play('move')
-
-            # Reset lock delay on successful move
-
-            if self.lock_move_count < self.max_lock_moves:
-
-                self.lock_timer = 0
-
-                self.lock_move_count += 1
-
-                
-
-        self.das_direction = dx
-
-        self.das_timer = 0
+        self.queue_input('left' if dx < 0 else 'right')
 
 
 
     def action_rotate(self, direction=1):
 
-        # SRS-lite Wall Kick logic
-
-        # 1. Try normal rotation
-
-        orig_rotation = self.current_piece.rotation_index
-
-        self.current_piece.rotate(direction)
-
-        if not self.grid.check_collision(self.current_piece):
-
-             self.sound_manager.play('rotate')
-
-             if self.lock_move_count < self.max_lock_moves:
-
-                 self.lock_timer = 0
+        # SRS-lite Wall Kick logic (see simulation.try_rotate)
 
-                 self.lock_move_count += 1
-
-             return
-
-             
-
-        # 2. Try Wall Kicks (Right 1, Left 1, Up 1, Right 2, Left 2)
-
-        kicks = [(1, 0), (-1, 0), (0, -1), (2, 0), (-2, 0)]
-
-        for dx, dy in kicks:
-
-            self.current_piece.x += dx
-
-            self.current_piece.y += dy
-
-            if not self.grid.check_collision(self.current_piece):
-
-                self.sound_manager.play('rotate')
-
-                if self.lock_move_count < self.max_lock_moves:
-
-                    self.lock_timer = 0
-
-                    self.lock_move_count += 1
-
-                return
-
-            # Backtrack
-
-            self.current_piece.x -= dx
-
-            self.current_piece.y -= dy
-
-            
-
-        # 3. Fail
-
-        self.current_piece.rotate(-direction)
+        self.queue_input('rotate' if direction == 1 else 'rotate_ccw')
 
 
 
     def action_hard_drop(self):
 
-        g_dir = 1
-
-        turtles_killed = 0
-
-        # Drop until collision
-
-        while not self.grid.check_collision(self.current_piece) and self.current_piece.y < GRID_HEIGHT:
-
-             self.current_piece.y += g_dir
-
-             
-
-             # BOSS HIT CHECK - During Hard Drop
-
-             if self.big_boss:
-
-                 hit = False
-
-                 for bx, by in self.current_piece.blocks:
-
-                     gx, gy = int(self.current_piece.x + bx), int(self.current_piece.y + by)
-
-                     if gx >= self.big_boss.x and gx < self.big_boss.x + self.big_boss.width:
-
-                         if gy >= self.big_boss.y - 1.5 and gy <= self.big_boss.y + 0.5:
-
-                             hit = True; break
-
-                 if hit:
-
-                     self.damage_boss(50, "SMASH")
-
-                     # Consume piece on hit
-
-                     self.current_piece = self.next_piece
-
-                     self.next_piece = self.spawner.get_next_piece()
-
-                     return
-
-
-
-             # STOMP LOGIC: Check if we hit any turtles on the way down
-
-             for bx, by in self.current_piece.blocks:
-
-                 piece_x = self.current_piece.x + bx
-
-                 piece_y = self.current_piece.y + by
-
-                 for t in self.turtles[:]:
-
-                     if hasattr(t, 'enemy_type') and t.enemy_type == 'lakitu': continue
-
-                     # Generous collision for Hard Drop
-
-                     if abs(t.x - piece_x) < 1.0 and abs(t.y - piece_y) < 1.0:
-
-                          if t.state not in ['dying', 'dead', 'falling_out']:
-
-                               t.handle_stomp(self)
-
-                               if t.enemy_type in ['magic_mushroom', 'magic_star', 'item']:
-
-                                   if t in self.turtles: self.turtles.remove(t)
-
-                               else: 
-
-                                   turtles_killed += 1
-
-                                   
-
-                                   self.kills_this_level += 1
-
-                                   if not hasattr(self, 'turtles_stomped'): self.turtles_stomped = 0
-
-                                   self.turtles_stomped += 1
-
-        
-
-        self.current_piece.y -= g_dir
-
-        
-
-        # Check for Slot Machine Trigger (3+ kills)
-
-        if turtles_killed > 0:
-
-            print(f"DEBUG: Turtles killed this drop: {turtles_killed}")
-
-        
-
-        if turtles_killed >= 3:
-
-             # User requested Slots only between levels.
-
-             self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, "COMBO SMASH!", C_RED))
-
-             # self.trigger_slot_machine(spins=1, reason='COMBO')
-
-                
-
-        # Immediate Lock for modern feel
-
-        self.sound_manager.play('lock')
-
-        self.grid.lock_piece(self.current_piece)
-
-        
-
-        # Line Clearing
-
-        cleared, events, line_indices = self.grid.clear_lines()
-
-        if cleared > 0: self.handle_line_clear(cleared, events, line_indices)
-
-        
-
-        # Next Piece
-
-        self.current_piece = self.next_piece
-
-        self.next_piece = self.spawner.get_next_piece()
-
-        if self.grid.check_collision(self.current_piece):
-
-            self.handle_block_out()  # Use lives system
-
-        
-
-        self.lock_timer = 0
-
-        self.lock_move_count = 0
-
-        self.fall_timer = 0
-
-        # Screen Shake on Hard Drop
-
-        self.screen_shake_timer = 0.15 
+        self.queue_input('hard_drop')
 
 
 
@@ -9973,12 +8971,16 @@ class Tetris:
 
         while self.running:
 
-            dt = self.clock.tick(60) / 1000.0
+            frame_dt = self.clock.tick(MAX_FPS) / 1000.0
+
+            self.profiler.begin_frame()
 
             
 
             # Input (Updated from previous remappings)
 
+            self.profiler.start('events')
+
             for event in pygame.event.get():
 
                 if event.type == pygame.QUIT: self.running = False
@@ -9997,16 +8999,30 @@ class Tetris:
 
                 if event.type == pygame.KEYUP:
 
-                    if event.key == pygame.K_DOWN: self.key_down_held = False
+                    if event.key == pygame.K_DOWN: self.hold_down(False)
 
-                    if event.key == pygame.K_LEFT and self.das_direction == -1: self.das_direction = 0
+                    if event.key == pygame.K_LEFT: self.queue_input('release_left')
 
-                    if event.key == pygame.K_RIGHT and self.das_direction == 1: self.das_direction = 0
+                    if event.key == pygame.K_RIGHT: self.queue_input('release_right')
 
                 
 
                 if event.type == pygame.KEYDOWN:
 
+                    # Frame profiler: F3 HUD, F4 CSV export
+
+                    if event.key == pygame.K_F3:
+
+                        self.profiler.toggle()
+
+                        self.presenter.mark_full()
+
+                    if event.key == pygame.K_F4:
+
+                        path = self.profiler.export_csv()
+
+                        if path: self.log_event(f"Profile saved: {path}")
+
                     if event.key == pygame.K_ESCAPE:
 
                         if self.game_state == 'PLAYING': 
@@ -10015,6 +9031,8 @@ class Tetris:
 
                              self.game_state = 'GAMEOVER'  # Go to game over instead
 
+                             self.save_replay('quit')
+
                         else: 
 
                              self.running = False
@@ -10055,17 +9073,13 @@ class Tetris:
 
                         if event.key == pygame.K_DOWN:
 
-                            self.current_piece.y += 1
+                             self.hold_down(True)
 
-                            if self.grid.check_collision(self.current_piece): self.current_piece.y -= 1
+                             self.action_soft_drop()
 
                         
 
-                        if event.key == pygame.K_w and self.p_wing_active:
-
-                             self.current_piece.y -= 1
-
-                             if self.grid.check_collision(self.current_piece): self.current_piece.y += 1
+                        if event.key == pygame.K_w: self.queue_input('lift') # P-Wing
 
                         
 
@@ -10129,27 +9143,11 @@ class Tetris:
 
                         
 
-                        if event.key == pygame.K_l:  # Level Skip (Debug)
-
-                             self.level += 1
-
-                             self.level_in_world += 1
-
-                             if self.level_in_world > 4:
-
-                                 self.level_in_world = 1
-
-                                 self.world += 1
-
-                             self.popups.append(PopupText(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, f"LEVEL {self.level}", (255, 215, 0)))
+                        if event.key == pygame.K_l: self.queue_input('skip_level') # Level Skip (Debug)
 
                         
 
-                        if event.key == pygame.K_m:  # Manual Mario Helper (Debug)
-
-                             self.mario_helper_cooldown = 0  # Reset cooldown
-
-                             self.trigger_mario_helper()
+                        if event.key == pygame.K_m: self.queue_input('call_helper') # Manual Mario Helper (Debug)
 
                     
 
@@ -10335,7 +9333,7 @@ class Tetris:
 
             if event.type in (pygame.MOUSEBUTTONUP, pygame.FINGERUP):
 
-                self.key_down_held = False
+                self.hold_down(False)
 
                 
 
@@ -10371,44 +9369,79 @@ class Tetris:
 
                     
 
+            self.profiler.stop('events')
+
             
 
             try:
 
-                if self.game_state == 'PLAYING':
+                if self.game_state == 'BATTLE' and hasattr(self, 'firebase_manager'):
+                    await self.firebase_manager.poll()
+                
+                # Fixed-step logic: frame rate no longer changes speeds, timers or collisions
+
+                for _ in range(self.step_clock.advance(frame_dt)):
 
-                    if self.active_world == 'SHADOW': dt *= 1.25
+                    dt = self.step_clock.step
 
-                    if getattr(self, 'shift_cooldown', 0) > 0: self.shift_cooldown -= dt
+                    if self.game_state == 'PLAYING':
 
-                    
+                        if self.active_world == 'SHADOW': dt *= 1.25
 
-                    # Mobile Controls DAS (hold-to-repeat) update
+                        if getattr(self, 'shift_cooldown', 0) > 0: self.shift_cooldown -= dt
 
-                    if hasattr(self, 'gesture_controls'):
+                        
 
-                        game_time = pygame.time.get_ticks() / 1000.0
+                        # Mobile Controls DAS (hold-to-repeat) update
 
-                        das_action = self.gesture_controls.update(dt, game_time)
+                        if hasattr(self, 'gesture_controls'):
 
-                        if das_action:
+                            game_time = pygame.time.get_ticks() / 1000.0
 
-                            self._process_mobile_action(das_action)
+                            das_action = self.gesture_controls.update(dt, game_time)
 
+                            if das_action:
 
+                                self._process_mobile_action(das_action)
+
+
+
+                    self.capture_interpolation()
+
+                    self.update(dt)
 
                 
-                if self.game_state == 'BATTLE' and hasattr(self, 'firebase_manager'):
-                    await self.firebase_manager.poll()
-                
-                self.update(dt)
 
-                self.draw() # Corrected draw pass (inside run)
+                # Bot search gets one AI_PLAN_BUDGET_MS slice per rendered frame, not per step
+
+                if hasattr(self, 'ai_bot'):
+
+                    with self.profiler.phase('ai'):
+
+                        self.ai_bot.plan_frame()
+
+
+
+                # Draw moving objects between the last two logic steps
+
+                self.interpolator.apply(self.step_clock.alpha)
+
+                try:
+
+                    self.draw() # Corrected draw pass (inside run)
+
+                finally:
+
+                    self.interpolator.restore()
+
+                self.profiler.end_frame()
 
             except Exception as e:
 
                 self.log_event(f"RUN LOOP ERROR: {e}")
 
+                self.save_replay('crash')
+
                 import traceback
 
                 traceback.print_exc()
@@ -10421,6 +9454,12 @@ class Tetris:
 
 
 
+# Tetris reads and writes the rules state (score, lives, pieces, timers...) straight through to self.sim
+
+forward_state_attributes(Tetris)
+
+
+
 if __name__ == "__main__":
 
     try:
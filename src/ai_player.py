@@ -1,6 +1,637 @@
 import pygame
+import os
 import random
 import copy
+import time
+import numpy as np
+from collections import OrderedDict
+from src.config import AI_PLAN_BUDGET_MS, AI_PLAN_DEADLINE, AI_BATCH_EVAL, AI_TT_SIZE, AI_WEIGHTS_FILE
+from src.config import AI_BEAM_SEARCH, AI_BEAM_WIDTH, AI_BEAM_DEPTH
+from src.pieces import Polyomino, Spawner
+
+# --- Bitboard Search Backend ---
+# One int per row (bit x set = filled). Mirrors the original list-grid search exactly, including
+# its quirks (no line clear between plies, cells above the board are ignored); that search is kept
+# as the reference in tests/test_ai_search.py.
+BOARD_W = 10
+BOARD_H = 20
+FULL_ROW = (1 << BOARD_W) - 1
+
+# Heuristic weights (lines, aggregate height, holes, bumpiness), as in the reference calculate_score
+DEFAULT_WEIGHTS = (10.0, -0.5, -10.0, -0.2)
+
+GAME_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def tuned_weights(path=AI_WEIGHTS_FILE):
+    """Weights from a tune_bot.py file (relative paths are from the game folder), or DEFAULT_WEIGHTS if none is set"""
+    if not path: return DEFAULT_WEIGHTS
+    from src.self_play import load_weights # self_play imports this module
+    path = os.path.join(GAME_ROOT, path)
+    try:
+        weights = load_weights(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[AI] Could not load weights from {path} ({e}), using DEFAULT_WEIGHTS")
+        return DEFAULT_WEIGHTS
+    print(f"[AI] Loaded tuned weights {weights} from {path}")
+    return weights
+
+_rotation_cache = {}
+
+def get_rotations(base_blocks):
+    """Precomputed data for the 4 rotations of a piece, in the same order as get_blocks_for_rotation.
+
+    Each entry is (blocks, x_min, x_max, min_bx, rows, cols, xs, min_by, contiguous):
+      x_min..x_max - the x range (within -2..9) that clears both walls
+      rows  - [(by, bits)] with bits for x = 0, to be shifted by x + min_bx
+      cols  - [(bx, max_by, min_by, count, [by, ...])] blocks per column
+      xs    - the x values worth trying: symmetric rotations (O, S/Z, I) skip any x where an
+              earlier rotation already covered the same cells (and wins ties)
+      contiguous - the piece spans every column from min_bx to max_bx
+    """
+    key = tuple(base_blocks)
+    rots = _rotation_cache.get(key)
+    if rots is not None: return rots
+
+    rots = []
+    curr = list(base_blocks)
+    for r in range(4):
+        if r: curr = [(-y, x) for x, y in curr]
+        min_bx = min(bx for bx, by in curr)
+        max_bx = max(bx for bx, by in curr)
+        rows = {}
+        cols = {}
+        for bx, by in curr:
+            rows[by] = rows.get(by, 0) | (1 << (bx - min_bx))
+            cols.setdefault(bx, []).append(by)
+
+        # Symmetric rotations cover the same cells as an earlier one placed dx columns over
+        alias = None
+        for pr, prev in enumerate(rots):
+            dx = min_bx - min(bx for bx, by in prev[0])
+            if sorted((bx - dx, by) for bx, by in curr) == sorted(prev[0]):
+                alias = (pr, dx)
+                break
+
+        x_min = max(-2, -min_bx)
+        x_max = min(BOARD_W - 1, BOARD_W - 1 - max_bx)
+        xs = [x for x in range(x_min, x_max + 1) if not (alias and -2 <= x + alias[1] < BOARD_W)]
+
+        rots.append((list(curr), x_min, x_max, min_bx,
+                     sorted(rows.items()), [(bx, max(bys), min(bys), len(bys), bys) for bx, bys in sorted(cols.items())],
+                     xs, min(by for bx, by in curr), len(cols) == max_bx - min_bx + 1))
+    _rotation_cache[key] = rots
+    return rots
+
+class Board:
+    """Row-mask board with per-column tops, fill counts and cached heuristic totals"""
+    __slots__ = ('masks', 'tops', 'counts', 'heights', 'full_rows', 'agg_height', 'holes', 'bumpiness')
+
+    @classmethod
+    def from_masks(cls, masks):
+        b = cls()
+        b.masks = masks
+        tops = [BOARD_H] * BOARD_W
+        counts = [0] * BOARD_W
+        for y in range(BOARD_H - 1, -1, -1):
+            m = masks[y]
+            while m:
+                low = m & -m
+                x = low.bit_length() - 1
+                tops[x] = y
+                counts[x] += 1
+                m ^= low
+        b.tops = tops
+        b.counts = counts
+        b.heights = [BOARD_H - t for t in tops]
+        b.full_rows = sum(1 for m in masks if m == FULL_ROW)
+        b.agg_height = sum(b.heights)
+        b.holes = sum(BOARD_H - t - c for t, c in zip(tops, counts))
+        b.bumpiness = sum(abs(b.heights[i] - b.heights[i+1]) for i in range(BOARD_W - 1))
+        return b
+
+    @classmethod
+    def from_grid(cls, grid):
+        masks = []
+        for row in grid:
+            m = 0
+            for x, cell in enumerate(row):
+                if cell is not None: m |= 1 << x
+            masks.append(m)
+        return cls.from_masks(masks)
+
+    def key(self):
+        """Compact, collision-free hash key: the row masks packed into one int"""
+        k = 0
+        for m in self.masks: k = (k << BOARD_W) | m
+        return k
+
+    def collides(self, rot, x, y):
+        """check_collision_virtual for rotation data rot at (x, y)"""
+        if x < rot[1] or x > rot[2]: return True
+        shift = x + rot[3]
+        masks = self.masks
+        for by, bits in rot[4]:
+            gy = y + by
+            if gy >= BOARD_H: return True
+            if gy >= 0 and masks[gy] & (bits << shift): return True
+        return False
+
+    def drop(self, rot, x):
+        """Spawn collision check plus drop_virtual: landing y, or None if blocked at y=0"""
+        if x < rot[1] or x > rot[2]: return None
+
+        # Fast path: when no block starts below its column's top, the first hit is the lowest
+        # block reaching the top (an empty column's top is the floor, BOARD_H)
+        tops = self.tops
+        first = 2 * BOARD_H
+        for bx, max_by, min_by, n, bys in rot[5]:
+            top = tops[x + bx]
+            if max_by > top: break
+            if top - max_by < first: first = top - max_by
+        else:
+            if first == 0: return None # Touching the stack at spawn
+            return first - 1 if first <= BOARD_H - 1 else BOARD_H - 1
+
+        # Overhang: step down like drop_virtual
+        if self.collides(rot, x, 0): return None
+        for y in range(1, BOARD_H):
+            if self.collides(rot, x, y): return y - 1
+        return BOARD_H - 1
+
+    def _placed_columns(self, rot, x, y):
+        """Yields (column, new_top, added_cells) for columns that gain in-bounds cells"""
+        tops = self.tops
+        for bx, max_by, min_by, n, bys in rot[5]:
+            c = x + bx
+            new_top = tops[c]
+            added = 0
+            for by in bys:
+                gy = y + by
+                if 0 <= gy < BOARD_H:
+                    added += 1
+                    if gy < new_top: new_top = gy
+            if added: yield c, new_top, added
+
+    def place(self, rot, x, y):
+        """put_piece_virtual: a new Board with the piece's in-bounds cells filled"""
+        b = Board()
+        masks = self.masks[:]
+        shift = x + rot[3]
+        full_rows = self.full_rows
+        for by, bits in rot[4]:
+            gy = y + by
+            if 0 <= gy < BOARD_H:
+                masks[gy] |= bits << shift
+                if masks[gy] == FULL_ROW: full_rows += 1
+        b.masks = masks
+        b.full_rows = full_rows
+
+        tops, counts, heights = self.tops[:], self.counts[:], self.heights[:]
+        agg_height, holes = self.agg_height, self.holes
+        for c, new_top, added in self._placed_columns(rot, x, y):
+            agg_height += tops[c] - new_top
+            holes += (tops[c] - new_top) - added
+            tops[c] = new_top
+            counts[c] += added
+            heights[c] = BOARD_H - new_top
+        b.tops, b.counts, b.heights = tops, counts, heights
+        b.agg_height, b.holes = agg_height, holes
+        b.bumpiness = sum(abs(heights[i] - heights[i+1]) for i in range(BOARD_W - 1))
+        return b
+
+    def clear_lines(self):
+        """Returns (board with full rows removed and empty rows added on top, lines cleared)"""
+        if not self.full_rows: return self, 0
+        kept = [m for m in self.masks if m != FULL_ROW]
+        cleared = BOARD_H - len(kept)
+        return Board.from_masks([0] * cleared + kept), cleared
+
+    def score_bound(self, rotations, weights=DEFAULT_WEIGHTS):
+        """Upper bound on score_placement for any placement of the piece on this board.
+
+        Holes and aggregate height never drop (nothing is cleared between plies), the piece's
+        cells can only fill the emptiest rows, and a piece spanning w columns can only smooth
+        the w + 1 neighbour pairs around them. Only holds for rewarded lines and penalized
+        height, holes and bumpiness; other weight signs get no bound (inf).
+        """
+        if not bound_holds(weights): return float('inf')
+        empties = sorted(BOARD_W - bin(m).count('1') for m in self.masks if m != FULL_ROW)
+        lines = self.full_rows
+        cells = len(rotations[0][0])
+        for e in empties:
+            if e > cells: break
+            cells -= e
+            lines += 1
+        h = self.heights
+        diffs = [abs(h[i] - h[i+1]) for i in range(BOARD_W - 1)]
+        pairs = max(len(rot[5]) for rot in rotations) + 1
+        smoothing = max(sum(diffs[i:i+pairs]) for i in range(max(1, BOARD_W - pairs)))
+        return score_from_features(lines, self.agg_height, self.holes, self.bumpiness - smoothing, weights)
+
+    def score_placement(self, rot, x, y, weights=DEFAULT_WEIGHTS):
+        """calculate_score for the piece at (x, y), touching only the affected rows and columns"""
+        masks = self.masks
+        shift = x + rot[3]
+        lines = self.full_rows
+        for by, bits in rot[4]:
+            gy = y + by
+            if 0 <= gy < BOARD_H:
+                m = masks[gy]
+                if m != FULL_ROW and m | (bits << shift) == FULL_ROW: lines += 1
+
+        tops, heights = self.tops, self.heights
+        agg_height, holes, bumpiness = self.agg_height, self.holes, self.bumpiness
+        changed = None
+        for c, new_top, added in self._placed_columns(rot, x, y):
+            agg_height += tops[c] - new_top
+            holes += (tops[c] - new_top) - added
+            if new_top != tops[c]:
+                if changed is None: changed = {}
+                changed[c] = BOARD_H - new_top
+
+        if changed:
+            # Re-measure only the neighbour pairs around columns whose height moved
+            pairs = set()
+            for c in changed:
+                if c > 0: pairs.add(c - 1)
+                if c < BOARD_W - 1: pairs.add(c)
+            for i in pairs:
+                old = abs(heights[i] - heights[i+1])
+                new = abs(changed.get(i, heights[i]) - changed.get(i + 1, heights[i+1]))
+                bumpiness += new - old
+
+        return score_from_features(lines, agg_height, holes, bumpiness, weights)
+
+def score_from_features(lines, agg_height, holes, bumpiness, weights=DEFAULT_WEIGHTS):
+    # Same evaluation order as the reference calculate_score
+    lines_weight, height_weight, holes_weight, bumpiness_weight = weights
+    return (lines * lines_weight) + (agg_height * height_weight) + (holes * holes_weight) + (bumpiness * bumpiness_weight)
+
+def bound_holds(weights):
+    lines_weight, height_weight, holes_weight, bumpiness_weight = weights
+    return lines_weight >= 0 and height_weight <= 0 and holes_weight <= 0 and bumpiness_weight <= 0
+
+def placements(board, rotations):
+    """Yields (r, x, y) for every placement get_best_move would try, in its order, minus symmetric duplicates"""
+    for r, rot in enumerate(rotations):
+        for x in rot[6]:
+            y = board.drop(rot, x)
+            if y is None: continue
+            yield r, x, y
+
+def best_placement_score(board, rotations, weights=DEFAULT_WEIGHTS):
+    """Best calculate_score over all placements of a piece (the look-ahead ply).
+
+    Inlines drop/score_placement for the common case: the piece lands on the column tops with
+    every cell on the board. Overhangs and pieces poking above row 0 take the general path.
+    """
+    best = -float('inf')
+    masks, tops, heights = board.masks, board.tops, board.heights
+    base_lines, base_agg, base_holes, base_bump = board.full_rows, board.agg_height, board.holes, board.bumpiness
+    diffs = [abs(heights[i] - heights[i+1]) for i in range(BOARD_W - 1)]
+    for rot in rotations:
+        min_bx, rows, cols, xs, piece_min_by, contiguous = rot[3:]
+        for x in xs:
+            first = 2 * BOARD_H
+            for bx, max_by, min_by, n, bys in cols:
+                top = tops[x + bx]
+                if max_by > top:
+                    first = -1
+                    break
+                if top - max_by < first: first = top - max_by
+            if first == 0: continue # Touching the stack at spawn
+            y = first - 1 if first <= BOARD_H - 1 else BOARD_H - 1
+
+            if first < 0 or y + piece_min_by < 0 or not contiguous:
+                y = board.drop(rot, x)
+                if y is None: continue
+                s = board.score_placement(rot, x, y, weights)
+                if s > best: best = s
+                continue
+
+            shift = x + min_bx
+            lines = base_lines
+            for by, bits in rows:
+                if masks[y + by] | (bits << shift) == FULL_ROW: lines += 1
+
+            # Every piece column rises to y + min_by: the gap below it turns into holes.
+            # Bumpiness only changes on the pairs touching the piece's columns.
+            agg = base_agg
+            holes = base_holes
+            bump = base_bump
+            c = shift
+            prev_h = heights[c - 1] if c > 0 else -1
+            for bx, max_by, min_by, n, bys in cols:
+                new_top = y + min_by
+                delta = tops[c] - new_top
+                agg += delta
+                holes += delta - n
+                h = BOARD_H - new_top
+                if prev_h >= 0: bump += abs(prev_h - h) - diffs[c - 1]
+                prev_h = h
+                c += 1
+            if c < BOARD_W: bump += abs(prev_h - heights[c]) - diffs[c - 1]
+
+            s = score_from_features(lines, agg, holes, bump, weights)
+            if s > best: best = s
+    return best
+
+# --- Batch Evaluation (NumPy) ---
+# Scores whole stacks of finished boards at once; same features and weights as calculate_score.
+_bit_columns = 1 << np.arange(BOARD_W, dtype=np.int64)
+
+def masks_to_cells(masks):
+    """(N, 20) row masks -> (N, 20, 10) bool cells"""
+    masks = np.asarray(masks, dtype=np.int64)
+    return (masks[:, :, None] & _bit_columns) != 0
+
+def calculate_scores_batch(cells, weights=DEFAULT_WEIGHTS):
+    """calculate_score for every board in a (N, 20, 10) bool array, as a float array"""
+    lines = cells.all(axis=2).sum(axis=1)
+    # True from each column's top block down: its row count is the height, its empties the holes
+    below_top = np.logical_or.accumulate(cells, axis=1)
+    heights = below_top.sum(axis=1)
+    agg_height = heights.sum(axis=1)
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+    holes = (below_top & ~cells).sum(axis=(1, 2))
+    return score_from_features(lines, agg_height, holes, bumpiness, weights)
+
+_placement_array_cache = {}
+
+def _placement_arrays(rotations):
+    """Every (rotation, x) worth trying as (K, cells) arrays of block columns and rows"""
+    key = id(rotations)
+    arrays = _placement_array_cache.get(key)
+    if arrays is None:
+        gx, by = [], []
+        for rot in rotations:
+            for x in rot[6]:
+                gx.append([x + bx for bx, b in rot[0]])
+                by.append([b for bx, b in rot[0]])
+        arrays = (rotations, np.array(gx, dtype=np.int64), np.array(by, dtype=np.int64))
+        _placement_array_cache[key] = arrays
+    return arrays[1], arrays[2]
+
+def best_placement_scores_batch(boards, rotations, weights=DEFAULT_WEIGHTS):
+    """best_placement_score for each board, with every placement on every board scored in one batch"""
+    n = len(boards)
+    if not n: return []
+    gx, by = _placement_arrays(rotations)
+    tops = np.array([b.tops for b in boards], dtype=np.int64)
+
+    # Drop on the column tops for every (board, placement) pair, as Board.drop's fast path
+    block_tops = tops[:, gx] # (N, K, cells)
+    first = (block_tops - by).min(axis=2)
+    overhang = (by > block_tops).any(axis=2)
+    ys = np.minimum(first - 1, BOARD_H - 1)
+    valid = (first > 0) & ~overhang
+
+    # Overhangs step down row by row in Python
+    for i, k in zip(*np.nonzero(overhang)):
+        y = _drop_cells(boards[i].masks, gx[k], by[k])
+        if y is not None:
+            ys[i, k] = y
+            valid[i, k] = True
+
+    owners, ks = np.nonzero(valid)
+    best = np.full(n, -np.inf)
+    if not len(owners): return best.tolist()
+
+    # Stamp each piece into a copy of its board
+    cells = masks_to_cells([b.masks for b in boards])[owners]
+    rows = ys[owners, ks][:, None] + by[ks]
+    on_board = rows >= 0
+    which = np.broadcast_to(np.arange(len(owners))[:, None], rows.shape)
+    cells[which[on_board], rows[on_board], gx[ks][on_board]] = True
+
+    np.maximum.at(best, owners, calculate_scores_batch(cells, weights))
+    return best.tolist()
+
+def _drop_cells(masks, gx, by):
+    """drop_virtual for a piece given as board columns and block rows; None if blocked at y=0"""
+    def collides(y):
+        for x, b in zip(gx.tolist(), by.tolist()):
+            gy = y + b
+            if gy >= BOARD_H: return True
+            if gy >= 0 and masks[gy] >> x & 1: return True
+        return False
+    if collides(0): return None
+    for y in range(1, BOARD_H):
+        if collides(y): return y - 1
+    return BOARD_H - 1
+
+class TranspositionTable:
+    """Bounded LRU of look-ahead scores keyed by (board key, (piece blocks, weights)).
+
+    A board's best follow-up score only depends on the board and the piece, so entries stay
+    valid across decisions (and games); the bot keeps one table for its whole lifetime.
+    """
+    def __init__(self, capacity=AI_TT_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        score = self.entries.get(key)
+        if score is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self.entries.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        self.entries[key] = score
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False) # Evict least recently used
+
+    def hit_rate(self):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.stats['hits'] = 0
+        self.stats['misses'] = 0
+
+class MoveSearch:
+    """Resumable form of the 2-ply get_best_move search.
+
+    step() scores look-ahead candidates until a perf_counter deadline and can be called again
+    next frame; result() is the best move found so far (anytime), and equals get_best_move's
+    answer once done is set. With batch=True the whole look-ahead ply is scored by NumPy in
+    a single step instead. Look-ahead scores are read from / stored in tt when one is given.
+    grid may be a list grid or a Board.
+    """
+    def __init__(self, grid, current_blocks, next_blocks, batch=False, tt=None, weights=DEFAULT_WEIGHTS):
+        board = grid if isinstance(grid, Board) else Board.from_grid(grid)
+        rotations1 = get_rotations(current_blocks)
+        self.rotations2 = get_rotations(next_blocks)
+        self.weights = weights
+        self.piece_key = (tuple(next_blocks), weights)
+        self.tt = tt
+
+        # 1. Iterate Rotations of CURRENT Piece
+        candidates = []
+        seen = set()
+        for r1, x1, y1 in placements(board, rotations1):
+            # Simulate board after move 1
+            board2 = board.place(rotations1[r1], x1, y1)
+
+            # An identical board was already scored by an earlier (winning on ties) placement
+            key = board2.key()
+            if key in seen: continue
+            seen.add(key)
+            candidates.append((board2.score_bound(self.rotations2, weights), len(candidates), r1, x1, board2, key))
+
+        # Most promising first; a candidate whose bound can't beat the best so far is skipped.
+        # Ties still go to the earliest placement, as in the plain loop.
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+        self.candidates = candidates
+        self.batch = batch
+        self.pos = 0
+        self.done = not candidates
+
+        self.best_score = -float('inf')
+        self.best_index = len(candidates)
+        self.best_x = 0
+        self.best_r = 0
+
+    def step(self, deadline=None):
+        """Scores candidates until finished or perf_counter() passes deadline (None = finish)"""
+        candidates = self.candidates
+        rotations2 = self.rotations2
+        if self.batch and not self.done:
+            self._step_batch()
+            return
+        while self.pos < len(candidates):
+            if deadline is not None and time.perf_counter() >= deadline: return
+            bound, index, r1, x1, board2, key = candidates[self.pos]
+            self.pos += 1
+            if bound < self.best_score: break
+            if bound == self.best_score and index > self.best_index: continue
+
+            # 2. Iterate Rotations of NEXT Piece (Look-ahead)
+            m2_best_score = self.tt.get((key, self.piece_key)) if self.tt is not None else None
+            if m2_best_score is None:
+                m2_best_score = best_placement_score(board2, rotations2, self.weights)
+                if self.tt is not None: self.tt.put((key, self.piece_key), m2_best_score)
+
+            if m2_best_score > self.best_score or (m2_best_score == self.best_score and index < self.best_index
+                                                  and self.best_score != -float('inf')):
+                self.best_score = m2_best_score
+                self.best_index = index
+                self.best_r = r1
+                self.best_x = x1
+        self.done = True
+
+    def _step_batch(self):
+        # No bound pruning: every candidate is scored, then the first strict maximum wins
+        by_index = sorted(self.candidates, key=lambda c: c[1])
+        tt = self.tt
+        if tt is None:
+            scores = best_placement_scores_batch([c[4] for c in by_index], self.rotations2, self.weights)
+        else:
+            scores = [tt.get((c[5], self.piece_key)) for c in by_index]
+            missing = [i for i, s in enumerate(scores) if s is None]
+            batch_scores = best_placement_scores_batch([by_index[i][4] for i in missing], self.rotations2, self.weights)
+            for i, s in zip(missing, batch_scores):
+                scores[i] = s
+                tt.put((by_index[i][5], self.piece_key), s)
+        for (bound, index, r1, x1, board2, key), m2_best_score in zip(by_index, scores):
+            if m2_best_score > self.best_score:
+                self.best_score = m2_best_score
+                self.best_index = index
+                self.best_r = r1
+                self.best_x = x1
+        self.pos = len(self.candidates)
+        self.done = True
+
+    def result(self):
+        """(x, rotation) to play. Cut short before any look-ahead, it falls back to the best-bound candidate"""
+        if not self.done and self.best_score == -float('inf') and self.candidates:
+            bound, index, r1, x1, board2, key = self.candidates[0]
+            return x1, r1
+        return self.best_x, self.best_r
+
+def next_bag_distribution(drawn=()):
+    """[(blocks, probability)] for the first piece nobody has seen yet.
+
+    drawn are the shape keys already taken from the current (unseen) 7-bag; every piece left
+    in it is equally likely. With the whole bag known that is a fresh bag: 1/7 each.
+    """
+    remaining = [k for k in Spawner.BAG if k not in drawn] or list(Spawner.BAG)
+    return [(Polyomino.SHAPES[k], 1.0 / len(remaining)) for k in remaining]
+
+class BeamSearch:
+    """Beam search over a known piece sequence (current, next, then the rest of the 7-bag).
+
+    Each layer places the next known piece on every board in the beam, clears lines like the
+    game does, and keeps the width best boards by the heuristic (cumulative lines plus the
+    board's height, holes and bumpiness). If depth reaches past the known pieces, the last
+    layer is an expectation over the next piece's distribution (tail). Resumable and anytime
+    like MoveSearch: result() is the first move of the best board in the deepest finished layer.
+    """
+    def __init__(self, grid, pieces, width=AI_BEAM_WIDTH, depth=AI_BEAM_DEPTH, weights=DEFAULT_WEIGHTS, tail=None):
+        board = grid if isinstance(grid, Board) else Board.from_grid(grid)
+        self.width = width
+        self.weights = weights
+        self.layers = [get_rotations(blocks) for blocks in pieces[:depth]]
+        self.tail = None
+        if tail and len(pieces) < depth:
+            self.tail = [(get_rotations(blocks), p) for blocks, p in tail]
+        self.best = None # (value, r, x)
+        self.done = False
+        self._steps = self._search(board)
+
+    def step(self, deadline=None):
+        """Expands boards until finished or perf_counter() passes deadline (None = finish)"""
+        for _ in self._steps:
+            if deadline is not None and time.perf_counter() >= deadline: return
+        self.done = True
+
+    def result(self):
+        if self.best is None: return 0, 0
+        return self.best[2], self.best[1]
+
+    def _search(self, board):
+        weights = self.weights
+        beam = [(0.0, None, None, board, 0)] # (value, first r, first x, board, lines so far)
+        for depth, rotations in enumerate(self.layers):
+            children = []
+            seen = set()
+            for value, r1, x1, parent, lines in beam:
+                for r, x, y in placements(parent, rotations):
+                    rot = rotations[r]
+                    if y + rot[7] < 0: continue # Would lock above the board: topped out
+                    child, cleared = parent.place(rot, x, y).clear_lines()
+                    total = lines + cleared
+                    key = (child.key(), total)
+                    if key in seen: continue
+                    seen.add(key)
+                    score = score_from_features(total, child.agg_height, child.holes, child.bumpiness, weights)
+                    if depth == 0: children.append((score, r, x, child, total))
+                    else: children.append((score, r1, x1, child, total))
+                yield
+            if not children: return
+            children.sort(key=lambda n: -n[0])
+            beam = children[:self.width]
+            self.best = beam[0][:3]
+
+        if self.tail is None: return
+        # Past the known pieces: expected best follow-up over the piece distribution
+        lines_weight = weights[0]
+        best = None
+        for value, r1, x1, node, lines in beam:
+            expected = 0.0
+            for rotations, p in self.tail:
+                expected += p * (best_placement_score(node, rotations, weights) + lines * lines_weight)
+            if best is None or expected > best[0]: best = (expected, r1, x1)
+            yield
+        self.best = best
 
 class TetrisBot:
     def __init__(self, game):
@@ -9,12 +640,25 @@ class TetrisBot:
         self.move_timer = 0
         self.thinking = False
         self.active = False
+
+        # Time-sliced planning: search at most plan_budget seconds per frame, and commit to the
+        # best move so far once plan_deadline seconds of game time have passed since the spawn
+        self.search = None
+        self.search_piece = None
+        self.plan_budget = AI_PLAN_BUDGET_MS / 1000.0
+        self.plan_deadline = AI_PLAN_DEADLINE
+        self.plan_elapsed = 0
+        self.batch_eval = AI_BATCH_EVAL
+        self.tt = TranspositionTable() # Look-ahead scores, shared by all of this bot's decisions
+        self.weights = tuned_weights() # (lines, height, holes, bumpiness), see tune_bot.py
+        self.beam_search = AI_BEAM_SEARCH # Plan with BeamSearch over the 7-bag instead of the 2-ply search
+        self.beam_width = AI_BEAM_WIDTH
+        self.beam_depth = AI_BEAM_DEPTH
         self.debug_font = pygame.font.SysFont('Arial', 12)
 
     def update(self, dt):
-        if not self.active: return
-        if not self.game.current_piece: return
-        if self.game.game_state != 'PLAYING': return
+        """Per logic step: plays the queued move and counts game time toward plan_deadline"""
+        if not self.playing(): return
 
         # If we have a plan, execute it
         if self.best_move_queue:
@@ -23,10 +667,43 @@ class TetrisBot:
                 self.move_timer = 0
                 action = self.best_move_queue.pop(0)
                 self.execute_action(action)
-        elif not self.thinking:
-            # Plan a move immediately when piece spawns or queue empty
-            self.plan_move()
+        elif self.thinking and self.search_piece is self.game.current_piece:
+            self.plan_elapsed += dt
+
+    def plan_frame(self):
+        """Per rendered frame: one plan_budget slice of search, however many logic steps the frame ran"""
+        if not self.playing() or self.best_move_queue: return
+        self.continue_planning()
+
+    def playing(self):
+        return self.active and self.game.current_piece and self.game.game_state == 'PLAYING'
+
+    def continue_planning(self):
+        piece = self.game.current_piece
+        if not self.thinking or self.search_piece is not piece:
+            # New piece (or the one being planned for locked meanwhile): start over
+            self.search = self.new_search(piece)
+            self.search_piece = piece
+            self.plan_elapsed = 0
+            self.thinking = True
+
+        self.search.step(time.perf_counter() + self.plan_budget)
+        if self.search.done or self.plan_elapsed >= self.plan_deadline:
+            self.queue_move(*self.search.result())
+            self.search = None
+            self.search_piece = None
             
+    def new_search(self, piece):
+        if not self.beam_search:
+            return MoveSearch(self.game.grid.grid, piece.blocks, self.game.next_piece.blocks, self.batch_eval, self.tt, self.weights)
+
+        # The spawner pops its bag in order, so the rest of the current bag is known exactly
+        spawner = getattr(self.game, 'spawner', None)
+        bag = list(getattr(spawner, 'bag', []))
+        pieces = [piece.blocks, self.game.next_piece.blocks] + [Polyomino.SHAPES[k] for k in bag]
+        return BeamSearch(self.game.grid.grid, pieces, self.beam_width, self.beam_depth, self.weights,
+                          tail=next_bag_distribution())
+
     def execute_action(self, action):
         if action == 'left': self.game.action_move(-1)
         elif action == 'right': self.game.action_move(1)
@@ -34,9 +711,10 @@ class TetrisBot:
         elif action == 'drop': self.game.action_hard_drop()
         
     def plan_move(self):
-        self.thinking = True
-        bx, br = self.get_best_move()
-        
+        """Plans the whole move in one go (no frame budget)"""
+        self.queue_move(*self.get_best_move())
+
+    def queue_move(self, bx, br):
         self.best_move_queue = []
         
         # 1. Rotate
@@ -65,125 +743,9 @@ class TetrisBot:
         self.thinking = False # Done planning
 
     def get_best_move(self):
-        best_score = -float('inf')
-        best_r = 0
-        best_x = 0
-        
-        orig_grid = [row[:] for row in self.game.grid.grid]
-        next_piece_blocks = self.game.next_piece.blocks
-        
-        # 1. Iterate Rotations of CURRENT Piece
-        for r1 in range(4):
-            blocks1 = self.get_blocks_for_rotation(self.game.current_piece.blocks, r1)
-            for x1 in range(-2, 10):
-                if self.check_collision_virtual(x1, 0, blocks1, orig_grid): continue
-                y1 = self.drop_virtual(x1, blocks1, orig_grid)
-                if y1 < 0: continue
-                
-                # Simulate board after move 1
-                grid2 = self.put_piece_virtual(orig_grid, blocks1, x1, y1)
-                
-                # 2. Iterate Rotations of NEXT Piece (Look-ahead)
-                m2_best_score = -float('inf')
-                for r2 in range(4):
-                    blocks2 = self.get_blocks_for_rotation(next_piece_blocks, r2)
-                    for x2 in range(-2, 10):
-                        if self.check_collision_virtual(x2, 0, blocks2, grid2): continue
-                        y2 = self.drop_virtual(x2, blocks2, grid2)
-                        if y2 < 0: continue
-                        
-                        s = self.calculate_score(grid2, blocks2, x2, y2)
-                        if s > m2_best_score: m2_best_score = s
-                
-                if m2_best_score > best_score:
-                    best_score = m2_best_score
-                    best_r = r1
-                    best_x = x1
-                    
-        return best_x, best_r
-
-    def get_blocks_for_rotation(self, base_blocks, r):
-        curr = [b for b in base_blocks]
-        for _ in range(r):
-            curr = [(-y, x) for x, y in curr]
-        return curr
-
-    def drop_virtual(self, x, blocks, grid):
-        for y in range(20):
-            if self.check_collision_virtual(x, y, blocks, grid):
-                return y - 1
-        return 19
-
-    def put_piece_virtual(self, grid, blocks, px, py):
-        new_grid = [row[:] for row in grid]
-        for bx, by in blocks:
-             gx, gy = int(px + bx), int(py + by)
-             if 0 <= gy < 20 and 0 <= gx < 10: new_grid[gy][gx] = 1
-        return new_grid
-    def check_collision_virtual(self, px, py, blocks, grid):
-        for bx, by in blocks:
-            gx = int(px + bx)
-            gy = int(py + by)
-            
-            if gx < 0 or gx >= 10: return True # Wall
-            if gy >= 20: return True # Floor
-            if gy >= 0:
-                if grid[gy][gx] is not None: return True
-        return False
-
-    def calculate_score(self, grid, blocks, px, py):
-        # 1. Place Piece on Temp Grid
-        # Deepcopy is slow? Let's try to do it in-place using a 'visited' or just Copy
-        temp_grid = [row[:] for row in grid]
-        
-        for bx, by in blocks:
-             gx = int(px + bx)
-             gy = int(py + by)
-             if 0 <= gy < 20 and 0 <= gx < 10:
-                 temp_grid[gy][gx] = 1 # Mark solid
-        
-        # 2. Heuristics
-        # Score = (Lines * 10) - (Height * 0.5) - (Holes * 5) - (Bumpiness * 0.2)
-        
-        # A. Lines
-        lines = 0
-        for row in temp_grid:
-            if None not in row: lines += 1
-            
-        # B. Aggregate Height & Bumpiness
-        heights = []
-        for cx in range(10):
-            h = 0
-            for cy in range(20):
-                if temp_grid[cy][cx] is not None:
-                    h = 20 - cy
-                    break
-            heights.append(h)
-            
-        agg_height = sum(heights)
-        
-        bumpiness = 0
-        for i in range(9):
-            bumpiness += abs(heights[i] - heights[i+1])
-            
-        # C. Holes
-        holes = 0
-        for cx in range(10):
-            block_found = False
-            for cy in range(20):
-                if temp_grid[cy][cx] is not None:
-                    block_found = True
-                elif block_found and temp_grid[cy][cx] is None:
-                    holes += 1
-        
-        # Professional weighted formula
-        lines_weight = 10.0
-        height_weight = -0.5
-        holes_weight = -10.0 # High penalty for holes
-        bumpiness_weight = -0.2
-        
-        score = (lines * lines_weight) + (agg_height * height_weight) + (holes * holes_weight) + (bumpiness * bumpiness_weight)
-        return score
+        search = MoveSearch(self.game.grid.grid, self.game.current_piece.blocks, self.game.next_piece.blocks, self.batch_eval, self.tt, self.weights)
+        search.step()
+        return search.result()
 
     def draw_debug(self, surface):
         if self.active:
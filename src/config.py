@@ -56,3 +56,35 @@ TETROMINO_DATA = {
 
 # --- Multiplayer ---
 FIREBASE_DB_URL = "https://mario-tetris-game-default-rtdb.firebaseio.com/"
+
+# --- Display ---
+# Opt-in: present nearly static screens with pygame.display.update(rects) instead of full flips
+DIRTY_RECT_UPDATES = False
+
+# --- Auto-play Bot ---
+# Search time the bot may spend per frame, and how long after a spawn it commits to its best move so far
+AI_PLAN_BUDGET_MS = 4.0
+AI_PLAN_DEADLINE = 0.25 # Seconds
+AI_BATCH_EVAL = False # Score the look-ahead ply with NumPy in one batch instead of pruned incremental search
+AI_TT_SIZE = 32768 # Look-ahead scores kept in the bot's transposition table
+AI_WEIGHTS_FILE = None # Opt-in tuned weights, e.g. "bot_tuning/best_weights.json" from tune_bot.py (relative to the game folder)
+AI_BEAM_SEARCH = False # Plan over the rest of the 7-bag with beam search (stronger, slower)
+AI_BEAM_WIDTH = 6
+AI_BEAM_DEPTH = 5 # Pieces; past the known bag the last layer is an expectation
+
+# --- Replays ---
+# Record every session as seed + inputs (see src/replay.py); written on game over and on crashes
+REPLAY_RECORDING = True
+REPLAY_DIR = "replays"
+REPLAY_CHECKPOINT_SECONDS = 5.0 # Playback snapshot spacing for seeking
+REPLAY_CHECKSUM_TICKS = 60 # State checksum spacing in recordings; playback reports the first tick that differs
+
+# --- Main Loop ---
+SIM_HZ = 120 # Fixed game logic rate; rendering interpolates between steps
+MAX_FRAME_TIME = 0.25 # Seconds of logic one frame may catch up after a hitch
+MAX_FPS = 60 # Render cap (0 = uncapped)
+
+# --- Profiler ---
+# F3 toggles the frame profiler HUD, F4 exports its rolling window as CSV
+PROFILER_WINDOW = 600 # Frames kept for percentiles, the graph and the CSV export
+PROFILER_DIR = "profiles"
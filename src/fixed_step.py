@@ -0,0 +1,53 @@
+from src.config import SIM_HZ, MAX_FRAME_TIME
+
+# Fixed-timestep main loop helpers.
+# Game logic always advances in SIM_HZ steps, however long a frame took, so speeds, timers and
+# collision checks don't depend on the frame rate. Rendering happens once per frame and draws
+# moving objects interpolated between the last two logic steps.
+class FixedStepClock:
+    def __init__(self, hz=SIM_HZ, max_frame_time=MAX_FRAME_TIME):
+        self.step = 1.0 / hz
+        self.max_frame_time = max_frame_time # Longer frames (hitches, tab switches) are dropped, not caught up
+        self.accumulator = 0.0
+
+    def advance(self, frame_dt):
+        """Adds a frame's real time; returns how many logic steps to run"""
+        self.accumulator += min(frame_dt, self.max_frame_time)
+        steps = int(self.accumulator / self.step + 1e-9) # Epsilon: 1/60 s of frame is exactly 2 steps
+        self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the frame is between the last logic step and the next (0..1)"""
+        return max(0.0, self.accumulator / self.step)
+
+class Interpolator:
+    """Remembers x/y before a logic step and temporarily lerps objects for drawing"""
+    def __init__(self):
+        self.prev = {}
+        self.applied = []
+
+    def capture(self, objects, snap):
+        """Call before each logic step. Moves longer than snap (teleports, wraps) aren't interpolated"""
+        for obj in objects:
+            if obj is not None and hasattr(obj, 'x') and hasattr(obj, 'y'):
+                self.prev[id(obj)] = (obj, obj.x, obj.y, snap)
+
+    def clear(self):
+        self.prev = {}
+
+    def apply(self, alpha):
+        """Moves captured objects to their interpolated positions; restore() puts them back"""
+        self.applied = []
+        for obj, px, py, snap in self.prev.values():
+            x, y = obj.x, obj.y
+            if abs(x - px) > snap or abs(y - py) > snap: continue
+            self.applied.append((obj, x, y))
+            obj.x = px + (x - px) * alpha
+            obj.y = py + (y - py) * alpha
+
+    def restore(self):
+        for obj, x, y in self.applied:
+            obj.x, obj.y = x, y
+        self.applied = []
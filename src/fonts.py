@@ -0,0 +1,33 @@
+import pygame
+
+# Shared font registry.
+# SysFont does a system font lookup on every call, so fonts are resolved once per (family, size, bold).
+_fonts = {}
+
+# Pulsing text snaps to multiples of this so it cycles through a handful of pre-built fonts
+SIZE_STEP = 4
+
+def get_font(family, size, bold=False):
+    """Returns a cached font. family None is pygame's default font; a .ttf/.otf path loads from file"""
+    key = (family, int(size), bold)
+    font = _fonts.get(key)
+    if font is None:
+        if family is None or family.lower().endswith(('.ttf', '.otf')):
+            font = pygame.font.Font(family, int(size))
+            if bold: font.set_bold(True)
+        else:
+            font = pygame.font.SysFont(family, int(size), bold=bold)
+        _fonts[key] = font
+    return font
+
+def quantize_size(size, step=SIZE_STEP):
+    return max(step, int(round(size / step)) * step)
+
+def get_animated_font(family, size, bold=False):
+    """get_font with the size snapped to the quantized set"""
+    return get_font(family, quantize_size(size), bold)
+
+def prebuild_fonts(family, min_size, max_size, bold=False):
+    """Resolves every quantized size an animation can hit so the first frames don't stall"""
+    for size in range(quantize_size(min_size), quantize_size(max_size) + 1, SIZE_STEP):
+        get_font(family, size, bold)
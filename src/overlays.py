@@ -0,0 +1,54 @@
+import pygame
+
+# Pre-built full-screen overlay surfaces.
+# Each overlay used to allocate a fresh window-sized surface every frame it was shown;
+# these are built once and only refilled when their color or alpha actually changes.
+class OverlayManager:
+    def __init__(self, size, row_size=None, vignette_thickness=40):
+        self.size = size
+
+        # Opaque surface with surface alpha (star tint, world clear)
+        self.tint_surf = pygame.Surface(size)
+        self.tint_color = None
+
+        # Per-pixel alpha surface (countdown dim, battle over)
+        self.dim_surf = pygame.Surface(size, pygame.SRCALPHA)
+        self.dim_rgba = None
+
+        # Damage vignette never changes
+        self.vignette_surf = pygame.Surface(size, pygame.SRCALPHA)
+        w, h = size
+        v = vignette_thickness
+        for rect in ((0, 0, w, v), (0, h - v, w, v), (0, 0, v, h), (w - v, 0, v, h)):
+            pygame.draw.rect(self.vignette_surf, (255, 0, 0, 100), rect)
+
+        # Line clear flash strip
+        self.row_surf = None
+        if row_size:
+            self.row_surf = pygame.Surface(row_size)
+            self.row_surf.fill((255, 255, 255))
+
+    def tint(self, color, alpha):
+        """Returns the opaque overlay filled with color at surface alpha"""
+        color = tuple(color)
+        if color != self.tint_color:
+            self.tint_surf.fill(color)
+            self.tint_color = color
+        self.tint_surf.set_alpha(alpha)
+        return self.tint_surf
+
+    def dim(self, rgba):
+        """Returns the per-pixel alpha overlay filled with rgba"""
+        rgba = tuple(rgba)
+        if rgba != self.dim_rgba:
+            self.dim_surf.fill(rgba)
+            self.dim_rgba = rgba
+        return self.dim_surf
+
+    def vignette(self):
+        return self.vignette_surf
+
+    def row_flash(self, alpha):
+        """Returns the white line flash strip at surface alpha"""
+        self.row_surf.set_alpha(alpha)
+        return self.row_surf
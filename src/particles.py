@@ -0,0 +1,113 @@
+import pygame
+import numpy as np
+
+# Array-backed particle system.
+# Particles live in flat NumPy arrays (structure of arrays) instead of one dict each:
+# integration and culling are vectorized, and drawing reuses one small pre-rendered sprite
+# per (color, size, alpha step) instead of allocating a Surface per particle per frame.
+ALPHA_STEPS = 16
+
+class ParticleSystem:
+    def __init__(self, capacity=4096, gravity=800.0, decay=1.5, shape='square', cull_y=None):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.decay = decay # Life lost per second; 0 keeps particles until culled
+        self.shape = shape # 'square' (size x size, fades with life) or 'circle' (radius = size, opaque)
+        self.cull_y = cull_y # Also drop particles that fall below this y
+
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int16) # Index into self.palette
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.count = 0
+
+        self.palette = []
+        self._palette_index = {}
+        self._sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def _color_index(self, color):
+        color = tuple(color[:3])
+        idx = self._palette_index.get(color)
+        if idx is None:
+            idx = len(self.palette)
+            self.palette.append(color)
+            self._palette_index[color] = idx
+        return idx
+
+    def emit(self, x, y, vx, vy, color, life=1.0, size=4):
+        """Adds particles; vx, vy and size may be scalars or arrays of equal length"""
+        vx = np.atleast_1d(np.asarray(vx, dtype=np.float32))
+        vy = np.atleast_1d(np.asarray(vy, dtype=np.float32))
+        n = max(len(vx), len(vy))
+        n = min(n, self.capacity - self.count) # Drop the overflow rather than grow
+        if n <= 0: return
+        s = slice(self.count, self.count + n)
+        self.pos[s, 0] = x
+        self.pos[s, 1] = y
+        self.vel[s, 0] = vx[:n] if len(vx) > 1 else vx[0]
+        self.vel[s, 1] = vy[:n] if len(vy) > 1 else vy[0]
+        self.life[s] = life
+        self.color[s] = self._color_index(color)
+        self.size[s] = np.asarray(size)[:n] if np.ndim(size) else size
+        self.count += n
+
+    def burst(self, x, y, color, count, vx_range, vy_range, life=1.0, size=4):
+        """Emits count particles with uniformly random velocities"""
+        if count <= 0: return
+        vx = np.random.uniform(vx_range[0], vx_range[1], count)
+        vy = np.random.uniform(vy_range[0], vy_range[1], count)
+        self.emit(x, y, vx, vy, color, life, size)
+
+    def update(self, dt):
+        n = self.count
+        if not n: return
+        self.pos[:n] += self.vel[:n] * dt
+        self.vel[:n, 1] += self.gravity * dt
+        if self.decay: self.life[:n] -= dt * self.decay
+
+        alive = self.life[:n] > 0
+        if self.cull_y is not None: alive &= self.pos[:n, 1] <= self.cull_y
+        if alive.all(): return
+
+        # Batched compaction of the survivors to the front of the arrays
+        keep = np.flatnonzero(alive)
+        m = len(keep)
+        for arr in (self.pos, self.vel, self.life, self.color, self.size):
+            arr[:m] = arr[keep]
+        self.count = m
+
+    def _sprite(self, color_idx, size, step):
+        key = (color_idx, size, step)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            color = self.palette[color_idx]
+            if self.shape == 'circle':
+                sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(sprite, color, (size, size), size)
+            else:
+                sprite = pygame.Surface((size, size))
+                sprite.fill(color)
+                sprite.set_alpha(int(255 * step / (ALPHA_STEPS - 1)))
+            self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface):
+        n = self.count
+        if not n: return
+        if self.shape == 'circle':
+            steps = [ALPHA_STEPS - 1] * n
+            xy = (self.pos[:n] - self.size[:n, None]).astype(np.int32).tolist()
+        else:
+            steps = np.clip(self.life[:n] * (ALPHA_STEPS - 1), 0, ALPHA_STEPS - 1).astype(np.int16).tolist()
+            xy = self.pos[:n].astype(np.int32).tolist()
+        colors = self.color[:n].tolist()
+        sizes = self.size[:n].tolist()
+        sprite = self._sprite
+        surface.blits([(sprite(c, s, a), p) for c, s, a, p in zip(colors, sizes, steps, xy)], False)
@@ -0,0 +1,55 @@
+import random
+from src.config import GRID_WIDTH
+
+# Piece definitions and the 7-bag spawner.
+# Kept free of pygame/display code so headless tools (self-play, tuning) share the exact game pieces.
+class Polyomino:
+    # SHAPE DEFINITIONS
+    SHAPES = {
+        'I': [(-1, 0), (0, 0), (1, 0), (2, 0)],
+        'O': [(0, 0), (1, 0), (0, 1), (1, 1)],
+        'T': [(-1, 0), (0, 0), (1, 0), (0, 1)],
+        'S': [(-1, 0), (0, 0), (0, 1), (1, 1)],
+        'Z': [(-1, 1), (0, 1), (0, 0), (1, 0)],
+        'J': [(-1, 0), (0, 0), (1, 0), (1, -1)],
+        'L': [(-1, 0), (0, 0), (1, 0), (-1, -1)]
+    }
+    COLORS = {
+        'I': (0, 255, 255), 'O': (255, 255, 0), 'T': (128, 0, 128),
+        'S': (0, 255, 0), 'Z': (255, 0, 0), 'J': (0, 0, 255), 'L': (255, 165, 0)
+    }
+
+    def __init__(self, shape_key):
+        self.x = GRID_WIDTH // 2 - 1
+        self.y = 0  
+        self.shape_key = shape_key
+        self.name = shape_key # Added for sprite mapping support
+        self.blocks = list(self.SHAPES[shape_key])
+        self.color = self.COLORS[shape_key]
+        self.rotation_index = 0
+
+    def rotate(self, direction=1):
+        if self.shape_key == 'O': return
+        new_blocks = []
+        for block in self.blocks:
+            bx, by = block
+            if direction == 1: new_x, new_y = -by, bx
+            else: new_x, new_y = by, -bx
+            new_blocks.append((new_x, new_y))
+        self.blocks = new_blocks
+
+class Spawner:
+    BAG = ('I', 'O', 'T', 'S', 'Z', 'J', 'L')
+
+    def __init__(self, rng=None):
+        self.rng = rng or random # Seeded random.Random for reproducible sequences
+        self.bag = []
+        self.fill_bag()
+
+    def fill_bag(self):
+        self.bag = list(self.BAG)
+        self.rng.shuffle(self.bag)
+
+    def get_next_piece(self):
+        if len(self.bag) == 0: self.fill_bag()
+        return Polyomino(self.bag.pop(0))
@@ -0,0 +1,323 @@
+import random
+from src.config import GRID_WIDTH, GRID_HEIGHT
+
+# The playfield's rules half: the two world grids, the occupancy index over the active one and the
+# collision / lock / line clear / garbage operations built on it. No pygame here, so GameState
+# (src.simulation) plays on exactly the board code the game uses; main.Grid subclasses Playfield
+# and adds the retained render layer on top (its overrides only invalidate cached drawing).
+
+# --- Grid Occupancy ---
+FULL_ROW_MASK = (1 << GRID_WIDTH) - 1
+UNCLEARABLE_TYPES = ('solid', 'ground')
+SPECIAL_TYPES = ('brick', 'coin', 'question')
+
+# --- Piece Bitmasks ---
+# Shape offsets -> (min_bx, max_bx, [(dy, row_bits)], [(bx, lowest_by)]), bits relative to min_bx
+_piece_mask_cache = {}
+
+def get_piece_masks(blocks):
+    key = tuple(blocks)
+    masks = _piece_mask_cache.get(key)
+    if masks is None:
+        min_bx = min(bx for bx, by in key)
+        max_bx = max(bx for bx, by in key)
+        rows = {}
+        bottoms = {}
+        for bx, by in key:
+            rows[by] = rows.get(by, 0) | (1 << (bx - min_bx))
+            bottoms[bx] = max(bottoms.get(bx, by), by)
+        masks = (min_bx, max_bx, sorted(rows.items()), sorted(bottoms.items()))
+        _piece_mask_cache[key] = masks
+    return masks
+
+def empty_grid():
+    return [[None] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+
+class Block:
+    def __init__(self, color, block_type='normal', sprite_data=None):
+        self.color = color
+        self.type = block_type
+        self.anim_offset = random.random() * 10 # Cosmetic only; never the game's seeded rng
+        self.hit = False
+        self.sprite_data = sprite_data # {'sprite': '...', 'category': '...'}
+
+    def get_image(self, sprite_manager, timer):
+        # 1. New Sprite Mapping System
+        if self.sprite_data:
+            cat = self.sprite_data.get('category')
+            name = self.sprite_data.get('sprite')
+
+            # Support pre-loaded/modified Surfaces (e.g. tinted blocks)
+            if name is not None and not isinstance(name, str):
+                return name
+
+
+            # 2. Animated Enemies
+            if cat in ['koopa_green', 'koopa_red', 'spiny']:
+                # Use frames. Note: we need to handle "walk" prefix or not
+                frames = sprite_manager.get_animation_frames(cat, prefix='walk', scale_factor=2.0)
+                if not frames and 'walk_1' in name: # Fallback if specific sprite name given
+                     pass
+
+                if frames:
+                    # Animation speed
+                    idx = int((timer + self.anim_offset) * 6) % len(frames)
+                    return frames[idx]
+
+            # 3. Static Items / Blocks
+            # Map category to sheet name in assets.json keys
+            # 'blocks', 'items' are direct keys.
+            img = sprite_manager.get_sprite(cat, name, scale_factor=2.0)
+            if img: return img
+
+        # Fallbacks for legacy types
+        if self.type == 'question':
+            if self.hit:
+                return sprite_manager.get_sprite('blocks', 'empty', scale_factor=2.0)
+            f_idx = int((timer * 2 + self.anim_offset) % 3) + 1
+            return sprite_manager.get_sprite('blocks', f'question_{f_idx}', scale_factor=2.0)
+
+        if self.type == 'brick':
+            return sprite_manager.get_sprite('blocks', 'brick', scale_factor=2.0)
+
+        if self.type == 'coin':
+            frames = [1, 2, 3, 2]
+            f_idx = frames[int((timer * 8 + self.anim_offset) % 4)]
+            return sprite_manager.get_sprite('items', f'coin_{f_idx}', scale_factor=2.0)
+
+        return None
+
+    def is_animated(self):
+        """True if get_image() depends on the animation timer"""
+        if self.sprite_data:
+            name = self.sprite_data.get('sprite')
+            if name is not None and not isinstance(name, str): return False # Pre-built Surface
+            if self.sprite_data.get('category') in ['koopa_green', 'koopa_red', 'spiny']: return True
+        return self.type in ['question', 'coin']
+
+class Playfield:
+    def __init__(self):
+        # Dual World Data
+        self.grid_neon = empty_grid()
+        self.grid_shadow = empty_grid()
+        self.active_world = 'NEON'
+        self.grid = self.grid_neon # Active Grid Pointer
+
+        # Occupancy Index for the active grid
+        # row_masks[y] has bit x set if the cell is filled; col_tops[x] is the highest filled row (GRID_HEIGHT if empty)
+        # row_solid[y] counts unclearable blocks, row_special[y] counts brick/coin/question blocks
+        self.row_masks = [0] * GRID_HEIGHT
+        self.row_solid = [0] * GRID_HEIGHT
+        self.row_special = [0] * GRID_HEIGHT
+        self.col_tops = [GRID_HEIGHT] * GRID_WIDTH
+        self.mask_source = None # Grid list the index was built from (None = rebuild)
+
+    def reset(self):
+        """Empties both worlds (new level)"""
+        self.grid_neon = empty_grid()
+        self.grid_shadow = empty_grid()
+        self.grid = self.grid_neon
+
+    def reset_active(self):
+        """Empties the active world only (a life lost)"""
+        self.grid = empty_grid()
+        if self.active_world == 'SHADOW': self.grid_shadow = self.grid
+        else: self.grid_neon = self.grid
+
+    def mark_dirty(self, x, y):
+        """Call after changing grid[y][x] directly"""
+        if self._sync_index(): self._sync_cell(x, y)
+
+    def mark_rows_dirty(self, rows):
+        if not self._sync_index(): return
+        for y in rows:
+            for x in range(GRID_WIDTH):
+                self._sync_cell(x, y)
+
+    def invalidate(self):
+        """Force a reindex of the playfield (bulk edits, garbage, layouts)"""
+        self.mask_source = None
+
+    def _sync_index(self):
+        """Rebuild the occupancy index if the active grid was replaced. Returns True if it was already current."""
+        if self.mask_source is self.grid: return True
+        self.mask_source = self.grid
+        self.row_masks = [0] * GRID_HEIGHT
+        self.row_solid = [0] * GRID_HEIGHT
+        self.row_special = [0] * GRID_HEIGHT
+        for y, row in enumerate(self.grid):
+            self.row_masks[y], self.row_solid[y], self.row_special[y] = self._index_row(row)
+        self._rebuild_col_tops()
+        return False
+
+    def _index_row(self, row):
+        """Returns (mask, unclearable count, special count) for one grid row"""
+        m = solid = special = 0
+        for x, block in enumerate(row):
+            if block is None: continue
+            m |= 1 << x
+            btype = getattr(block, 'type', '')
+            if btype in UNCLEARABLE_TYPES: solid += 1
+            elif btype in SPECIAL_TYPES: special += 1
+        return m, solid, special
+
+    def _rebuild_col_tops(self):
+        self.col_tops = [GRID_HEIGHT] * GRID_WIDTH
+        seen = 0
+        for y, m in enumerate(self.row_masks):
+            new_bits = m & ~seen
+            if new_bits:
+                seen |= m
+                for x in range(GRID_WIDTH):
+                    if new_bits >> x & 1: self.col_tops[x] = y
+
+    def _sync_cell(self, x, y):
+        bit = 1 << x
+        self.row_masks[y], self.row_solid[y], self.row_special[y] = self._index_row(self.grid[y])
+        if self.grid[y][x] is not None:
+            if y < self.col_tops[x]: self.col_tops[x] = y
+        else:
+            if self.col_tops[x] == y:
+                top = y + 1
+                while top < GRID_HEIGHT and not self.row_masks[top] & bit: top += 1
+                self.col_tops[x] = top
+
+    def stack_masks(self):
+        """Row masks of the active grid, reindexed first if needed"""
+        self._sync_index()
+        return self.row_masks
+
+    def stack_top(self):
+        """Highest occupied row of the active grid (GRID_HEIGHT if empty)"""
+        self._sync_index()
+        return min(self.col_tops)
+
+    def push_garbage_row(self, new_row):
+        """Push a row in from the bottom, dropping the top row (boss/battle garbage)"""
+        self._sync_index()
+        self.grid.pop(0)
+        self.grid.append(new_row)
+        m, solid, special = self._index_row(new_row)
+        self.row_masks.pop(0)
+        self.row_masks.append(m)
+        self.row_solid.pop(0)
+        self.row_solid.append(solid)
+        self.row_special.pop(0)
+        self.row_special.append(special)
+        self._rebuild_col_tops()
+
+    def set_world(self, world_name):
+        self.active_world = world_name
+        if world_name == 'SHADOW': self.grid = self.grid_shadow
+        else: self.grid = self.grid_neon
+
+    def check_collision_in_world(self, piece, world_name):
+        target_grid = self.grid_shadow if world_name == 'SHADOW' else self.grid_neon
+        for bx, by in piece.blocks:
+            gx, gy = int(piece.x + bx), int(piece.y + by)
+            if gx < 0 or gx >= GRID_WIDTH or gy >= GRID_HEIGHT: return True
+            if gy >= 0 and target_grid[gy][gx] is not None: return True
+        return False
+
+    def check_collision(self, piece, inverted_gravity=False):
+        if not hasattr(piece, 'blocks'):
+             return False
+        return self.collides_at(piece.blocks, int(piece.x), int(piece.y), inverted_gravity)
+
+    def collides_at(self, blocks, px, py, inverted_gravity=False):
+        self._sync_index()
+        min_bx, max_bx, rows, _ = get_piece_masks(blocks)
+
+        # Wall Collision (Left/Right)
+        left = px + min_bx
+        if left < 0 or px + max_bx >= GRID_WIDTH: return True
+
+        for by, bits in rows:
+            gy = py + by
+            # Floor Collision (Normal)
+            if not inverted_gravity and gy >= GRID_HEIGHT: return True
+            # Ceiling Collision (Antigravity)
+            if inverted_gravity and gy < 0: return True
+            # Block Collision
+            if 0 <= gy < GRID_HEIGHT and self.row_masks[gy] & (bits << left): return True
+
+        return False
+
+    def drop_distance(self, piece):
+        """Rows the piece can fall before landing (0 if it is resting or already blocked)"""
+        px, py = int(piece.x), int(piece.y)
+        if self.collides_at(piece.blocks, px, py): return 0
+        _, _, _, bottoms = get_piece_masks(piece.blocks)
+
+        # Fast path: piece is fully above the stack surface in all its columns
+        dist = GRID_HEIGHT * 2
+        for bx, by in bottoms:
+            gy = py + by
+            top = self.col_tops[px + bx]
+            if gy >= top: break
+            dist = min(dist, top - 1 - gy)
+        else:
+            return dist
+
+        # Under an overhang: step down using the row masks
+        dist = 0
+        while not self.collides_at(piece.blocks, px, py + dist + 1): dist += 1
+        return dist
+
+    def piece_sprite_data(self, piece):
+        """Sprite mapping for the blocks a piece locks into (None: plain colored blocks)"""
+        return None
+
+    def lock_piece(self, piece):
+        sprite_data = self.piece_sprite_data(piece)
+        for bx, by in piece.blocks:
+            gx, gy = int(piece.x + bx), int(piece.y + by)
+            if 0 <= gy < GRID_HEIGHT and 0 <= gx < GRID_WIDTH:
+                self.grid[gy][gx] = Block(piece.color, sprite_data=sprite_data)
+                self.mark_dirty(gx, gy)
+
+    def clear_lines(self):
+        lines_cleared = 0
+        special_events = [] # For coins, items etc
+        completed_line_indices = []  # Track which lines are complete for animation
+
+        self._sync_index()
+        for y in range(GRID_HEIGHT):
+            if self.row_masks[y] != FULL_ROW_MASK: continue
+
+            # Unclearable blocks (solid/ground) keep a full row in place
+            if not self.row_solid[y]:
+                lines_cleared += 1
+                completed_line_indices.append(y)  # Save line index for animation
+
+            # Check for special blocks in this line
+            if self.row_special[y]:
+                has_garbage = False
+                for block in self.grid[y]:
+                    btype = getattr(block, 'type', '')
+                    if btype == 'brick': has_garbage = True
+                    elif btype == 'coin': special_events.append('COIN')
+                    elif btype == 'question': special_events.append('ITEM')
+                if has_garbage: special_events.append('BRICK_CLEAR')
+
+        if completed_line_indices:
+            # Compact in place: drop cleared rows and recycle their lists as the new empty rows on top
+            recycled = []
+            for y in reversed(completed_line_indices):
+                recycled.append(self.grid.pop(y))
+                del self.row_masks[y]
+                del self.row_solid[y]
+                del self.row_special[y]
+            for row in recycled:
+                for x in range(GRID_WIDTH): row[x] = None
+            self.grid[0:0] = recycled
+            self.row_masks[0:0] = [0] * lines_cleared
+            self.row_solid[0:0] = [0] * lines_cleared
+            self.row_special[0:0] = [0] * lines_cleared
+            self._rebuild_col_tops()
+
+        # Update references
+        if self.active_world == 'SHADOW': self.grid_shadow = self.grid
+        else: self.grid_neon = self.grid
+
+        return lines_cleared, special_events, completed_line_indices
@@ -0,0 +1,101 @@
+import math
+import pygame
+
+# Final letterboxed blit of the virtual frame onto the window.
+# Buffers are only rebuilt by configure() (on resize / fullscreen toggle), never per frame.
+class PresentationStage:
+    # In dirty-rect mode, fall back to a full flip once the reported regions cover this much of the window
+    FULL_UPDATE_RATIO = 0.5
+
+    def __init__(self, virtual_size):
+        self.virtual_size = virtual_size
+        self.screen = None
+        self.scale = 1.0
+        self.size = virtual_size
+        self.dest = (0, 0)
+        self.scaled_surf = None # None at exactly 1:1, the frame is blitted directly
+        self.margins = []
+
+        # Dirty-rect mode (opt-in): callers report changed regions in virtual coordinates each frame
+        self.dirty_rects_enabled = False
+        self.dirty = []
+        self.full = True
+        self.scene = None
+
+    def configure(self, screen, frame, scale, offset):
+        """Rebuilds the scale buffer and letterbox margins for the current window size"""
+        self.screen = screen
+        self.scale = scale
+        vw, vh = self.virtual_size
+        w, h = int(vw * scale), int(vh * scale)
+        dx, dy = int(offset[0]), int(offset[1])
+        self.size = (w, h)
+        self.dest = (dx, dy)
+
+        # Match the frame's pixel format so transform.scale can write into it
+        self.scaled_surf = None if (w, h) == (vw, vh) else pygame.Surface((w, h), 0, frame)
+
+        # Only the bars around the frame need clearing
+        sw, sh = screen.get_size()
+        rects = [
+            (0, 0, sw, dy),                       # Top
+            (0, dy + h, sw, sh - dy - h),         # Bottom
+            (0, dy, dx, h),                       # Left
+            (dx + w, dy, sw - dx - w, h),         # Right
+        ]
+        self.margins = [pygame.Rect(r) for r in rects if r[2] > 0 and r[3] > 0]
+        self.full = True
+
+    def begin_frame(self, scene):
+        """Starts a frame; switching scene forces one full update"""
+        if scene != self.scene:
+            self.scene = scene
+            self.full = True
+        self.dirty = []
+
+    def mark_dirty(self, rect):
+        self.dirty.append(pygame.Rect(rect))
+
+    def mark_full(self):
+        self.full = True
+
+    def _to_screen(self, rect):
+        """Maps a virtual rect to the (clipped) scaled-frame rect that covers it"""
+        s = self.scale
+        x0, y0 = int(rect.x * s), int(rect.y * s)
+        x1, y1 = int(math.ceil(rect.right * s)), int(math.ceil(rect.bottom * s))
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0).clip((0, 0) + self.size)
+
+    def present(self, frame):
+        """Puts the frame on the window and updates the display"""
+        regions = None
+        if self.dirty_rects_enabled and not self.full:
+            regions = [r for r in (self._to_screen(d) for d in self.dirty) if r.w and r.h]
+            covered = sum(r.w * r.h for r in regions)
+            if covered > self.FULL_UPDATE_RATIO * self.size[0] * self.size[1]:
+                regions = None
+
+        if regions is None:
+            for rect in self.margins:
+                self.screen.fill((0, 0, 0), rect)
+            if self.scaled_surf is None:
+                self.screen.blit(frame, self.dest)
+            else:
+                pygame.transform.scale(frame, self.size, self.scaled_surf)
+                self.screen.blit(self.scaled_surf, self.dest)
+            pygame.display.flip()
+            self.full = False
+            return
+
+        if not regions: return # Nothing changed, nothing to upload
+
+        src = frame
+        if self.scaled_surf is not None:
+            pygame.transform.scale(frame, self.size, self.scaled_surf)
+            src = self.scaled_surf
+        dx, dy = self.dest
+        updates = []
+        for r in regions:
+            self.screen.blit(src, (dx + r.x, dy + r.y), r)
+            updates.append(r.move(dx, dy))
+        pygame.display.update(updates)
@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+from collections import deque
+import pygame
+from src.config import PROFILER_WINDOW, PROFILER_DIR
+from src.text_cache import render_text, text_cache_stats
+
+# Frame profiler and its HUD.
+# Phases are timed with perf_counter (start/stop, or `with profiler.phase(name)`) and summed per
+# frame, so a phase that runs once per logic step counts all its steps. Counters sample cumulative
+# stats dicts (sprite cache, sounds, ...) once per frame. Everything is a no-op while disabled.
+PHASES = ('events', 'ai', 'gravity', 'turtles', 'grid', 'entities', 'hud', 'persistent_ui', 'present')
+GRAPH_BUDGET_MS = 1000.0 / 60 # Frame time drawn as the graph's reference line
+
+def percentile(sorted_values, p):
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100.0 * len(sorted_values)))]
+
+class _Phase:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.start(self.name)
+
+    def __exit__(self, *exc):
+        self.profiler.stop(self.name)
+
+class FrameProfiler:
+    def __init__(self, window=PROFILER_WINDOW):
+        self.enabled = False
+        self.window = window
+        self.frames = deque(maxlen=window) # One dict per frame: phase/counter -> ms/count, plus 'frame'
+        self.current = {}
+        self.open = {}
+        self.frame_start = 0.0
+        self.counters = [] # [(name, fn, cumulative, is_surface)]
+        self.last_counts = {}
+        self.summary = []
+        self.summary_age = 0
+        self._phases = {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frames.clear()
+        if self.enabled: # Start clean mid-frame: no stale totals, no frame measured from 0
+            for name, fn, cumulative, _ in self.counters:
+                if cumulative: self.last_counts[name] = fn()
+            self.begin_frame()
+        return self.enabled
+
+    def add_counter(self, name, fn, cumulative=True, surfaces=False):
+        """fn() returns a running total (cumulative) or a count that is already per frame.
+        surfaces=True also adds it to the 'surfaces' (created per frame) total"""
+        self.counters.append((name, fn, cumulative, surfaces))
+        self.last_counts[name] = fn() if cumulative else 0
+
+    def names(self):
+        counters = tuple(c[0] for c in self.counters)
+        if any(c[3] for c in self.counters): counters = ('surfaces',) + counters
+        return ('frame',) + PHASES + counters
+
+    def phase(self, name):
+        p = self._phases.get(name)
+        if p is None:
+            p = self._phases[name] = _Phase(self, name)
+        return p
+
+    def start(self, name):
+        if self.enabled: self.open[name] = time.perf_counter()
+
+    def stop(self, name):
+        if not self.enabled: return
+        t0 = self.open.pop(name, None)
+        if t0 is not None:
+            self.current[name] = self.current.get(name, 0.0) + (time.perf_counter() - t0) * 1000.0
+
+    def begin_frame(self):
+        if not self.enabled: return
+        self.current = {}
+        self.open = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled: return
+        frame = self.current
+        frame['frame'] = (time.perf_counter() - self.frame_start) * 1000.0
+        surfaces = 0
+        for name, fn, cumulative, is_surface in self.counters:
+            value = fn()
+            if cumulative:
+                frame[name] = value - self.last_counts[name]
+                self.last_counts[name] = value
+            else:
+                frame[name] = value
+            if is_surface: surfaces += frame[name]
+        frame['surfaces'] = surfaces
+        self.frames.append(frame)
+
+    def stats(self):
+        """[(name, p50, p95, p99)] over the rolling window; ms for phases, counts for counters"""
+        rows = []
+        for name in self.names():
+            values = sorted(f.get(name, 0.0) for f in self.frames)
+            rows.append((name, percentile(values, 50), percentile(values, 95), percentile(values, 99)))
+        return rows
+
+    def export_csv(self, path=None):
+        """Writes the rolling window, one row per frame; returns the path (None in the browser build)"""
+        if sys.platform == 'emscripten' or not self.frames: return None
+        if path is None:
+            os.makedirs(PROFILER_DIR, exist_ok=True)
+            path = os.path.join(PROFILER_DIR, time.strftime("profile_%Y%m%d_%H%M%S.csv"))
+        names = self.names()
+        with open(path, 'w') as f:
+            f.write("index," + ",".join(names) + "\n")
+            for i, frame in enumerate(self.frames):
+                f.write(f"{i}," + ",".join(f"{frame.get(n, 0):.3f}" for n in names) + "\n")
+        return path
+
+    def draw(self, surface, font, x, y):
+        """HUD: per-phase p50/p95/p99 table over a frame-time graph; returns the panel rect"""
+        if not self.enabled or not self.frames: return None
+        self.summary_age -= 1
+        if self.summary_age <= 0: # Sorting the window every frame would show up in the profile
+            self.summary = self.stats()
+            self.summary_age = 15
+
+        line_h = font.get_linesize()
+        graph_h = 60
+        w = 300
+        h = line_h * (len(self.summary) + 1) + graph_h + 16
+        panel = pygame.Rect(x, y, w, h)
+        surface.fill((0, 0, 0), panel)
+        pygame.draw.rect(surface, (90, 90, 90), panel, 1)
+
+        # Values are right-aligned per column so any font (not just monospace) lines up
+        cols = (x + w - 150, x + w - 80, x + w - 10)
+        header_color = (200, 200, 200)
+        for col, label in zip(cols, ('p50', 'p95', 'p99')):
+            surf = render_text(font, label, True, header_color)
+            surface.blit(surf, (col - surf.get_width(), y + 4))
+        for i, (name, p50, p95, p99) in enumerate(self.summary):
+            row_y = y + 4 + line_h * (i + 1)
+            is_time = name == 'frame' or name in PHASES
+            color = (255, 120, 120) if is_time and p95 > GRAPH_BUDGET_MS else (230, 230, 230)
+            surface.blit(render_text(font, name, True, color), (x + 6, row_y))
+            for col, value in zip(cols, (p50, p95, p99)):
+                surf = render_text(font, f"{value:.2f}" if is_time else f"{value:.0f}", True, color)
+                surface.blit(surf, (col - surf.get_width(), row_y))
+
+        # Frame-time graph, newest on the right; the line marks a 60 fps budget
+        gy = y + h - graph_h - 6
+        gx = x + 6
+        gw = w - 12
+        scale = graph_h / (GRAPH_BUDGET_MS * 2)
+        frames = list(self.frames)[-gw:]
+        for i, frame in enumerate(frames):
+            ms = frame['frame']
+            bar = min(graph_h, int(ms * scale))
+            color = (80, 220, 80) if ms <= GRAPH_BUDGET_MS else (240, 80, 80)
+            surface.fill(color, (gx + gw - len(frames) + i, gy + graph_h - bar, 1, bar))
+        budget_y = gy + graph_h - int(GRAPH_BUDGET_MS * scale)
+        pygame.draw.line(surface, (255, 255, 0), (gx, budget_y), (gx + gw, budget_y))
+        return panel
+
+def text_renders():
+    """Font renders (text cache misses) so far this frame"""
+    return text_cache_stats['misses']
@@ -0,0 +1,243 @@
+import os
+import sys
+import copy
+import bisect
+import zlib
+from src.config import REPLAY_CHECKPOINT_SECONDS, REPLAY_CHECKSUM_TICKS
+from src.simulation import GameState, step, INPUTS
+
+# Compact session replays: a seed plus the timestamped input stream.
+# The seed drives every random draw the rules make (GameState.rng), and the inputs include the
+# entity reports (stomps, escapes, pickups), so seed + inputs + per-tick dt re-drive the rules core
+# (src.simulation) exactly. Playback never renders, so it runs far above real time, and
+# periodic GameState snapshots make seeking cheap. Recordings carry a state checksum every
+# REPLAY_CHECKSUM_TICKS ticks; playback checks them and raises ReplayDivergence at the first mismatch.
+#
+# File layout: MAGIC, version byte, then varints: seed, world, level_in_world, followed by
+# records. Each record is one varint (ticks since the previous record << 4 | code). Codes below
+# CODE_EXT are inputs by INPUTS index; CODE_EXT is followed by a varint INPUTS index, CODE_CHECK by a
+# varint state checksum, CODE_DT by a varint dt in microseconds; CODE_END carries the trailing tick count.
+# Version 1 files (player inputs only, no checksums) still load: their codes are the first INPUTS.
+MAGIC = b'MTRP'
+VERSION = 2
+
+ACTIONS = INPUTS
+CODES = {name: code for code, name in enumerate(ACTIONS)}
+CODE_EXT = 12
+CODE_CHECK = 13
+CODE_DT = 14
+CODE_END = 15
+
+class ReplayDivergence(Exception):
+    """Playback no longer matches the recording from this tick on"""
+    def __init__(self, tick, expected, actual):
+        super().__init__(f"replay diverged at tick {tick} (checksum {actual:08x}, recorded {expected:08x})")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+def state_checksum(state):
+    """CRC32 of the stack, the counters, the pieces and the rng; the same state always gives the same value"""
+    piece, nxt = state.current_piece, state.next_piece
+    key = (tuple(state.grid.stack_masks()), state.score, state.lives, state.hearts, state.level,
+           state.lines_cleared_total, state.turtles_stomped, piece.name, piece.x, piece.y, tuple(map(tuple, piece.blocks)),
+           nxt.name, state.rng.getstate())
+    return zlib.crc32(repr(key).encode())
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80: return value, pos
+        shift += 7
+
+class ReplayRecorder:
+    """Collects one session: tick() stores the inputs step() got that tick, plus periodic checksums"""
+    def __init__(self, seed, world=1, level_in_world=1):
+        self.seed = seed
+        self.world = world
+        self.level_in_world = level_in_world
+        self.data = bytearray()
+        self.ticks = 0
+        self.last_tick = 0 # Tick of the previous record
+        self.dt_us = None
+        self.saved = None # Path of the last save
+
+    def _emit(self, code):
+        write_varint(self.data, (self.ticks - self.last_tick) << 4 | code)
+        self.last_tick = self.ticks
+
+    def tick(self, dt, inputs, state=None):
+        """Stores this tick's dt and inputs (and, every REPLAY_CHECKSUM_TICKS, the checksum of state
+        before the step); returns dt rounded to what the replay will use"""
+        dt_us = max(0, int(round(dt * 1000000)))
+        if dt_us != self.dt_us:
+            self._emit(CODE_DT)
+            write_varint(self.data, dt_us)
+            self.dt_us = dt_us
+        if state is not None and self.ticks % REPLAY_CHECKSUM_TICKS == 0:
+            self._emit(CODE_CHECK)
+            write_varint(self.data, state_checksum(state))
+        for action in inputs:
+            code = CODES[action]
+            if code < CODE_EXT:
+                self._emit(code)
+            else:
+                self._emit(CODE_EXT)
+                write_varint(self.data, code)
+        self.ticks += 1
+        return dt_us / 1000000.0
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        for value in (self.seed, self.world, self.level_in_world):
+            write_varint(out, value)
+        out += self.data
+        write_varint(out, (self.ticks - self.last_tick) << 4 | CODE_END)
+        return bytes(out)
+
+    def save(self, path):
+        if sys.platform == 'emscripten': return None # No writable disk in the browser build
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        self.saved = path
+        return path
+
+class Replay:
+    """A decoded replay: input codes per tick, the ticks where dt changes, checksums, and the length in ticks"""
+    def __init__(self, seed, world, level_in_world, inputs, dt_changes, length, checks=None):
+        self.seed = seed
+        self.world = world
+        self.level_in_world = level_in_world
+        self.inputs = inputs # {tick: [code, ...]}
+        self.dt_changes = dt_changes # Sorted [(tick, dt)]
+        self.length = length
+        self.checks = checks or {} # {tick: state checksum before that tick's step}
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC: raise ValueError("not a replay file")
+        if data[4] not in (1, VERSION): raise ValueError(f"unsupported replay version {data[4]}")
+        pos = 5
+        seed, pos = read_varint(data, pos)
+        world, pos = read_varint(data, pos)
+        level_in_world, pos = read_varint(data, pos)
+        inputs, dt_changes, checks = {}, [], {}
+        tick = 0
+        while True:
+            rec, pos = read_varint(data, pos)
+            tick += rec >> 4
+            code = rec & 0xF
+            if code == CODE_END: break
+            if code == CODE_DT:
+                dt_us, pos = read_varint(data, pos)
+                dt_changes.append((tick, dt_us / 1000000.0))
+            elif code == CODE_CHECK:
+                checks[tick], pos = read_varint(data, pos)
+            else:
+                if code == CODE_EXT: code, pos = read_varint(data, pos)
+                inputs.setdefault(tick, []).append(code)
+        return cls(seed, world, level_in_world, inputs, dt_changes, tick, checks)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+class ReplayPlayer:
+    """Re-drives a Replay headless. Snapshots every checkpoint_every seconds of game time back seek();
+    step() raises ReplayDivergence at the first tick whose state doesn't match the recorded checksum"""
+    def __init__(self, replay, checkpoint_every=REPLAY_CHECKPOINT_SECONDS):
+        self.replay = replay
+        self.checkpoint_every = checkpoint_every
+        self.checkpoints = [] # [(tick, time, snapshot)], in tick order
+        self.restart()
+
+    def restart(self):
+        r = self.replay
+        self.state = GameState(r.seed, r.world, r.level_in_world)
+        self.tick = 0
+        self.dt = r.dt_changes[0][1] if r.dt_changes else 1 / 60
+        self.dt_index = 0
+        self.next_checkpoint = 0.0
+
+    def _snapshot(self):
+        return copy.deepcopy((self.state, self.tick, self.dt, self.dt_index))
+
+    def _restore(self, snapshot):
+        self.state, self.tick, self.dt, self.dt_index = copy.deepcopy(snapshot)
+        self.next_checkpoint = self.state.time + self.checkpoint_every
+
+    @property
+    def finished(self):
+        return self.tick >= self.replay.length or self.state.game_over
+
+    def step(self):
+        """Plays one recorded tick; returns the simulation events it produced"""
+        r = self.replay
+        if self.state.time >= self.next_checkpoint and (not self.checkpoints or self.checkpoints[-1][0] < self.tick):
+            self.checkpoints.append((self.tick, self.state.time, self._snapshot()))
+            self.next_checkpoint = self.state.time + self.checkpoint_every
+
+        changes = r.dt_changes
+        while self.dt_index < len(changes) and changes[self.dt_index][0] <= self.tick:
+            self.dt = changes[self.dt_index][1]
+            self.dt_index += 1
+
+        expected = r.checks.get(self.tick)
+        if expected is not None:
+            actual = state_checksum(self.state)
+            if actual != expected: raise ReplayDivergence(self.tick, expected, actual)
+
+        inputs = [ACTIONS[code] for code in r.inputs.get(self.tick, ())]
+
+        self.tick += 1
+        return step(self.state, inputs, self.dt)
+
+    def fast_forward(self, until_tick=None):
+        """Runs without rendering to until_tick (default: the end); returns all events on the way"""
+        end = self.replay.length if until_tick is None else min(until_tick, self.replay.length)
+        events = []
+        while self.tick < end and not self.state.game_over:
+            events.extend(self.step())
+        return events
+
+    def seek(self, seconds):
+        """Moves to the first tick at or past game time `seconds`, from the nearest earlier checkpoint"""
+        times = [c[1] for c in self.checkpoints]
+        i = bisect.bisect_right(times, seconds) - 1
+        if i >= 0 and (self.state.time > seconds or self.checkpoints[i][1] > self.state.time):
+            self._restore(self.checkpoints[i][2])
+        elif self.state.time > seconds:
+            self.restart()
+        while self.state.time < seconds and not self.finished:
+            self.step()
+        return self.state
+
+if __name__ == "__main__":
+    import time
+    if len(sys.argv) < 2:
+        print("usage: python -m src.replay <replay file> [seek seconds]")
+        sys.exit(1)
+    player = ReplayPlayer(Replay.load(sys.argv[1]))
+    t0 = time.perf_counter()
+    try:
+        if len(sys.argv) > 2: player.seek(float(sys.argv[2]))
+        else: player.fast_forward()
+    except ReplayDivergence as e:
+        print(f"{e} ({e.tick / max(player.replay.length, 1):.0%} through the recording)")
+    elapsed = time.perf_counter() - t0
+    s = player.state
+    print(f"seed {player.replay.seed}: tick {player.tick}/{player.replay.length}, {s.time:.1f}s of play in {elapsed:.2f}s "
+          f"({s.time / max(elapsed, 1e-9):.0f}x real time)")
+    print(f"score {s.score}, lines {s.lines_cleared_total}, level {s.level}, lives {s.lives}, game over {s.game_over}")
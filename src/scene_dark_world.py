@@ -1,7 +1,9 @@
 import pygame
 import os
 import math
+import random
 from src.config import WINDOW_WIDTH, WINDOW_HEIGHT
+from src.fonts import get_font
 
 # Physics Constants
 GRAVITY = 1500
@@ -1329,7 +1331,7 @@ class Scene_DarkWorld:
         
         # 6. Help Text (top-left corner)
         try:
-            font = pygame.font.Font(None, 24)
+            font = get_font(None, 24)
             help_texts = [
                 "CONTROLS: Arrow Keys = Move, Space/Z = Jump",
                 "Press R to Respawn if Stuck"
@@ -44,6 +44,13 @@ class IntroActor:
 
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def get_draw_rect(self):
+        """Screen area covered by the current frame (padded for float positions)"""
+        rect = self.get_rect()
+        if self.frames and self.current_frame < len(self.frames) and self.frames[self.current_frame]:
+            rect.size = self.frames[self.current_frame].get_size()
+        return rect.inflate(4, 4)
         
     def update(self, dt, current_ground=None):
         if self.is_dragging:
@@ -179,6 +186,8 @@ class IntroScene:
             
         # -- Load Actors --
         self.actors = []
+        self.last_actor_rects = [] # For dirty-rect presentation
+        self.dirty_rects = []
         # visual_ground_y is where the feet should touch
         self.visual_ground_y = WINDOW_HEIGHT - 120 
         
@@ -358,8 +367,17 @@ class IntroScene:
             pygame.draw.line(surface, (255, 255, 255), (p.left, p.top), (p.left, p.bottom), 2)
             
         # -- Draw Actors --
+        actor_rects = []
         for actor in self.actors:
             actor.draw(surface)
+            actor_rects.append(actor.get_draw_rect())
+
+        # Regions that can differ from the previous frame: cloud band, visible hill band + grass, actors (old and new)
+        self.dirty_rects = [
+            pygame.Rect(0, 20, WINDOW_WIDTH, 140),
+            pygame.Rect(0, ground_visual_y + 20, WINDOW_WIDTH, ground_top - ground_visual_y - 19),
+        ] + self.last_actor_rects + actor_rects
+        self.last_actor_rects = actor_rects
             
         # No UI here, handled by Tetris.draw_persistent_ui
 
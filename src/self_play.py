@@ -0,0 +1,74 @@
+import json
+import random
+from src.pieces import Spawner
+from src.pieces import Polyomino
+from src.ai_player import Board, MoveSearch, BeamSearch, get_rotations, next_bag_distribution
+from src.ai_player import DEFAULT_WEIGHTS, BOARD_W, BOARD_H, FULL_ROW
+from src.simulation import line_clear_points
+
+# Headless self-play: the bot's search drives a bare bitboard game (no display, no pygame surfaces).
+# Pieces come from the game's own 7-bag Spawner, and the bot hard-drops straight to the spot it picked.
+WEIGHT_NAMES = ('lines', 'height', 'holes', 'bumpiness')
+
+def push_garbage_row(board, rng):
+    """Bowser-style garbage: a row with two gaps pushed in from the bottom, the top row dropped"""
+    gap1 = rng.randint(0, BOARD_W - 1)
+    gap2 = (gap1 + rng.randint(2, 4)) % BOARD_W
+    row = FULL_ROW & ~(1 << gap1) & ~(1 << gap2)
+    return Board.from_masks(board.masks[1:] + [row])
+
+def play_game(weights=DEFAULT_WEIGHTS, seed=0, max_pieces=500, tt=None, garbage_every=0, beam=None):
+    """Plays one game with the bot; garbage_every > 0 pushes a garbage row every that many pieces.
+    beam=(width, depth) plans with BeamSearch over the known bag instead of the 2-ply search.
+
+    Returns {'score', 'lines', 'pieces', 'topped_out'}
+    """
+    rng = random.Random(seed)
+    spawner = Spawner(rng)
+    board = Board.from_masks([0] * BOARD_H)
+    current = spawner.get_next_piece()
+    upcoming = spawner.get_next_piece()
+    score = 0
+    b2b_chain = 0
+    lines = 0
+    pieces = 0
+    topped_out = False
+
+    while pieces < max_pieces:
+        if beam:
+            known = [current.blocks, upcoming.blocks] + [Polyomino.SHAPES[k] for k in spawner.bag]
+            search = BeamSearch(board, known, beam[0], beam[1], weights, tail=next_bag_distribution())
+        else:
+            search = MoveSearch(board, current.blocks, upcoming.blocks, tt=tt, weights=weights)
+        search.step()
+        x, r = search.result()
+        rot = get_rotations(current.blocks)[r]
+        y = board.drop(rot, x)
+
+        # No legal spot, or the piece would lock above the visible board
+        if y is None or y + rot[7] < 0:
+            topped_out = True
+            break
+
+        board, cleared = board.place(rot, x, y).clear_lines()
+        if cleared:
+            points, b2b_chain = line_clear_points(cleared, 1, b2b_chain) # The game's scoring, at level 1
+            score += points
+        lines += cleared
+        pieces += 1
+        if garbage_every and pieces % garbage_every == 0: board = push_garbage_row(board, rng)
+        current, upcoming = upcoming, spawner.get_next_piece()
+
+    return {'score': score, 'lines': lines, 'pieces': pieces, 'topped_out': topped_out}
+
+def save_weights(path, weights, **extra):
+    data = dict(zip(WEIGHT_NAMES, weights))
+    data.update(extra)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def load_weights(path):
+    """Weights tuple for TetrisBot.weights from a file written by save_weights"""
+    with open(path) as f:
+        data = json.load(f)
+    return tuple(float(data[name]) for name in WEIGHT_NAMES)
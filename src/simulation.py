@@ -0,0 +1,735 @@
+import random
+from src.config import GRID_WIDTH, GRID_HEIGHT, WINDOW_WIDTH, PLAYFIELD_X, BLOCK_SIZE
+from src.pieces import Spawner
+from src.playfield import Playfield, Block
+from level_layouts import get_layout
+
+# Display-free game rules core.
+# GameState is one single-player game: the playfield (src.playfield, the same board code Tetris
+# draws), the pieces, timers, score and lives, and the boss, garbage, Mario helper and enemy spawn
+# rules. step() advances it by dt for one tick's inputs and returns (event, value) tuples; Tetris
+# holds a GameState and layers sprites, sounds and popups over those events. Enemies and items are
+# sprites that move on the host, so what they do to the rules comes back in as inputs ('stomp',
+# 'escape', ...) just like key presses. Randomness only comes from state.rng and time only from dt,
+# so a run is reproducible from (seed, per-tick inputs).
+
+# --- DAS Configuration ---
+DAS_DELAY = 0.3  # Initial delay before auto-repeat
+DAS_REPEAT = 0.12 # Speed of auto-repeat
+
+WALL_KICKS = [(1, 0), (-1, 0), (0, -1), (2, 0), (-2, 0)] # Right 1, Left 1, Up 1, Right 2, Left 2
+LINE_CLEAR_POINTS = [0, 100, 300, 500, 800]
+MATCH_TIME = 400.0 # SMB2 style countdown
+
+# --- Rules ---
+
+def fall_interval(game):
+    """Seconds per gravity row. Formula: (World * 4) + Level, base 1.0s, capped at 0.05s"""
+    difficulty_index = (game.world - 1) * 4 + game.level_in_world
+    return max(0.05, 1.0 - (difficulty_index - 1) * 0.05)
+
+def lines_required_for(world, level_in_world):
+    if world == 1 and level_in_world == 1: return 5 # Easy first level
+    return 8 + (world - 1) * 4 + (level_in_world - 1) * 2
+
+def line_clear_points(cleared, level, b2b_chain):
+    """(points, new back-to-back chain). Classic table times level; back-to-back Tetrises add 0.5x each"""
+    base_pts = LINE_CLEAR_POINTS[min(cleared, 4)] * level
+    multiplier = 1.0
+    if cleared == 4:
+        multiplier *= (1.0 + 0.5 * b2b_chain)
+        b2b_chain += 1
+    else:
+        b2b_chain = 0
+    return int(base_pts * multiplier), b2b_chain
+
+def _reset_lock_delay(game):
+    # Successful moves/rotations restart the lock delay, a limited number of times
+    if game.lock_move_count < game.max_lock_moves:
+        game.lock_timer = 0
+        game.lock_move_count += 1
+
+def try_move(game, dx):
+    """Shifts the piece sideways; returns True if it moved. Also (re)starts DAS in that direction"""
+    piece = game.current_piece
+    piece.x += dx
+    moved = not game.grid.check_collision(piece)
+    if moved: _reset_lock_delay(game)
+    else: piece.x -= dx
+    game.das_direction = dx
+    game.das_timer = 0
+    return moved
+
+def release_move(game, dx):
+    """Key released: stop auto-repeat if it was going that way"""
+    if game.das_direction == dx: game.das_direction = 0
+
+def try_rotate(game, direction=1):
+    """SRS-lite rotation with wall kicks; returns True if the piece rotated"""
+    piece = game.current_piece
+    piece.rotate(direction)
+    if not game.grid.check_collision(piece):
+        _reset_lock_delay(game)
+        return True
+
+    for dx, dy in WALL_KICKS:
+        piece.x += dx
+        piece.y += dy
+        if not game.grid.check_collision(piece):
+            _reset_lock_delay(game)
+            return True
+        # Backtrack
+        piece.x -= dx
+        piece.y -= dy
+
+    piece.rotate(-direction)
+    return False
+
+def soft_drop(game):
+    """Moves the piece down one row; returns True (and awards 1 point) if it moved"""
+    piece = game.current_piece
+    piece.y += 1
+    if game.grid.check_collision(piece):
+        piece.y -= 1
+        return False
+    game.score += 1
+    return True
+
+def update_das(game, dt):
+    """Auto-repeat sideways movement while a direction is held"""
+    if game.das_direction == 0: return
+    game.das_timer += dt
+    if game.das_timer > DAS_DELAY + DAS_REPEAT:
+        game.das_timer -= DAS_REPEAT
+        game.current_piece.x += game.das_direction
+        if game.grid.check_collision(game.current_piece):
+            game.current_piece.x -= game.das_direction
+
+def apply_gravity(game, dt, fast=False):
+    """Advances the fall timer; returns True if the piece fell a row this tick. fast = soft drop held"""
+    interval = fall_interval(game)
+    if fast: interval /= 20.0
+    game.fall_timer += dt
+    if game.fall_timer <= interval: return False
+    game.fall_timer = 0
+    piece = game.current_piece
+    piece.y += 1
+    if game.grid.check_collision(piece):
+        piece.y -= 1
+        return False
+    return True
+
+def update_lock_delay(game, dt):
+    """Runs the lock delay while the piece rests on something; returns True when it must lock"""
+    piece = game.current_piece
+    piece.y += 1
+    on_floor = game.grid.check_collision(piece)
+    piece.y -= 1
+    if not on_floor:
+        game.lock_timer = 0
+        return False
+    game.lock_timer += dt
+    return game.lock_timer >= game.max_lock_delay
+
+def hard_drop_distance(game):
+    """Rows the piece falls on a hard drop"""
+    piece = game.current_piece
+    start = piece.y
+    while not game.grid.check_collision(piece) and piece.y < GRID_HEIGHT:
+        piece.y += 1
+    dist = piece.y - 1 - start
+    piece.y = start
+    return dist
+
+def lock_piece_and_clear(game):
+    """Locks the current piece and clears lines: (cleared, special events, cleared row indices)"""
+    game.grid.lock_piece(game.current_piece)
+    game.lock_timer = 0
+    game.lock_move_count = 0
+    return game.grid.clear_lines()
+
+def spawn_next(game):
+    """Promotes the next piece; returns True if it spawned inside the stack (block out)"""
+    game.current_piece = game.next_piece
+    game.next_piece = game.spawner.get_next_piece()
+    return game.grid.check_collision(game.current_piece)
+
+# --- Game State ---
+
+# Inputs step() understands. The order is the replay file's code table (src.replay): append only.
+# Player: 'left', 'right', 'rotate', 'rotate_ccw', 'soft_drop', 'hard_drop', 'release_left',
+#   'release_right', 'down_on'/'down_off' (soft drop key held: fast gravity, harder boss hits).
+# Host reports: 'stomp'/'stomp_golden' (the piece landed on an enemy), 'collect_mushroom', 'collect_star',
+#   'squish' (the stack crushed an enemy), 'escape' (an enemy fell out of the bottom), 'helper_stomp'
+#   (Mario ran over an enemy), 'extra_life' (slot winnings), 'lift' (P-Wing key), and the debug keys
+#   'skip_level' and 'call_helper'.
+INPUTS = ('left', 'right', 'rotate', 'rotate_ccw', 'soft_drop', 'hard_drop', 'release_left', 'release_right',
+          'down_on', 'down_off',
+          'stomp', 'stomp_golden', 'collect_mushroom', 'collect_star', 'squish', 'escape', 'helper_stomp',
+          'extra_life', 'lift', 'skip_level', 'call_helper')
+
+MAX_LIVES = 5 # Cap for lives earned in play
+STAR_SECONDS = 10.0
+SPAWN_KINDS = ('green', 'golden', 'red', 'blooper', 'hammer_bro', 'piranha', 'spiny', 'magic_mushroom')
+HELPER_MODES = ('SMASH', 'STOMP', 'CLEAR', 'STAR')
+BOSS_LINE_DAMAGE = {1: 20, 2: 45, 3: 80, 4: 150}
+
+# Layout characters -> (block type, fallback color); Tetris re-skins them for the level theme
+LAYOUT_BLOCKS = {
+    '#': ('ground', (150, 75, 0)),
+    'B': ('brick', (150, 75, 0)),
+    'X': ('solid', (120, 120, 120)),
+    '?': ('question', (255, 215, 0)),
+}
+
+class Fireball:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.vy = -4.0 # Rises slowly
+        self.timer = 0
+
+class Boss:
+    """The big boss: position, HP and fireballs. main.BigBoss draws it"""
+    def __init__(self, world):
+        self.x = GRID_WIDTH // 2 - 1.5
+        self.y = GRID_HEIGHT - 1.0
+        self.width = 3.0
+        self.height = 3.0
+        self.speed = 2.0
+        self.direction = 1
+        self.max_hp = 250 + world * 100
+        self.hp = self.max_hp
+        self.attack_timer = 5.0
+        self.fireballs = []
+
+    def hit_by(self, piece):
+        """True if any cell of the piece is inside the boss's hitbox"""
+        px, py = int(piece.x), int(piece.y)
+        for bx, by in piece.blocks:
+            gx, gy = px + bx, py + by
+            if self.x <= gx < self.x + self.width and self.y - 1.5 <= gy <= self.y + 0.5: return True
+        return False
+
+class GameState:
+    """Rules-relevant state of one single-player game; attribute names match Tetris (see SHARED_ATTRIBUTES)"""
+    def __init__(self, seed=None, world=1, level_in_world=1, grid=None):
+        self.rng = random.Random(seed)
+        self.grid = grid if grid is not None else Playfield()
+        self.spawner = Spawner(self.rng)
+        self.current_piece = self.spawner.get_next_piece()
+        self.next_piece = self.spawner.get_next_piece()
+
+        self.fall_timer = 0
+        self.lock_timer = 0
+        self.max_lock_delay = 0.5
+        self.lock_move_count = 0
+        self.max_lock_moves = 10
+        self.das_timer = 0
+        self.das_direction = 0
+        self.down_held = False
+
+        self.world = world
+        self.level_in_world = level_in_world
+        self.level = (world - 1) * 4 + level_in_world
+        self.lines_required = lines_required_for(world, level_in_world)
+        self.lines_this_level = 0
+        self.lines_cleared_total = 0
+        self.lines_since_mushroom = 0
+        self.score = 0
+        self.b2b_chain = 0
+        self.lives = 3
+        self.hearts = 5 # SMB2 health: enemies escaping cost a heart, losing all hearts costs a life
+        self.max_hearts = 5
+        self.turtles_stomped = 0
+        self.frame_stomps = 0
+        self.match_timer = MATCH_TIME
+        self.turtle_spawn_timer = 5.0
+
+        self.star_active = False
+        self.star_timer = 0
+        self.p_wing_active = False
+        self.p_wing_timer = 0
+
+        self.is_boss_level = False
+        self.boss = None
+        self.boss_garbage_timer = 0
+
+        # Mario helper (x is in screen pixels, like the sprite that shows it)
+        self.mario_helper_active = False
+        self.mario_helper_mode = None
+        self.mario_helper_x = -100
+        self.mario_helper_timer = 0
+        self.mario_helper_cooldown = 60.0 # Can trigger every 60 seconds
+        self.mario_helper_acted = False # CLEAR / STAR modes act once per visit
+        self.mario_help_index = 0
+        self.lines_since_helper = 0
+
+        self.level_complete = False # Won; the next step() sets up the next level
+        self.game_over = False
+
+        self.time = 0.0 # The injected clock: only ever advanced by step()'s dt
+        self.ticks = 0
+        start_level(self)
+
+# Tetris forwards these attributes to its GameState (see StateAttribute)
+SHARED_ATTRIBUTES = (
+    'grid', 'spawner', 'current_piece', 'next_piece',
+    'fall_timer', 'lock_timer', 'max_lock_delay', 'lock_move_count', 'max_lock_moves', 'das_timer', 'das_direction',
+    'world', 'level_in_world', 'level', 'lines_required', 'lines_this_level', 'lines_cleared_total',
+    'lines_since_mushroom', 'score', 'b2b_chain', 'lives', 'hearts', 'max_hearts', 'turtles_stomped', 'frame_stomps',
+    'match_timer', 'turtle_spawn_timer', 'star_active', 'star_timer', 'p_wing_active', 'p_wing_timer',
+    'is_boss_level', 'boss_garbage_timer',
+    'mario_helper_active', 'mario_helper_mode', 'mario_helper_x', 'mario_helper_timer', 'mario_helper_cooldown',
+    'mario_help_index', 'lines_since_helper',
+)
+
+class StateAttribute:
+    """Class attribute that reads and writes the same-named attribute of the owner's `sim` GameState"""
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None: return self
+        return getattr(obj.sim, self.name)
+
+    def __set__(self, obj, value):
+        setattr(obj.sim, self.name, value)
+
+def forward_state_attributes(cls, names=SHARED_ATTRIBUTES):
+    for name in names: setattr(cls, name, StateAttribute(name))
+    return cls
+
+# --- Levels ---
+
+def start_level(state):
+    """Fresh board for state.world / level_in_world: boss arena on boss levels, then the level's layout"""
+    state.level = (state.world - 1) * 4 + state.level_in_world
+    state.grid.reset()
+    state.lines_this_level = 0
+    state.lines_required = lines_required_for(state.world, state.level_in_world)
+    state.is_boss_level = state.level_in_world == 4
+    state.boss = None
+    if state.is_boss_level:
+        state.boss = Boss(state.world)
+        _build_boss_arena(state)
+        state.boss_garbage_timer = 15.0 # More time before first garbage
+    _place_layout(state)
+    state.level_complete = False
+
+def _build_boss_arena(state):
+    # Shield line (partially filled) above the boss, with a 2-wide gap to shoot through
+    grid = state.grid
+    shield_row = state.rng.randint(14, 16)
+    gap_start = state.rng.randint(1, GRID_WIDTH - 3)
+    for x in range(GRID_WIDTH):
+        if x not in (gap_start, gap_start + 1): grid.grid[shield_row][x] = Block((150, 150, 150), 'brick')
+    grid.mark_rows_dirty([shield_row])
+
+def _place_layout(state):
+    layout = get_layout(state.world, state.level_in_world)
+    if not layout: return
+    grid = state.grid.grid
+    for r, row_str in enumerate(layout[:GRID_HEIGHT]):
+        for c, char in enumerate(row_str[:GRID_WIDTH]):
+            if char == '.': continue
+            block_type, color = LAYOUT_BLOCKS.get(char, LAYOUT_BLOCKS['B'])
+            grid[r][c] = Block(color, block_type)
+    state.grid.invalidate()
+
+def _win_level(state, events):
+    if state.level_complete: return # Boss killed by the same clear that met the line goal, etc.
+    state.level_complete = True
+    state.level_in_world += 1
+    if state.level_in_world > 4:
+        state.level_in_world = 1
+        state.world += 1
+    state.level = (state.world - 1) * 4 + state.level_in_world
+    events.append(('level_clear', state.level))
+
+def _next_level(state, events):
+    # End-of-level bonus: lines x stomps (coins on the host, x10 as score)
+    lines, stomps = state.lines_this_level, state.turtles_stomped
+    state.score += lines * stomps * 10
+    state.turtles_stomped = 0
+    start_level(state)
+    events.append(('level_start', (lines, stomps)))
+
+# --- Lives ---
+
+def _gain_life(state, events, cap=MAX_LIVES):
+    state.lives = min(state.lives + 1, cap)
+    events.append(('life', state.lives))
+
+def _game_over(state, events, cause):
+    state.game_over = True
+    events.append(('game_over', cause))
+
+def _lose_life(state, events, cause):
+    """A life for a heart-out or the clock running out; the board stays"""
+    state.lives -= 1
+    state.hearts = state.max_hearts
+    if state.lives <= 0: _game_over(state, events, cause)
+
+def _block_out(state, events):
+    """Like a retry: a life clears the board and deals fresh pieces; none left ends the game"""
+    if state.lives <= 0:
+        _game_over(state, events, 'block_out')
+        return
+    state.lives -= 1
+    state.grid.reset_active()
+    state.current_piece = state.spawner.get_next_piece()
+    state.next_piece = state.spawner.get_next_piece()
+    state.fall_timer = 0
+    state.lock_timer = 0
+    state.lock_move_count = 0
+    state.turtle_spawn_timer = 0
+    state.hearts = state.max_hearts
+    events.append(('block_out', state.lives))
+
+def _star(state, seconds, events):
+    state.star_active = True
+    state.star_timer = seconds
+    events.append(('star', seconds))
+
+# --- Pieces ---
+
+def _consume_piece(state):
+    """The current piece is destroyed without locking (boss hits, fireballs)"""
+    state.current_piece = state.next_piece
+    state.next_piece = state.spawner.get_next_piece()
+
+def _lock(state, events):
+    cleared, specials, rows = lock_piece_and_clear(state)
+    events.append(('lock', state.current_piece.shape_key))
+    if cleared: _line_clear(state, cleared, specials, rows, events)
+    if spawn_next(state): _block_out(state, events)
+
+def _line_clear(state, cleared, specials, rows, events):
+    state.lines_this_level += cleared
+    state.lines_cleared_total += cleared
+    state.lines_since_mushroom += cleared
+    if state.boss: damage_boss(state, BOSS_LINE_DAMAGE.get(cleared, 15 * cleared), "LINE CLEAR", events)
+
+    # Scoring 2.0 (Classic Multipliers)
+    state.level = (state.world - 1) * 4 + state.level_in_world
+    points, state.b2b_chain = line_clear_points(cleared, state.level, state.b2b_chain)
+    state.score += points
+    events.append(('clear', (cleared, rows, state.b2b_chain)))
+
+    # Chance for Star on Tetris
+    if cleared >= 4 and state.rng.random() < 0.1: _star(state, STAR_SECONDS, events)
+
+    # Mushroom Spawn (Every 3 lines)
+    if state.lines_since_mushroom >= 3:
+        state.lines_since_mushroom -= 3
+        events.append(('spawn', ('magic_mushroom', state.rng.randint(0, GRID_WIDTH - 1), state.rng.choice((-1, 1)))))
+
+    if state.is_boss_level:
+        if 'BRICK_CLEAR' in specials: damage_boss(state, 15, "BRICK SMASH", events) # Extra damage for garbage
+    elif state.lines_this_level >= state.lines_required:
+        _win_level(state, events)
+
+def _hard_drop(state, events):
+    piece = state.current_piece
+    start_y = piece.y
+    while not state.grid.check_collision(piece) and piece.y < GRID_HEIGHT:
+        piece.y += 1
+        if state.boss and state.boss.hit_by(piece):
+            damage_boss(state, 50, "SMASH", events)
+            _consume_piece(state)
+            return
+    piece.y -= 1
+    events.append(('hard_drop', (list(piece.blocks), int(piece.x), int(start_y), int(piece.y)))) # Path, for stomps
+    _lock(state, events)
+    state.fall_timer = 0
+
+def _update_piece(state, dt, events):
+    if apply_gravity(state, dt, state.down_held):
+        if state.boss and state.boss.hit_by(state.current_piece):
+            damage_boss(state, 20 if state.down_held else 10, "HIT", events)
+            _consume_piece(state)
+            return
+        events.append(('fall', state.current_piece))
+    if update_lock_delay(state, dt): _lock(state, events)
+
+# --- Boss ---
+
+def damage_boss(state, amount, reason, events):
+    boss = state.boss
+    if not boss or boss.hp <= 0: return
+    boss.hp -= amount
+    events.append(('boss_hit', (amount, reason)))
+    if boss.hp <= 0:
+        events.append(('boss_defeated', None))
+        _win_level(state, events)
+
+def _update_boss(state, dt, events):
+    boss = state.boss
+    # Move back and forth, faster as HP drops
+    health_pct = max(0.2, boss.hp / boss.max_hp)
+    boss.x += boss.direction * boss.speed * (1.0 + (1.0 - health_pct) * 2.0) * dt
+    if boss.x < 0:
+        boss.x = 0
+        boss.direction = 1
+    elif boss.x > GRID_WIDTH - boss.width:
+        boss.x = GRID_WIDTH - boss.width
+        boss.direction = -1
+
+    boss.attack_timer -= dt
+    if boss.attack_timer <= 0:
+        boss.attack_timer = 6.0 * health_pct + 2.5 # Slower attacks, more time to react
+        boss.fireballs.append(Fireball(boss.x + 1.5, boss.y - 2.0))
+        events.append(('fireball', None))
+
+    for fb in boss.fireballs[:]:
+        fb.y += fb.vy * dt
+        fb.timer += dt
+        if fb.y < -2:
+            boss.fireballs.remove(fb)
+            continue
+        # A fireball that reaches the falling piece destroys it
+        piece = state.current_piece
+        for bx, by in piece.blocks:
+            if abs(piece.x + bx - fb.x) < 1.0 and abs(piece.y + by - fb.y) < 1.0:
+                events.append(('piece_destroyed', None))
+                _consume_piece(state)
+                boss.fireballs.remove(fb)
+                break
+
+def garbage_rows(state, count, holes=1, rng=None):
+    """Pushes count brick rows in from the bottom with random holes (versus attacks, boss garbage).
+    Holes come from state.rng unless rng is given (garbage applied outside step() must not draw from it)"""
+    rng = rng or state.rng
+    for _ in range(count):
+        new_row = [Block((128, 128, 128), 'brick') for _ in range(GRID_WIDTH)]
+        gap = rng.randint(0, GRID_WIDTH - 1)
+        new_row[gap] = None
+        if holes > 1: new_row[(gap + rng.randint(2, 4)) % GRID_WIDTH] = None # Second gap, easier to clear
+        state.grid.push_garbage_row(new_row)
+
+# --- Enemies ---
+
+def _spawn_kind(level, r):
+    if level == 1: return 'golden' if r < 0.05 else 'green'
+    if level == 2:
+        if r < 0.20: return 'blooper'
+        if r < 0.40: return 'red'
+        return 'green'
+    if level == 3:
+        if r < 0.15: return 'hammer_bro'
+        if r < 0.30: return 'blooper'
+        return 'green'
+    if r < 0.10: return 'hammer_bro'
+    if r < 0.20: return 'blooper'
+    if r < 0.30: return 'piranha'
+    if r < 0.45: return 'spiny'
+    if r < 0.60: return 'red'
+    return 'green'
+
+def _update_spawns(state, dt, events):
+    state.turtle_spawn_timer += dt
+    if state.turtle_spawn_timer > max(4.0, 8.0 - state.level * 0.3):
+        state.turtle_spawn_timer = 0
+        kind = _spawn_kind(state.level, state.rng.random())
+        events.append(('spawn', (kind, state.rng.randint(0, GRID_WIDTH - 1), state.rng.choice((-1, 1)))))
+
+def _stomp(state, golden, events):
+    state.turtles_stomped += 1
+    state.frame_stomps += 1
+    if golden or state.turtles_stomped % 5 == 0: _gain_life(state, events)
+
+def _escape(state, events):
+    """An enemy got out through the bottom: a heart, and a life when the hearts run out"""
+    if state.star_active: return
+    state.hearts -= 1
+    events.append(('hurt', state.hearts))
+    if state.hearts <= 0: _lose_life(state, events, 'hearts')
+
+def _score_stomp_combo(state, events):
+    n = state.frame_stomps
+    state.frame_stomps = 0
+    if n < 2: return
+    points = 200 if n == 2 else n * 500
+    state.score += points
+    events.append(('stomp_combo', (n, points)))
+
+# --- Mario Helper ---
+
+def start_helper(state, events, mode=None):
+    """Mario runs in and helps, in a different way each time"""
+    if state.mario_helper_active: return
+    if mode is None:
+        mode = HELPER_MODES[state.mario_help_index % len(HELPER_MODES)]
+        state.mario_help_index += 1
+    state.mario_helper_active = True
+    state.mario_helper_mode = mode
+    state.mario_helper_x = -60 # Start off-screen left
+    state.mario_helper_timer = 0
+    state.mario_helper_acted = False
+    state.lines_since_helper = 0
+    events.append(('helper', mode))
+
+def _finish_helper(state, message, events):
+    state.mario_helper_active = False
+    state.mario_helper_x = -100
+    state.mario_helper_cooldown = 45.0 + state.rng.random() * 30
+    state.score += 500
+    events.append(('helper_done', message))
+
+def _helper_wants_in(state):
+    # Danger (3+ of the top 5 rows used) makes a visit much more likely
+    danger_rows = sum(1 for row in range(5) if any(state.grid.grid[row]))
+    if danger_rows >= 3 and state.rng.random() < 0.30: return True
+    if state.lines_since_helper >= 10 and state.rng.random() < 0.15: return True
+    return state.rng.random() < 0.02
+
+def _update_helper(state, dt, events):
+    state.mario_helper_cooldown -= dt
+    if not state.mario_helper_active:
+        if state.mario_helper_cooldown <= 0 and _helper_wants_in(state): start_helper(state, events)
+        return
+
+    state.mario_helper_timer += dt
+    mode = state.mario_helper_mode
+    grid = state.grid
+    right_edge = PLAYFIELD_X + GRID_WIDTH * BLOCK_SIZE + 60
+    if mode == 'SMASH':
+        # Run across the bottom smashing blocks
+        state.mario_helper_x += 400 * dt
+        col = int((state.mario_helper_x - PLAYFIELD_X) / BLOCK_SIZE)
+        if 0 <= col < GRID_WIDTH:
+            for row in range(GRID_HEIGHT - 3, GRID_HEIGHT):
+                if grid.grid[row][col] is not None:
+                    grid.grid[row][col] = None
+                    grid.mark_dirty(col, row)
+                    events.append(('smash', (col, row)))
+        if state.mario_helper_x > right_edge: _finish_helper(state, "THANKS MARIO!", events)
+
+    elif mode == 'STOMP':
+        # Run across stomping enemies (the host reports each one as 'helper_stomp')
+        state.mario_helper_x += 500 * dt
+        if state.mario_helper_x > right_edge: _finish_helper(state, "ALL CLEAR!", events)
+
+    elif mode == 'CLEAR':
+        # Jump to the center and wipe the 2 fullest rows
+        if state.mario_helper_timer < 0.5:
+            state.mario_helper_x = WINDOW_WIDTH // 2 - 30
+        elif state.mario_helper_timer < 1.0:
+            if not state.mario_helper_acted:
+                state.mario_helper_acted = True
+                rows = []
+                for _ in range(2):
+                    counts = [sum(1 for c in row if c is not None) for row in grid.grid]
+                    best = max(range(GRID_HEIGHT), key=lambda y: (counts[y], -y))
+                    if counts[best] == 0: break
+                    events.append(('helper_clear', (best, [x for x in range(GRID_WIDTH) if grid.grid[best][x]])))
+                    for x in range(GRID_WIDTH): grid.grid[best][x] = None
+                    grid.mark_rows_dirty([best])
+                    rows.append(best)
+                state.score += len(rows) * 100
+        elif state.mario_helper_timer > 1.5:
+            _finish_helper(state, "LINES GONE!", events)
+
+    elif mode == 'STAR':
+        # Hand over star power
+        if state.mario_helper_timer < 0.3:
+            state.mario_helper_x = PLAYFIELD_X + GRID_WIDTH * BLOCK_SIZE // 2
+        elif state.mario_helper_timer < 0.6:
+            if not state.mario_helper_acted:
+                state.mario_helper_acted = True
+                _star(state, STAR_SECONDS, events)
+        elif state.mario_helper_timer > 1.2:
+            _finish_helper(state, "USE IT WELL!", events)
+
+# --- Step ---
+
+def _apply_input(state, action, events):
+    """Returns True if the input locked the piece"""
+    if action == 'left' or action == 'right':
+        if try_move(state, -1 if action == 'left' else 1): events.append(('move', action))
+    elif action == 'release_left': release_move(state, -1)
+    elif action == 'release_right': release_move(state, 1)
+    elif action == 'rotate' or action == 'rotate_ccw':
+        if try_rotate(state, 1 if action == 'rotate' else -1): events.append(('rotate', action))
+    elif action == 'soft_drop': soft_drop(state)
+    elif action == 'hard_drop':
+        _hard_drop(state, events)
+        return True
+    elif action == 'down_on': state.down_held = True
+    elif action == 'down_off': state.down_held = False
+    elif action == 'stomp' or action == 'stomp_golden': _stomp(state, action == 'stomp_golden', events)
+    elif action == 'collect_mushroom': _gain_life(state, events)
+    elif action == 'collect_star': _star(state, 30.0, events)
+    elif action == 'squish': state.frame_stomps += 1
+    elif action == 'escape': _escape(state, events)
+    elif action == 'helper_stomp': state.score += 200
+    elif action == 'extra_life': state.lives += 1
+    elif action == 'lift':
+        # P-Wing: float the piece up a row
+        if state.p_wing_active:
+            state.current_piece.y -= 1
+            if state.grid.check_collision(state.current_piece): state.current_piece.y += 1
+    elif action == 'skip_level':
+        state.level += 1
+        state.level_in_world += 1
+        if state.level_in_world > 4:
+            state.level_in_world = 1
+            state.world += 1
+        events.append(('level', state.level))
+    elif action == 'call_helper':
+        state.mario_helper_cooldown = 0
+        start_helper(state, events)
+    return False
+
+def step(state, inputs, dt):
+    """Advances the game by dt seconds; returns a list of (event, value) tuples for the host"""
+    events = []
+    if state.game_over: return events
+    if state.level_complete: _next_level(state, events)
+    state.time += dt
+    state.ticks += 1
+
+    locked = False
+    for action in inputs:
+        locked = _apply_input(state, action, events) or locked
+        if state.game_over or state.level_complete: return events
+
+    update_das(state, dt)
+
+    if state.p_wing_active:
+        state.p_wing_timer -= dt
+        if state.p_wing_timer <= 0:
+            state.p_wing_active = False
+            events.append(('p_wing_end', None))
+
+    if state.is_boss_level:
+        state.boss_garbage_timer -= dt
+        if state.boss_garbage_timer <= 0:
+            garbage_rows(state, 1, holes=2)
+            events.append(('boss_garbage', None))
+            state.boss_garbage_timer = 15.0 - min(3.0, state.world * 0.3) # Gentler scaling
+
+    if state.star_active:
+        state.star_timer -= dt
+        if state.star_timer <= 0:
+            state.star_active = False
+            events.append(('star_end', None))
+
+    if state.boss: _update_boss(state, dt, events)
+
+    if not locked: _update_piece(state, dt, events)
+    if state.game_over or state.level_complete: return events
+
+    _update_spawns(state, dt, events)
+    _score_stomp_combo(state, events)
+
+    state.match_timer -= dt
+    if state.match_timer <= 0:
+        events.append(('time_up', None))
+        _lose_life(state, events, 'time_up')
+        state.match_timer = MATCH_TIME
+        if state.game_over: return events
+
+    _update_helper(state, dt, events)
+    return events
@@ -1,6 +1,8 @@
 import pygame
 import random
 import math
+from src.fonts import get_font, get_animated_font, prebuild_fonts
+from src.particles import ParticleSystem
 try:
     from src.config import WINDOW_WIDTH, WINDOW_HEIGHT
 except ImportError:
@@ -63,7 +65,7 @@ class SlotMachine:
         }
         
         # Visuals
-        self.particles = [] 
+        self.particles = ParticleSystem(capacity=1024, decay=0, shape='circle', cull_y=WINDOW_HEIGHT) # Coins
         self.msg = ""
         self.msg_timer = 0
         self.shake_offset = (0,0)
@@ -101,10 +103,14 @@ class SlotMachine:
         self.courier_timer = 0
         
         # Fonts
-        self.font_big = pygame.font.SysFont('arial black', 36, bold=True)
-        self.font_med = pygame.font.SysFont('arial', 24, bold=True)
-        self.font_small = pygame.font.SysFont('arial', 16, bold=True)
-        self.font_lcd = pygame.font.SysFont('consolas', 20, bold=True)
+        self.font_big = get_font('arial black', 36, bold=True)
+        self.font_med = get_font('arial', 24, bold=True)
+        self.font_small = get_font('arial', 16, bold=True)
+        self.font_lcd = get_font('consolas', 20, bold=True)
+        
+        # Pulsing overlay sizes: big win 48 * (0.7..1.3), bonus intro 80..100, grand total 60..70
+        prebuild_fonts('arial black', 33, 70, bold=True)
+        prebuild_fonts('arial black', 80, 100, bold=True)
 
         # Load Assets
         self.images = {}
@@ -130,7 +136,7 @@ class SlotMachine:
                     
                     # Add WILD text overlay
                     if key == 'wild':
-                        f_wild = pygame.font.SysFont('arial black', 14, bold=True)
+                        f_wild = get_font('arial black', 14, bold=True)
                         txt = f_wild.render("WILD", True, (255, 0, 0))
                         shd = f_wild.render("WILD", True, (255, 255, 255))
                         # Centered
@@ -294,11 +300,7 @@ class SlotMachine:
             self.shake_offset = (0, 0)
 
         # Physics (Particles)
-        for p in self.particles[:]:
-             p['x'] += p['vx'] * dt
-             p['y'] += p['vy'] * dt
-             p['vy'] += 800 * dt
-             if p['y'] > WINDOW_HEIGHT: self.particles.remove(p)
+        self.particles.update(dt)
         
         # State Machine
         if self.state == 'BONUS_INTRO':
@@ -642,15 +644,10 @@ class SlotMachine:
         return 0
 
     def spawn_coins(self, count):
-        for _ in range(count):
-            self.particles.append({
-                'x': self.x + self.width//2,
-                'y': self.y + self.height//2,
-                'vx': random.randint(-400, 400),
-                'vy': random.randint(-600, -200),
-                'color': (255, 215, 0),
-                'size': random.randint(4, 8)
-            })
+        self.particles.emit(self.x + self.width//2, self.y + self.height//2,
+                            [random.randint(-400, 400) for _ in range(count)],
+                            [random.randint(-600, -200) for _ in range(count)],
+                            (255, 215, 0), size=[random.randint(4, 8) for _ in range(count)])
 
     def draw(self, surface):
         if not self.active: return
@@ -1008,7 +1005,7 @@ class SlotMachine:
             # Scale the font based on win_scale
             font_size = int(48 * self.win_scale)
             try:
-                big_font = pygame.font.SysFont('arial black', font_size, bold=True)
+                big_font = get_animated_font('arial black', font_size, bold=True)
             except:
                 big_font = self.font_big
             
@@ -1065,7 +1062,7 @@ class SlotMachine:
             if self.intro_phase >= 2:
                 # Big "BONUS!" text with pulsing
                 try:
-                    bonus_font = pygame.font.SysFont('arial black', int(80 + 20 * pulse), bold=True)
+                    bonus_font = get_animated_font('arial black', 80 + 20 * pulse, bold=True)
                 except:
                     bonus_font = self.font_big
                 
@@ -1117,7 +1114,7 @@ class SlotMachine:
             pulse = (math.sin(self.glow_timer * 6) + 1) / 2
             if self.session_winnings > 0:
                 try:
-                    total_font = pygame.font.SysFont('arial black', int(60 + 10 * pulse), bold=True)
+                    total_font = get_animated_font('arial black', 60 + 10 * pulse, bold=True)
                 except:
                     total_font = self.font_big
                 
@@ -1196,8 +1193,7 @@ class SlotMachine:
         surface.blit(back_txt, back_txt.get_rect(center=self.btn_back.center))
         
         # Particles (coins) - draw on top
-        for p in self.particles:
-            pygame.draw.circle(surface, p['color'], (int(p['x']), int(p['y'])), p['size'])
+        self.particles.draw(surface)
 
     def update_courier(self, dt):
         pass # Todo implemented lakitu back if needed, but focus on slots for now
@@ -0,0 +1,37 @@
+from collections import OrderedDict
+
+# Bounded LRU of rendered text surfaces.
+# HUD labels and counters repeat every frame, and font rasterization is slow on the web build.
+TEXT_CACHE_SIZE = 256
+
+_text_cache = OrderedDict()
+
+# Hits/misses for the frame in progress, and the totals of the last finished frame
+text_cache_stats = {'hits': 0, 'misses': 0}
+text_cache_last_frame = {'hits': 0, 'misses': 0}
+
+def render_text(font, text, antialias, color, background=None):
+    """Cached drop-in for font.render(text, antialias, color, background)"""
+    key = (font, text, antialias, tuple(color), tuple(background) if background else None)
+    surf = _text_cache.get(key)
+    if surf is not None:
+        text_cache_stats['hits'] += 1
+        _text_cache.move_to_end(key)
+        return surf
+
+    text_cache_stats['misses'] += 1
+    surf = font.render(text, antialias, color, background)
+    _text_cache[key] = surf
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False) # Evict least recently used
+    return surf
+
+def text_cache_begin_frame():
+    """Rolls the per-frame counters; call once at the start of each frame"""
+    text_cache_last_frame['hits'] = text_cache_stats['hits']
+    text_cache_last_frame['misses'] = text_cache_stats['misses']
+    text_cache_stats['hits'] = 0
+    text_cache_stats['misses'] = 0
+
+def clear_text_cache():
+    _text_cache.clear()
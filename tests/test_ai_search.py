@@ -0,0 +1,143 @@
+import random
+import functools
+import pytest
+from src.pieces import Polyomino
+from src.ai_player import MoveSearch, DEFAULT_WEIGHTS, tuned_weights
+from src.self_play import save_weights
+
+# The bitboard search (src.ai_player) has to pick exactly the move the original list-grid bot
+# picked. The helpers below are that bot's (formerly TetrisBot methods), kept as the reference; the
+# docstrings in src.ai_player refer to them by name. A grid is 20 rows of 10 cells, None for empty.
+BOARDS = 300
+
+def get_blocks_for_rotation(base_blocks, r):
+    curr = [b for b in base_blocks]
+    for _ in range(r):
+        curr = [(-y, x) for x, y in curr]
+    return curr
+
+def check_collision_virtual(px, py, blocks, grid):
+    for bx, by in blocks:
+        gx = int(px + bx)
+        gy = int(py + by)
+        if gx < 0 or gx >= 10: return True # Wall
+        if gy >= 20: return True # Floor
+        if gy >= 0:
+            if grid[gy][gx] is not None: return True
+    return False
+
+def drop_virtual(x, blocks, grid):
+    for y in range(20):
+        if check_collision_virtual(x, y, blocks, grid):
+            return y - 1
+    return 19
+
+def put_piece_virtual(grid, blocks, px, py):
+    new_grid = [row[:] for row in grid]
+    for bx, by in blocks:
+        gx, gy = int(px + bx), int(py + by)
+        if 0 <= gy < 20 and 0 <= gx < 10: new_grid[gy][gx] = 1
+    return new_grid
+
+def calculate_score(grid, blocks, px, py, weights=DEFAULT_WEIGHTS):
+    temp_grid = put_piece_virtual(grid, blocks, px, py)
+    lines = sum(1 for row in temp_grid if None not in row)
+    heights = []
+    for cx in range(10):
+        h = 0
+        for cy in range(20):
+            if temp_grid[cy][cx] is not None:
+                h = 20 - cy
+                break
+        heights.append(h)
+    agg_height = sum(heights)
+    bumpiness = sum(abs(heights[i] - heights[i+1]) for i in range(9))
+    holes = 0
+    for cx in range(10):
+        block_found = False
+        for cy in range(20):
+            if temp_grid[cy][cx] is not None:
+                block_found = True
+            elif block_found:
+                holes += 1
+    lines_weight, height_weight, holes_weight, bumpiness_weight = weights
+    return (lines * lines_weight) + (agg_height * height_weight) + (holes * holes_weight) + (bumpiness * bumpiness_weight)
+
+def reference_best_move(grid, blocks, next_blocks, weights=DEFAULT_WEIGHTS):
+    """The original two-ply search: every placement of the piece, scored by the best placement of the next"""
+    best_score = -float('inf')
+    best_r = 0
+    best_x = 0
+    for r1 in range(4):
+        blocks1 = get_blocks_for_rotation(blocks, r1)
+        for x1 in range(-2, 10):
+            if check_collision_virtual(x1, 0, blocks1, grid): continue
+            y1 = drop_virtual(x1, blocks1, grid)
+            if y1 < 0: continue
+            grid2 = put_piece_virtual(grid, blocks1, x1, y1)
+            m2_best_score = -float('inf')
+            for r2 in range(4):
+                blocks2 = get_blocks_for_rotation(next_blocks, r2)
+                for x2 in range(-2, 10):
+                    if check_collision_virtual(x2, 0, blocks2, grid2): continue
+                    y2 = drop_virtual(x2, blocks2, grid2)
+                    if y2 < 0: continue
+                    s = calculate_score(grid2, blocks2, x2, y2, weights)
+                    if s > m2_best_score: m2_best_score = s
+            if m2_best_score > best_score:
+                best_score = m2_best_score
+                best_r = r1
+                best_x = x1
+    return best_x, best_r
+
+def random_grid(rng):
+    """Ragged stack with holes, plus a few rows one cell short of a line clear"""
+    grid = [[None] * 10 for _ in range(20)]
+    for x in range(10):
+        for y in range(20 - rng.randint(0, 16), 20):
+            if rng.random() < 0.85: grid[y][x] = 1
+    for y in range(20 - rng.randint(0, 4), 20):
+        grid[y] = [1] * 10
+        grid[y][rng.randrange(10)] = None
+    return grid
+
+def random_position(rng):
+    shapes = list(Polyomino.SHAPES.values())
+    return random_grid(rng), rng.choice(shapes), rng.choice(shapes)
+
+@functools.lru_cache(maxsize=None)
+def reference_cases():
+    """[(grid, blocks, next_blocks, reference move)] for BOARDS seeded random positions"""
+    rng = random.Random(1234)
+    cases = []
+    for _ in range(BOARDS):
+        grid, blocks, next_blocks = random_position(rng)
+        cases.append((grid, blocks, next_blocks, reference_best_move(grid, blocks, next_blocks)))
+    return cases
+
+@pytest.mark.parametrize('batch', [False, True], ids=['scalar', 'batch'])
+def test_move_search_matches_list_reference(batch):
+    for i, (grid, blocks, next_blocks, expected) in enumerate(reference_cases()):
+        search = MoveSearch(grid, blocks, next_blocks, batch)
+        search.step()
+        assert search.result() == expected, f"board {i}"
+
+# A tuned set with the usual signs (pruned by score_bound) and one where the bound doesn't hold
+TUNED_WEIGHTS = [(5.0, -1.0, -4.0, -0.5), (10.0, 0.3, -10.0, -0.2)]
+
+@pytest.mark.parametrize('weights', TUNED_WEIGHTS, ids=['tuned', 'unbounded'])
+@pytest.mark.parametrize('batch', [False, True], ids=['scalar', 'batch'])
+def test_move_search_matches_list_reference_with_weights(batch, weights):
+    rng = random.Random(4321)
+    for i in range(BOARDS // 10):
+        grid, blocks, next_blocks = random_position(rng)
+        search = MoveSearch(grid, blocks, next_blocks, batch, weights=weights)
+        search.step()
+        assert search.result() == reference_best_move(grid, blocks, next_blocks, weights), f"board {i}"
+
+def test_tuned_weights_are_opt_in(tmp_path):
+    assert tuned_weights(None) == DEFAULT_WEIGHTS
+    assert tuned_weights(str(tmp_path / 'missing.json')) == DEFAULT_WEIGHTS
+    path = tmp_path / 'best_weights.json'
+    save_weights(path, TUNED_WEIGHTS[0], fitness=1.0)
+    assert tuned_weights(str(path)) == TUNED_WEIGHTS[0]
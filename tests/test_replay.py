@@ -0,0 +1,64 @@
+import random
+import pytest
+from src.simulation import GameState, step, INPUTS
+from src.replay import Replay, ReplayPlayer, ReplayRecorder, ReplayDivergence, state_checksum, CODES
+from src.config import REPLAY_CHECKSUM_TICKS
+
+# A seeded session with random player inputs and host reports (stomps, pickups, level skips) is
+# recorded the way Tetris.update does it, then played back from the encoded bytes.
+TICKS = 20000
+SEED = 2024
+
+def record_session(seed=SEED, ticks=TICKS):
+    """(replay bytes, live checksum before each tick's step, final live state)"""
+    rng = random.Random(seed)
+    state = GameState(seed)
+    recorder = ReplayRecorder(seed)
+    checksums = []
+    dt = 1 / 120
+    for _ in range(ticks):
+        if rng.random() < 0.001: dt = rng.choice((1 / 120, 1 / 60, 1 / 144)) # Exercise dt records
+        inputs = []
+        if rng.random() < 0.15: inputs.append(rng.choice(INPUTS[:10]))
+        if rng.random() < 0.005: inputs.append(rng.choice(INPUTS[10:]))
+        checksums.append(state_checksum(state))
+        step(state, inputs, recorder.tick(dt, inputs, state))
+    return recorder.to_bytes(), checksums, state
+
+@pytest.fixture(scope='module')
+def session():
+    return record_session()
+
+def test_fast_forward_reproduces_session(session):
+    data, checksums, live = session
+    assert not live.game_over
+    player = ReplayPlayer(Replay.from_bytes(data))
+    player.fast_forward()
+    assert player.tick == TICKS
+    assert state_checksum(player.state) == state_checksum(live)
+    assert (player.state.score, player.state.lines_cleared_total, player.state.level) == \
+           (live.score, live.lines_cleared_total, live.level)
+
+def test_seek_matches_straight_playback(session):
+    data, checksums, live = session
+    player = ReplayPlayer(Replay.from_bytes(data))
+    player.fast_forward()
+    for seconds in (120.0, 7.5, 60.0, 61.0, 0.0):
+        player.seek(seconds)
+        assert player.state.time >= seconds
+        assert state_checksum(player.state) == checksums[player.tick], f"seek({seconds})"
+
+def test_changed_input_diverges_at_next_checksum(session):
+    data, checksums, live = session
+    replay = Replay.from_bytes(data)
+    # Drop a recorded hard drop: the piece is still falling at the next checksum instead of locked
+    tick = next(t for t in sorted(replay.inputs) if t > TICKS // 2 and t % REPLAY_CHECKSUM_TICKS
+                and CODES['hard_drop'] in replay.inputs[t])
+    replay.inputs[tick].remove(CODES['hard_drop'])
+    player = ReplayPlayer(replay)
+    player.fast_forward(tick) # Everything up to the change still matches
+    with pytest.raises(ReplayDivergence) as divergence:
+        player.fast_forward()
+    expected = (tick // REPLAY_CHECKSUM_TICKS + 1) * REPLAY_CHECKSUM_TICKS
+    assert divergence.value.tick == expected
+    assert divergence.value.expected == checksums[expected]
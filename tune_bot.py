@@ -0,0 +1,105 @@
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import multiprocessing
+
+# Headless: no window or audio device needed (plain Linux boxes, CI)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.ai_player import DEFAULT_WEIGHTS, TranspositionTable
+from src.self_play import play_game, save_weights, WEIGHT_NAMES
+
+# Cross-entropy search over the bot's heuristic weights, scored by headless self-play.
+# Every (candidate, game) pair is its own task, so all worker processes stay busy.
+# Signs stay fixed (lines rewarded, the rest penalized) so the search's pruning bound holds.
+SIGNS = (1.0, -1.0, -1.0, -1.0)
+
+_worker_tt = None
+
+def _init_worker():
+    global _worker_tt
+    _worker_tt = TranspositionTable() # Per process; keys include the weights
+
+def _play(task):
+    index, weights, seed, max_pieces, garbage_every = task
+    return index, play_game(weights, seed, max_pieces, _worker_tt, garbage_every)['score']
+
+def sample(rng, mean, std):
+    """Candidate weights around mean, with fixed signs and scaled to the default vector's length"""
+    mags = [abs(rng.gauss(m, s)) for m, s in zip(mean, std)]
+    norm = sum(v * v for v in mags) ** 0.5 or 1.0
+    scale = sum(w * w for w in DEFAULT_WEIGHTS) ** 0.5 / norm
+    return tuple(round(sign * v * scale, 6) for sign, v in zip(SIGNS, mags))
+
+def evaluate(pool, population, seeds, max_pieces, garbage_every):
+    """Mean self-play score per candidate over the same set of games (common random numbers)"""
+    tasks = [(i, w, seed, max_pieces, garbage_every) for i, w in enumerate(population) for seed in seeds]
+    totals = [0] * len(population)
+    for index, score in pool.imap_unordered(_play, tasks, chunksize=1):
+        totals[index] += score
+    return [t / len(seeds) for t in totals]
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune TetrisBot heuristic weights by headless self-play")
+    parser.add_argument('--generations', type=int, default=20)
+    parser.add_argument('--population', type=int, default=32)
+    parser.add_argument('--elite', type=float, default=0.25, help="Fraction of each generation kept to refit the distribution")
+    parser.add_argument('--games', type=int, default=8, help="Games per candidate")
+    parser.add_argument('--max-pieces', type=int, default=1000)
+    parser.add_argument('--garbage-every', type=int, default=8,
+                        help="Push a garbage row every N pieces so games end and weights separate (0 = off)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bot_tuning')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    curve_path = os.path.join(args.out, 'learning_curve.csv')
+    best_path = os.path.join(args.out, 'best_weights.json')
+
+    rng = random.Random(args.seed)
+    mean = [abs(w) for w in DEFAULT_WEIGHTS]
+    std = [max(0.5 * m, 0.5) for m in mean]
+    n_elite = max(2, int(args.population * args.elite))
+    best = (-1.0, DEFAULT_WEIGHTS)
+
+    print(f"Tuning with {args.workers} workers: {args.population} candidates x {args.games} games per generation")
+    with multiprocessing.Pool(args.workers, initializer=_init_worker) as pool, open(curve_path, 'w', newline='') as f:
+        curve = csv.writer(f)
+        curve.writerow(['generation', 'best', 'mean', 'elite_mean', 'seconds'] + ['mean_' + n for n in WEIGHT_NAMES])
+
+        for gen in range(args.generations):
+            start = time.perf_counter()
+            population = [sample(rng, mean, std) for _ in range(args.population)]
+            if gen == 0: population[0] = DEFAULT_WEIGHTS # Baseline: the shipped weights
+            seeds = [rng.randrange(1 << 30) for _ in range(args.games)]
+            fitness = evaluate(pool, population, seeds, args.max_pieces, args.garbage_every)
+
+            ranked = sorted(zip(fitness, population), key=lambda p: -p[0])
+            elite = [w for _, w in ranked[:n_elite]]
+            if ranked[0][0] > best[0]:
+                best = ranked[0]
+                save_weights(best_path, best[1], fitness=best[0], generation=gen, games=args.games,
+                             max_pieces=args.max_pieces, garbage_every=args.garbage_every)
+
+            # Refit the sampling distribution to the elite (magnitudes)
+            for k in range(len(mean)):
+                vals = [abs(w[k]) for w in elite]
+                mean[k] = sum(vals) / len(vals)
+                std[k] = max((sum((v - mean[k]) ** 2 for v in vals) / len(vals)) ** 0.5, 0.01)
+
+            elite_mean = sum(fit for fit, _ in ranked[:n_elite]) / n_elite
+            elapsed = time.perf_counter() - start
+            curve.writerow([gen, ranked[0][0], sum(fitness) / len(fitness), elite_mean, round(elapsed, 2)] + [round(m, 6) for m in mean])
+            f.flush()
+            print(f"Gen {gen}: best {ranked[0][0]:.0f}, elite mean {elite_mean:.0f} ({elapsed:.1f}s) {ranked[0][1]}")
+
+    print(f"Best weights {best[1]} (mean score {best[0]:.0f}) -> {best_path}")
+
+if __name__ == "__main__":
+    main()